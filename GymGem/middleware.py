@@ -0,0 +1,49 @@
+"""
+Path-aware versions of the browser-oriented middleware. The API authenticates with JWTs, so
+sessions, CSRF, messages and frame options only matter for the admin and other HTML pages;
+requests under API_PATH_PREFIX go straight to the next layer.
+
+These subclass the Django classes so the admin system checks still find them.
+"""
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_api_request(request):
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class APIExemptMixin:
+    def __call__(self, request):
+        if is_api_request(request):
+            # Also covers async mode: get_response then returns the coroutine for the caller to await
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class BrowserSessionMiddleware(APIExemptMixin, SessionMiddleware):
+    pass
+
+
+class BrowserCsrfViewMiddleware(APIExemptMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # process_view is invoked by the handler directly, not through __call__
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class BrowserAuthenticationMiddleware(APIExemptMixin, AuthenticationMiddleware):
+    pass
+
+
+class BrowserMessageMiddleware(APIExemptMixin, MessageMiddleware):
+    pass
+
+
+class BrowserXFrameOptionsMiddleware(APIExemptMixin, XFrameOptionsMiddleware):
+    pass
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -55,16 +56,22 @@ INSTALLED_APPS = [
     'stores',
     'api',
     'courses',
+    'search',
 ]
 
+# Session, CSRF, auth, messages and frame options are skipped for API_PATH_PREFIX requests,
+# which authenticate with JWTs; /admin/ still gets the full stack (see GymGem.middleware).
+API_PATH_PREFIX = '/api/'
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'GymGem.middleware.BrowserSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'GymGem.middleware.BrowserCsrfViewMiddleware',
+    'GymGem.middleware.BrowserAuthenticationMiddleware',
+    'GymGem.middleware.BrowserMessageMiddleware',
+    'GymGem.middleware.BrowserXFrameOptionsMiddleware',
+    'accounts.activity.LastSeenMiddleware',
 ]
 
 ROOT_URLCONF = 'GymGem.urls'
@@ -103,6 +110,19 @@ DATABASES = {
 }
 
 
+# Cache
+# Role versions (and other shared auth state) are cached here, so every worker must see the same
+# cache. Point REDIS_URL at a shared Redis in production; the local-memory default is per process,
+# and with it token role claims are never trusted (see authenticationAndAuthorization.caches).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache' if os.environ.get('REDIS_URL') else 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': os.environ.get('REDIS_URL', ''),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -122,6 +142,13 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Login resolves the Account up front and hands it to ResolvedAccountBackend. Being a ModelBackend,
+# it also serves username logins (admin, plain users), so every password check uses the hashing pool.
+AUTHENTICATION_BACKENDS = [
+    'authenticationAndAuthorization.backends.ResolvedAccountBackend',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -139,17 +166,27 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (profile pictures and their variants)
+MEDIA_URL = os.environ.get('MEDIA_URL', 'media/')
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
 'DEFAULT_AUTHENTICATION_CLASSES': (
-'rest_framework_simplejwt.authentication.JWTAuthentication',
+'authenticationAndAuthorization.authentication.StatelessJWTAuthentication',
 ),
 'DEFAULT_PERMISSION_CLASSES': (
 'rest_framework.permissions.IsAuthenticated',
 ),
+# Token buckets for the credential endpoints (see authenticationAndAuthorization.throttles)
+'DEFAULT_THROTTLE_RATES': {
+    'login_ip': os.environ.get('LOGIN_IP_RATE', '30/min'),
+    'login_identifier': os.environ.get('LOGIN_IDENTIFIER_RATE', '10/min'),
+    'signup_ip': os.environ.get('SIGNUP_IP_RATE', '10/min'),
+},
 }
 SIMPLE_JWT = {
   # It will work instead of the default serializer(TokenObtainPairSerializer).
@@ -162,4 +199,50 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": False,
     "ROTATE_REFRESH_TOKENS": False,
   # ... other settings can go here
-}
\ No newline at end of file
+}
+
+# Trust the signed profile_types claim for role checks instead of querying profiles on every request.
+# Role changes bump Account.role_version (cached in the shared cache), which sends stale tokens back
+# to the database. Needs a shared cache backend.
+ROLES_FROM_TOKEN = os.environ.get('ROLES_FROM_TOKEN', 'True') == 'True'
+
+# In-memory filter in front of the refresh token blacklist table: 'shared' also publishes
+# blacklisted JTIs to the cache so every worker sees them immediately; 'local' leaves other
+# workers a rebuild behind. Without a shared cache backend every check queries the table.
+TOKEN_BLACKLIST_FILTER = os.environ.get('TOKEN_BLACKLIST_FILTER', 'shared')
+TOKEN_BLACKLIST_REBUILD_SECONDS = int(os.environ.get('TOKEN_BLACKLIST_REBUILD_SECONDS', 300))
+
+# Password hashing runs in a bounded process pool shared by login and signup. Requests beyond
+# workers + queue limit get a 429 with Retry-After instead of tying up a request thread.
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', min(4, os.cpu_count() or 1)))
+PASSWORD_HASHING_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASHING_QUEUE_LIMIT', 16))
+PASSWORD_HASHING_RETRY_AFTER = int(os.environ.get('PASSWORD_HASHING_RETRY_AFTER', 1))
+
+# Asymmetric token signing. With PEM keys in JWT_SIGNING_KEYS_DIR (see generate_signing_key) tokens are
+# signed with the newest key, or JWT_ACTIVE_KID, and other services verify them against /api/auth/jwks.
+# Without keys the HS256 SECRET_KEY setup above stays in place.
+JWT_SIGNING_KEYS_DIR = os.environ.get('JWT_SIGNING_KEYS_DIR', str(BASE_DIR / 'keys'))
+JWT_ACTIVE_KID = os.environ.get('JWT_ACTIVE_KID') or None
+# Keep accepting HS256 tokens issued before the switch until they have all expired.
+JWT_ACCEPT_LEGACY_HS256 = os.environ.get('JWT_ACCEPT_LEGACY_HS256', 'True') == 'True'
+
+# Account.last_seen is buffered per worker and written in one bulk UPDATE per interval
+# (see accounts.activity); metrics at /api/accounts/activity/metrics for staff.
+LAST_SEEN_FLUSH_SECONDS = int(os.environ.get('LAST_SEEN_FLUSH_SECONDS', 60))
+
+# Autocomplete keeps specializations, categories and languages in memory (see utils.autocomplete);
+# a worker's copy is rebuilt at most this old when another worker changed the tables.
+REFERENCE_INDEX_TTL = int(os.environ.get('REFERENCE_INDEX_TTL', 300))
+
+# Postal-code centroids used by the geocode_locations command (country_code, country_name,
+# zip_code, latitude, longitude); point it at a full national export for production data.
+GEO_POSTAL_CODES_PATH = os.environ.get('GEO_POSTAL_CODES_PATH', BASE_DIR / 'utils' / 'data' / 'postal_codes.csv')
+
+# Profile pictures are resized to thumbnails and WebP on this many background threads after upload
+# (see utils.images); 0 renders them in the committing thread instead.
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+
+# Picture uploads are streamed to disk and refused past these limits before anything is decoded
+# (see utils.uploads).
+IMAGE_UPLOAD_MAX_BYTES = int(os.environ.get('IMAGE_UPLOAD_MAX_BYTES', 20 * 1024 * 1024))
+IMAGE_UPLOAD_MAX_PIXELS = int(os.environ.get('IMAGE_UPLOAD_MAX_PIXELS', 50_000_000))
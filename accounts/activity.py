@@ -0,0 +1,161 @@
+"""
+Write-behind tracking of Account.last_seen.
+
+Requests only touch an in-memory dict; every LAST_SEEN_FLUSH_SECONDS the pending timestamps are
+written with one UPDATE ... FROM (VALUES ...) statement, so an account seen a thousand times in
+an interval costs one row update. Flushing happens on a daemon thread started with the first
+record, so requests never wait on it, and once more at interpreter exit. Timestamps still
+buffered when a worker is killed are lost, which is acceptable for an activity indicator.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLUSH_CHUNK_SIZE = 5000
+
+
+class ActivityBuffer:
+    def __init__(self, interval):
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self.recorded = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rows_written = 0
+        self.last_flush_rows = 0
+        self.last_flush_ms = None
+        self.max_flush_ms = None
+        self.last_flush_at = None
+
+    def record(self, account_id, seen_at=None):
+        seen_at = seen_at or timezone.now()
+        with self._lock:
+            self.recorded += 1
+            previous = self._pending.get(account_id)
+            if previous is None or seen_at > previous:
+                self._pending[account_id] = seen_at
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name='last-seen-flusher', daemon=True)
+                self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                # The batch stays buffered for the next attempt
+                logger.exception("Flushing last_seen timestamps failed")
+            finally:
+                # This thread's connection would otherwise sit idle for the whole interval
+                connection.close()
+
+    def flush(self):
+        """Write and clear the pending timestamps. Returns the number of accounts written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        started = time.perf_counter()
+        rows = list(pending.items())
+        try:
+            for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                self._write(rows[start:start + FLUSH_CHUNK_SIZE])
+        except Exception:
+            # Put the batch back so the next flush retries it, keeping anything newer recorded meanwhile
+            with self._lock:
+                self.flush_errors += 1
+                for account_id, seen_at in pending.items():
+                    current = self._pending.get(account_id)
+                    if current is None or seen_at > current:
+                        self._pending[account_id] = seen_at
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += len(rows)
+            self.last_flush_rows = len(rows)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms or 0, elapsed_ms)
+            self.last_flush_at = timezone.now()
+        return len(rows)
+
+    def _write(self, rows):
+        values = ', '.join(['(%s::integer, %s::timestamptz)'] * len(rows))
+        params = [value for row in rows for value in row]
+        with connection.cursor() as cursor:
+            # The guard keeps a slow flush from one worker from moving last_seen backwards
+            cursor.execute(
+                f'''
+                UPDATE accounts_account AS account SET last_seen = seen.at
+                FROM (VALUES {values}) AS seen (id, at)
+                WHERE account.user_ptr_id = seen.id
+                  AND (account.last_seen IS NULL OR account.last_seen < seen.at)
+                ''',
+                params,
+            )
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'recorded': self.recorded,
+                'flushes': self.flushes,
+                'flushErrors': self.flush_errors,
+                'rowsWritten': self.rows_written,
+                'lastFlushRows': self.last_flush_rows,
+                'lastFlushMs': self.last_flush_ms,
+                'maxFlushMs': self.max_flush_ms,
+                'lastFlushAt': self.last_flush_at,
+                'flushIntervalSeconds': self.interval,
+            }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def _flush_at_exit():
+    try:
+        _buffer.flush()
+    except Exception:
+        pass
+
+
+def get_activity_buffer():
+    """The process-wide buffer; metrics are per worker process."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ActivityBuffer(interval=settings.LAST_SEEN_FLUSH_SECONDS)
+                atexit.register(_flush_at_exit)
+    return _buffer
+
+
+class LastSeenMiddleware:
+    """
+    Records the authenticated account after the view ran, so JWT users that DRF authenticated
+    inside the view are seen too (DRF copies request.user back onto the Django request).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            get_activity_buffer().record(user.pk)
+        return response
@@ -0,0 +1,309 @@
+import csv
+import json
+import re
+import sys
+import time
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from accounts.models import ROLE_BITS
+from accounts.projection import sync_account_projections
+from authenticationAndAuthorization.hashing import PasswordHasherPool
+from profiles.models import Profile
+from trainees.models import Trainee
+from trainers.models import Trainer
+
+# Profile types that also get their role row; gym and store accounts only get the profile
+ROLE_MODELS = {'trainee': Trainee, 'trainer': Trainer}
+PROFILE_TYPES = {value for value, _ in Profile.TYPE_CHOICES}
+GENDERS = {'male', 'female'}
+PHONE_RE = re.compile(r'^\+?\d{7,20}$')
+ROLE_FIELDS = ('country', 'state', 'zip_code')
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict, error or None) for each input record, one at a time."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, {'raw': line.rstrip('\n')}, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, {'raw': line.rstrip('\n')}, 'Each line must be a JSON object.'
+            continue
+        yield line_number, row, None
+
+
+def clean_row(row, default_profile_type):
+    """Normalize one input record, raising RowError with a readable reason if it can't be imported."""
+    def text(key, max_length=None):
+        value = str(row.get(key) or '').strip()
+        if max_length and len(value) > max_length:
+            raise RowError(f'{key} is longer than {max_length} characters.')
+        return value
+
+    username = text('username', 150)
+    if not username:
+        raise RowError('username is required.')
+    try:
+        UnicodeUsernameValidator()(username)
+    except ValidationError:
+        raise RowError('username may only contain letters, digits and @/./+/-/_.')
+
+    password = str(row.get('password') or '')
+    if not password:
+        raise RowError('password is required.')
+
+    email = text('email', 254)
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise RowError('email is not valid.')
+
+    profile_type = text('profile_type') or default_profile_type
+    if profile_type not in PROFILE_TYPES:
+        raise RowError(f'profile_type must be one of {", ".join(sorted(PROFILE_TYPES))}.')
+
+    first_name, last_name = text('first_name', 150), text('last_name', 150)
+    cleaned = {
+        'username': username,
+        'password': password,
+        'email': email,
+        'first_name': first_name,
+        'last_name': last_name,
+        'profile_type': profile_type,
+        'status': text('status', 20) or None,
+    }
+    if profile_type not in ROLE_MODELS:
+        return cleaned
+
+    gender = text('gender').lower() or 'male'
+    if gender not in GENDERS:
+        raise RowError('gender must be male or female.')
+    birthdate = text('birthdate')
+    if birthdate:
+        try:
+            birthdate = date.fromisoformat(birthdate)
+        except ValueError:
+            raise RowError('birthdate must be YYYY-MM-DD.')
+    phone_number = text('phone_number')
+    if phone_number and not PHONE_RE.match(phone_number):
+        raise RowError("phone_number must be digits with an optional leading '+'.")
+
+    cleaned['role'] = {
+        'name': text('name', 100) or f'{first_name} {last_name}'.strip() or username,
+        'gender': gender,
+        'phone_number': phone_number or None,
+        **({'birthdate': birthdate} if birthdate else {}),
+        **{key: text(key, 20 if key == 'zip_code' else 100) or None for key in ROLE_FIELDS},
+    }
+    return cleaned
+
+
+class RejectWriter:
+    """Writes rejected records in the input format, plus `line` and `error`, so they can be fixed and re-imported."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._file = None
+        self._csv = None
+
+    def write(self, line_number, row, error):
+        if self._file is None:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self.count += 1
+        record = {**row, 'line': line_number, 'error': error}
+        if self.fmt == 'jsonl':
+            self._file.write(json.dumps(record, default=str) + '\n')
+            return
+        if self._csv is None:
+            self._csv = csv.DictWriter(self._file, fieldnames=list(record), extrasaction='ignore')
+            self._csv.writeheader()
+        self._csv.writerow(record)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Create accounts with their profile and trainee/trainer row from a CSV or JSONL file. "
+        "Columns: username, password, email, first_name, last_name, profile_type, status, and for "
+        "trainees/trainers name, gender, birthdate, phone_number, country, state, zip_code. "
+        "Passwords are hashed in a process pool and each chunk is inserted with bulk_create in one "
+        "transaction. Invalid rows go to a reject file instead of stopping the import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin (then --format is required).")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per transaction.')
+        parser.add_argument('--workers', type=int, default=None, help='Hashing processes; 0 hashes inline.')
+        parser.add_argument('--profile-type', default='trainee', help='profile_type for rows that leave it empty.')
+        parser.add_argument('--rejects', help='Reject file path. Defaults to <input>.rejects.<ext>.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; nothing is hashed or written.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if fmt not in ('csv', 'jsonl'):
+            raise CommandError('Pass --format csv or --format jsonl.')
+        if options['profile_type'] not in PROFILE_TYPES:
+            raise CommandError(f'--profile-type must be one of {", ".join(sorted(PROFILE_TYPES))}.')
+        rejects_path = options['rejects'] or (
+            f'import_accounts.rejects.{fmt}' if path == '-' else str(Path(path).with_suffix(f'.rejects.{fmt}'))
+        )
+
+        workers = options['workers'] if options['workers'] is not None else settings.PASSWORD_HASHING_WORKERS
+        self.hasher = PasswordHasherPool(workers=workers, queue_limit=0)
+        self.rejects = RejectWriter(rejects_path, fmt)
+        self.imported = 0
+        self.hash_seconds = 0.0
+        started = time.perf_counter()
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            records = read_rows(stream, fmt)
+            while True:
+                chunk = list(islice(records, options['chunk_size']))
+                if not chunk:
+                    break
+                self.import_chunk(chunk, options['profile_type'], options['dry_run'])
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{self.imported} imported, {self.rejects.count} rejected "
+                    f"({(self.imported + self.rejects.count) / max(elapsed, 1e-6):.0f} rows/s)"
+                )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            self.rejects.close()
+            self.hasher.close()
+
+        elapsed = time.perf_counter() - started
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {self.imported} accounts in {elapsed:.1f}s ({self.imported / max(elapsed, 1e-6):.0f} rows/s, "
+            f"{self.hash_seconds:.1f}s hashing)."
+        ))
+        if self.rejects.count:
+            self.stdout.write(self.style.WARNING(f"{self.rejects.count} rows rejected, see {rejects_path}"))
+
+    def import_chunk(self, chunk, default_profile_type, dry_run):
+        rows = self.validate(chunk, default_profile_type)
+        if dry_run or not rows:
+            self.imported += len(rows)
+            return
+
+        hash_started = time.perf_counter()
+        hashes = self.hasher.make_passwords([cleaned['password'] for _, _, cleaned in rows])
+        self.hash_seconds += time.perf_counter() - hash_started
+
+        try:
+            with transaction.atomic():
+                self.insert(rows, hashes)
+        except IntegrityError:
+            # Usernames taken by a concurrent signup since validation: filter again and retry once
+            kept = self.reject_existing(rows)
+            kept_lines = {line_number for line_number, _, _ in kept}
+            hashes = [encoded for (line_number, _, _), encoded in zip(rows, hashes) if line_number in kept_lines]
+            rows = kept
+            if rows:
+                with transaction.atomic():
+                    self.insert(rows, hashes)
+        self.imported += len(rows)
+
+    def validate(self, chunk, default_profile_type):
+        rows = []
+        seen = set()
+        for line_number, row, error in chunk:
+            if error is None:
+                try:
+                    cleaned = clean_row(row, default_profile_type)
+                    if cleaned['username'] in seen:
+                        raise RowError('username appears earlier in this chunk.')
+                except RowError as e:
+                    error = str(e)
+            if error is not None:
+                self.rejects.write(line_number, row, error)
+                continue
+            seen.add(cleaned['username'])
+            rows.append((line_number, row, cleaned))
+        return self.reject_existing(rows)
+
+    def reject_existing(self, rows):
+        taken = set(
+            User.objects.filter(username__in=[cleaned['username'] for _, _, cleaned in rows])
+            .values_list('username', flat=True)
+        )
+        kept = []
+        for line_number, row, cleaned in rows:
+            if cleaned['username'] in taken:
+                self.rejects.write(line_number, row, 'username already exists.')
+            else:
+                kept.append((line_number, row, cleaned))
+        return kept
+
+    def insert(self, rows, hashes):
+        now = timezone.now()
+        users = User.objects.bulk_create([
+            User(
+                username=cleaned['username'],
+                email=cleaned['email'],
+                password=encoded,
+                first_name=cleaned['first_name'],
+                last_name=cleaned['last_name'],
+                date_joined=now,
+            )
+            for (_, _, cleaned), encoded in zip(rows, hashes)
+        ])
+        # Foreign keys are checked at commit, so profiles can point at accounts inserted below,
+        # which lets each account row carry its default profile from the start.
+        profiles = Profile.objects.bulk_create([
+            Profile(account_id=user.pk, profile_type=cleaned['profile_type'])
+            for user, (_, _, cleaned) in zip(users, rows)
+        ])
+        with connection.cursor() as cursor:
+            # Account is a multi-table child of User, which bulk_create refuses; insert the child rows directly
+            cursor.executemany(
+                'INSERT INTO accounts_account (user_ptr_id, created_at, updated_at, default_profile_id, status, role_mask, role_version) '
+                'VALUES (%s, %s, %s, %s, %s, %s, 0)',
+                [
+                    (user.pk, now, now, profile.pk, cleaned['status'], ROLE_BITS[cleaned['profile_type']])
+                    for user, profile, (_, _, cleaned) in zip(users, profiles, rows)
+                ],
+            )
+        for profile_type, model in ROLE_MODELS.items():
+            # bulk_create skips Trainee/Trainer.save() and its full_clean(); clean_row did that validation
+            model.objects.bulk_create([
+                model(profile_id=profile, **cleaned['role'])
+                for profile, (_, _, cleaned) in zip(profiles, rows)
+                if cleaned['profile_type'] == profile_type
+            ])
+        sync_account_projections([user.pk for user in users])
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+
+from accounts.models import Account, AccountProjection
+from accounts.projection import find_drift, repair_account_projections
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare every AccountProjection row with the account tables it is derived from and "
+        "report missing, stale and orphaned rows. Exits with an error when drift is found, "
+        "unless --fix repairs it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Accounts compared per query.')
+        parser.add_argument('--fix', action='store_true', help='Rewrite drifted rows from the source tables.')
+        parser.add_argument('--show', type=int, default=20, help='How many drifted ids to list.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        drifted = []
+        checked = 0
+        last_pk = 0
+        while True:
+            ids = list(
+                Account.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+            checked += len(ids)
+            batch_drift = find_drift(ids)
+            if batch_drift and options['fix']:
+                repair_account_projections(batch_drift)
+            drifted += batch_drift
+
+        orphans = list(
+            AccountProjection.objects.filter(~Exists(Account.objects.filter(pk=OuterRef('pk'))))
+            .values_list('pk', flat=True)
+        )
+        if orphans and options['fix']:
+            repair_account_projections(orphans)
+        drifted += orphans
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f"Checked {checked} accounts: projection is in sync."))
+            return
+
+        shown = ', '.join(str(pk) for pk in drifted[:options['show']])
+        if options['fix']:
+            self.stdout.write(self.style.WARNING(f"Checked {checked} accounts: repaired {len(drifted)} rows ({shown})."))
+            return
+        raise CommandError(f"Checked {checked} accounts: {len(drifted)} projection rows drifted ({shown}). Rerun with --fix.")
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Expression index matching the UPPER(email::text) predicate Django emits for email__iexact,
+    so logging in by email is a single index lookup instead of a scan of auth_user.
+    """
+
+    dependencies = [
+        ('accounts', '0002_alter_account_default_profile'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS "accounts_auth_user_email_upper_idx" ON "auth_user" (UPPER("email"::text));',
+            reverse_sql='DROP INDEX IF EXISTS "accounts_auth_user_email_upper_idx";',
+        ),
+    ]
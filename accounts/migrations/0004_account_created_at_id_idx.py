@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_auth_user_email_upper_idx'),
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['created_at', 'user_ptr'], name='account_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:46
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_account_created_at_id_idx'),
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountProjection',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='projection', serialize=False, to='accounts.account')),
+                ('username', models.CharField(db_index=True, max_length=150)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('status', models.CharField(blank=True, max_length=20, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('default_profile_id', models.BigIntegerField(blank=True, null=True)),
+                ('profile_types', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=10), blank=True, default=list, size=None)),
+            ],
+        ),
+        # Backfill existing accounts; from here on accounts.signals keeps the rows in sync
+        migrations.RunSQL(
+            sql='''
+                INSERT INTO accounts_accountprojection (
+                    account_id, username, email, first_name, last_name,
+                    status, is_active, default_profile_id, profile_types
+                )
+                SELECT a.user_ptr_id, u.username, u.email, u.first_name, u.last_name,
+                       a.status, u.is_active, a.default_profile_id,
+                       ARRAY(
+                           SELECT p.profile_type FROM profiles_profile p
+                           WHERE p.account_id = a.user_ptr_id ORDER BY p.profile_type
+                       )
+                FROM accounts_account a
+                JOIN auth_user u ON u.id = a.user_ptr_id
+                ON CONFLICT (account_id) DO NOTHING;
+            ''',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_accountprojection'),
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='role_mask',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+        # Backfill from existing profiles; from here on accounts.signals keeps the masks current
+        migrations.RunSQL(
+            sql='''
+                UPDATE accounts_account a SET role_mask = masks.mask
+                FROM (
+                    SELECT account_id, bit_or(CASE profile_type
+                        WHEN 'gym' THEN 1 WHEN 'trainer' THEN 2 WHEN 'store' THEN 4 WHEN 'trainee' THEN 8
+                        ELSE 0 END) AS mask
+                    FROM profiles_profile GROUP BY account_id
+                ) AS masks
+                WHERE a.user_ptr_id = masks.account_id;
+            ''',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_account_role_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='role_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
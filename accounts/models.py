@@ -1,5 +1,22 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import ArrayField
+
+# Bit per profile type in Account.role_mask
+ROLE_BITS = {'gym': 1, 'trainer': 2, 'store': 4, 'trainee': 8}
+
+
+def role_mask_values(role):
+    """Every role_mask value that includes `role`, for index-friendly `role_mask__in` filters."""
+    bit = ROLE_BITS[role]
+    return [mask for mask in range(1 << len(ROLE_BITS)) if mask & bit]
+
+
+def mask_roles(mask):
+    """The set of roles whose bit is set in `mask`."""
+    return {role for role, bit in ROLE_BITS.items() if mask & bit}
+
+
 class Account(User):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -12,7 +29,45 @@ class Account(User):
         related_name="default_for_accounts",
     )
     status = models.CharField(max_length=20, null=True, blank=True)
+    # OR of ROLE_BITS over the account's profiles, maintained by accounts.signals
+    role_mask = models.PositiveSmallIntegerField(default=0, db_index=True)
+    # Bumped on every profile change; tokens carrying an older version don't get their roles trusted
+    role_version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'user'
+        verbose_name_plural = 'users'
+        indexes = [
+            # Keyset pagination order of the account listing
+            models.Index(fields=['created_at', 'user_ptr'], name='account_created_at_id_idx'),
+        ]
 
     def __str__(self):
         return self.username
-    
+
+    def has_role(self, role):
+        return bool(self.role_mask & ROLE_BITS[role])
+
+
+class AccountProjection(models.Model):
+    """
+    Single-table, read-only copy of the account fields the auth paths need, so they don't pay
+    for the accounts_account/auth_user join. Kept in sync by accounts.signals; see
+    accounts.projection and the verify_account_projection command.
+    """
+    account = models.OneToOneField(
+        Account, primary_key=True, on_delete=models.CASCADE, related_name="projection"
+    )
+    username = models.CharField(max_length=150, db_index=True)
+    email = models.EmailField(blank=True)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    status = models.CharField(max_length=20, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    default_profile_id = models.BigIntegerField(null=True, blank=True)
+    # Kept sorted, so drift checks can compare lists directly
+    profile_types = ArrayField(models.CharField(max_length=10), default=list, blank=True)
+
+    def __str__(self):
+        return self.username
+
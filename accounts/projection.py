@@ -0,0 +1,99 @@
+"""
+Maintenance of AccountProjection. A sync recomputes the rows from accounts_account, auth_user
+and profiles_profile in one statement, after locking the account rows so that concurrent
+syncs of the same account run one after the other and the later one sees the earlier commit.
+"""
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Account, AccountProjection
+
+PROJECTED_COLUMNS = (
+    'account_id', 'username', 'email', 'first_name', 'last_name',
+    'status', 'is_active', 'default_profile_id', 'profile_types',
+)
+
+# Account and User fields copied into the projection; saves touching none of them skip the sync
+PROJECTED_FIELDS = frozenset({
+    'username', 'email', 'first_name', 'last_name', 'status', 'is_active', 'default_profile',
+})
+
+SOURCE_SQL = '''
+    SELECT a.user_ptr_id, u.username, u.email, u.first_name, u.last_name,
+           a.status, u.is_active, a.default_profile_id,
+           ARRAY(
+               SELECT p.profile_type FROM profiles_profile p
+               WHERE p.account_id = a.user_ptr_id ORDER BY p.profile_type
+           )
+    FROM accounts_account a
+    JOIN auth_user u ON u.id = a.user_ptr_id
+    WHERE a.user_ptr_id = ANY(%s)
+'''
+
+LOCK_SQL = '''
+    SELECT 1 FROM accounts_account WHERE user_ptr_id = ANY(%s) ORDER BY user_ptr_id FOR NO KEY UPDATE
+'''
+
+UPSERT_SQL = '''
+    INSERT INTO accounts_accountprojection ({columns})
+    {source}
+    ON CONFLICT (account_id) DO UPDATE SET {assignments}
+'''.format(
+    columns=', '.join(PROJECTED_COLUMNS),
+    source=SOURCE_SQL,
+    assignments=', '.join(f'{column} = EXCLUDED.{column}' for column in PROJECTED_COLUMNS[1:]),
+)
+
+UPDATE_SQL = '''
+    UPDATE accounts_accountprojection AS projection SET {assignments}
+    FROM ({source}) AS source ({columns})
+    WHERE projection.account_id = source.account_id
+'''.format(
+    columns=', '.join(PROJECTED_COLUMNS),
+    source=SOURCE_SQL,
+    assignments=', '.join(f'{column} = source.{column}' for column in PROJECTED_COLUMNS[1:]),
+)
+
+
+def sync_account_projections(account_ids, create=True):
+    """
+    Recompute the projection rows of `account_ids` from the source tables.
+
+    With create=False existing rows are updated but missing ones are not inserted. Profile
+    deletions use that: while an account is being deleted its profiles go after its projection
+    row, and re-inserting the row at that point would break the cascade.
+    """
+    account_ids = [int(account_id) for account_id in account_ids if account_id is not None]
+    if not account_ids:
+        return
+    # The lock is held to the end of the caller's transaction. Without it, two transactions adding
+    # profiles to one account could each recompute the row from a snapshot missing the other's
+    # profile, and the later commit would win with stale data. NO KEY UPDATE still lets foreign
+    # key checks from other transactions through.
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        cursor.execute(LOCK_SQL, [account_ids])
+        cursor.execute(UPSERT_SQL if create else UPDATE_SQL, [account_ids])
+
+
+def find_drift(account_ids):
+    """Ids among `account_ids` whose projection row is missing, stale, or left over from a deleted account."""
+    account_ids = list(account_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(SOURCE_SQL, [account_ids])
+        expected = {row[0]: row for row in cursor.fetchall()}
+    actual = {
+        row[0]: row
+        for row in AccountProjection.objects.filter(pk__in=account_ids).values_list(*PROJECTED_COLUMNS)
+    }
+    return sorted(
+        account_id for account_id in set(expected) | set(actual)
+        if expected.get(account_id) != actual.get(account_id)
+    )
+
+
+def repair_account_projections(account_ids):
+    """Bring the given rows back in line: upsert those of existing accounts, drop the rest."""
+    sync_account_projections(account_ids)
+    AccountProjection.objects.filter(pk__in=account_ids).exclude(
+        Exists(Account.objects.filter(pk=OuterRef('pk')))
+    ).delete()
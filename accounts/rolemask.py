@@ -0,0 +1,46 @@
+"""
+Maintenance of Account.role_mask. Adding and removing a profile flip one bit with a single
+UPDATE, which is safe under concurrency because the database re-reads the row it updates.
+A profile changing type recomputes the whole mask from profiles_profile, after locking the
+account row so that the recomputation sees every profile committed before it.
+"""
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import ROLE_BITS, Account
+from .projection import LOCK_SQL
+
+# bit_or over an account's profiles; unknown types contribute nothing
+MASK_SQL = '''
+    SELECT COALESCE(bit_or(CASE p.profile_type {cases} ELSE 0 END), 0)
+    FROM profiles_profile p WHERE p.account_id = a.user_ptr_id
+'''.format(cases=' '.join(f"WHEN '{role}' THEN {bit}" for role, bit in ROLE_BITS.items()))
+
+RECOMPUTE_SQL = f'''
+    UPDATE accounts_account AS a SET role_mask = ({MASK_SQL})
+    WHERE a.user_ptr_id = ANY(%s)
+'''
+
+
+def add_role(account_id, role):
+    bit = ROLE_BITS.get(role)
+    if bit:
+        Account.objects.filter(pk=account_id).update(role_mask=F('role_mask').bitor(bit))
+
+
+def remove_role(account_id, role):
+    bit = ROLE_BITS.get(role)
+    if bit:
+        Account.objects.filter(pk=account_id).update(role_mask=F('role_mask').bitand(~bit))
+
+
+def recompute_role_masks(account_ids):
+    """Rebuild role_mask of `account_ids` from their profiles."""
+    account_ids = [int(account_id) for account_id in account_ids if account_id is not None]
+    if not account_ids:
+        return
+    # A single UPDATE would evaluate the subquery against its starting snapshot; taking the lock
+    # first makes the next statement's snapshot include whatever the previous holder committed.
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        cursor.execute(LOCK_SQL, [account_ids])
+        cursor.execute(RECOMPUTE_SQL, [account_ids])
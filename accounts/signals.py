@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Account
+from .projection import PROJECTED_FIELDS, sync_account_projections
+from .rolemask import add_role, recompute_role_masks, remove_role
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=User)
+def sync_projection_on_account_save(sender, instance, update_fields=None, **kwargs):
+    # update_last_login and password upgrades save fields the projection doesn't carry
+    if update_fields is not None and not PROJECTED_FIELDS.intersection(update_fields):
+        return
+    sync_account_projections([instance.pk])
+
+
+@receiver(post_save, sender='profiles.Profile')
+def sync_projection_on_profile_save(sender, instance, created=False, update_fields=None, **kwargs):
+    if created:
+        add_role(instance.account_id, instance.profile_type)
+    elif update_fields is None or 'profile_type' in update_fields:
+        # The previous type isn't known here, so rebuild the mask instead of flipping bits
+        recompute_role_masks([instance.account_id])
+    sync_account_projections([instance.account_id])
+
+
+@receiver(post_delete, sender='profiles.Profile')
+def sync_projection_on_profile_delete(sender, instance, **kwargs):
+    remove_role(instance.account_id, instance.profile_type)
+    sync_account_projections([instance.account_id], create=False)
@@ -1,3 +1,368 @@
-from django.test import TestCase
+import csv
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.contrib.auth.models import update_last_login
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.test import APIClient
+
+from accounts.activity import ActivityBuffer, get_activity_buffer
+from accounts.models import ROLE_BITS, Account, AccountProjection
+from api.pagination import decode_cursor, encode_cursor
+from profiles.models import Profile
+from trainees.models import Trainee
+from trainers.models import Trainer
+
+
+def next_cursor(response):
+    """The cursor of the Link: rel="next" header, or None on the last page."""
+    if not response.has_header('Link'):
+        return None
+    url = response['Link'].split(';')[0].strip('<>')
+    return parse_qs(urlsplit(url).query)['cursor'][0]
+
+
+class AccountListTests(TestCase):
+    def setUp(self):
+        self.accounts = [Account.objects.create_user(username=f"user{i}", password="x") for i in range(5)]
+        # Two accounts share a created_at, so the id tie-breaker is exercised
+        same = timezone.now() - timedelta(days=1)
+        Account.objects.filter(pk__in=[self.accounts[1].pk, self.accounts[2].pk]).update(created_at=same)
+        self.expected = list(Account.objects.order_by('created_at', 'pk').values_list('id', flat=True))
+
+    def test_pages_follow_cursor_without_gaps_or_repeats(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            # Conditional GET validator, then the page itself
+            with self.assertNumQueries(2):
+                response = self.client.get('/api/accounts/', params)
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.json()]
+            cursor = next_cursor(response)
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_unpaged_request_keeps_bare_array(self):
+        response = self.client.get('/api/accounts/')
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual([row['id'] for row in response.json()], self.expected)
+        self.assertFalse(response.has_header('Link'))
+
+        response = self.client.get('/api/accounts/', {'limit': 2, 'role': ''})
+        self.assertRegex(response['Link'], r'^<http://testserver/api/accounts/\?limit=2&role=&cursor=[\w-]+>; rel="next"$')
+
+    def test_rows_keep_response_shape(self):
+        row = self.client.get('/api/accounts/', {'limit': 1}).json()[0]
+        self.assertEqual(
+            set(row), {'id', 'username', 'email', 'firstName', 'lastName', 'createdAt', 'updatedAt'}
+        )
+
+    def test_invalid_cursor_and_limit(self):
+        self.assertEqual(self.client.get('/api/accounts/', {'cursor': 'not-a-cursor'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/accounts/', {'cursor': encode_cursor([1])}).status_code, 400)
+        self.assertEqual(self.client.get('/api/accounts/', {'cursor': encode_cursor(['abc', 1])}).status_code, 400)
+        self.assertEqual(self.client.get('/api/accounts/', {'cursor': encode_cursor([None, 1])}).status_code, 400)
+        self.assertEqual(self.client.get('/api/accounts/', {'limit': 'ten'}).status_code, 400)
+
+    def test_cursor_keeps_microseconds(self):
+        created_at = timezone.now().replace(microsecond=123456)
+        self.assertEqual(decode_cursor(encode_cursor([created_at, 7]), Account, ('created_at', 'pk')), [created_at, 7])
+
+    def test_ndjson_stream(self):
+        response = self.client.get('/api/accounts/', {'stream': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], self.expected)
+
+    def test_ndjson_stream_resumes_after_cursor(self):
+        first_page = self.client.get('/api/accounts/', {'limit': 3})
+        response = self.client.get('/api/accounts/', {'stream': 'ndjson', 'cursor': next_cursor(first_page)})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], self.expected[3:])
+
+
+class AccountProjectionTests(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create_user(
+            username="paula", email="paula@example.com", password="x", first_name="Paula"
+        )
+
+    def projection(self):
+        return AccountProjection.objects.get(pk=self.account.pk)
+
+    def test_created_with_account(self):
+        projection = self.projection()
+        self.assertEqual(
+            (projection.username, projection.email, projection.first_name, projection.profile_types),
+            ("paula", "paula@example.com", "Paula", []),
+        )
+
+    def test_follows_account_and_profile_changes(self):
+        self.account.email = "new@example.com"
+        self.account.status = "active"
+        self.account.save()
+        trainer = Profile.objects.create(account=self.account, profile_type="trainer")
+        Profile.objects.create(account=self.account, profile_type="gym")
+        self.assertEqual(self.projection().profile_types, ["gym", "trainer"])
+
+        self.account.default_profile = trainer
+        self.account.save()
+        self.assertEqual(self.projection().default_profile_id, trainer.pk)
+
+        trainer.delete()
+        projection = self.projection()
+        self.assertEqual(projection.profile_types, ["gym"])
+        self.assertIsNone(projection.default_profile_id)
+        self.assertEqual((projection.email, projection.status), ("new@example.com", "active"))
+
+    def test_default_profile_set_by_profile_view(self):
+        client = APIClient()
+        client.force_authenticate(self.account)
+        response = client.post('/api/profiles/create', {'account': self.account.pk, 'profile_type': 'trainee'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.projection().default_profile_id, response.data['id'])
+
+    def test_account_delete_cascades_cleanly(self):
+        Profile.objects.create(account=self.account, profile_type="trainer")
+        self.account.delete()
+        self.assertFalse(AccountProjection.objects.exists())
+        connection.check_constraints()
+
+    def test_login_bookkeeping_skips_sync(self):
+        with self.assertNumQueries(1):
+            update_last_login(None, self.account)
+
+
+class RoleMaskTests(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create_user(username="rhea", password="x")
+
+    def role_mask(self):
+        return Account.objects.values_list("role_mask", flat=True).get(pk=self.account.pk)
+
+    def test_follows_profile_create_change_and_delete(self):
+        self.assertEqual(self.role_mask(), 0)
+        trainer = Profile.objects.create(account=self.account, profile_type="trainer")
+        gym = Profile.objects.create(account=self.account, profile_type="gym")
+        self.assertEqual(self.role_mask(), ROLE_BITS["trainer"] | ROLE_BITS["gym"])
+
+        gym.profile_type = "store"
+        gym.save()
+        self.assertEqual(self.role_mask(), ROLE_BITS["trainer"] | ROLE_BITS["store"])
+
+        trainer.delete()
+        self.account.refresh_from_db()
+        self.assertFalse(self.account.has_role("trainer"))
+        self.assertTrue(self.account.has_role("store"))
+
+    def test_list_filters_by_role(self):
+        other = Account.objects.create_user(username="sam", password="x")
+        Profile.objects.create(account=self.account, profile_type="trainer")
+        Profile.objects.create(account=other, profile_type="trainee")
+        Profile.objects.create(account=other, profile_type="trainer")
+        client = APIClient()
+        client.force_authenticate(self.account)
+
+        response = client.get('/api/accounts/', {'role': 'trainee'})
+        self.assertEqual([row['id'] for row in response.json()], [other.pk])
+        response = client.get('/api/accounts/', {'role': 'trainer'})
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(client.get('/api/accounts/', {'role': 'admin'}).status_code, 400)
+
+
+class VerifyAccountProjectionCommandTests(TestCase):
+    def setUp(self):
+        self.accounts = [Account.objects.create_user(username=f"v{i}", password="x") for i in range(3)]
+
+    def test_in_sync(self):
+        out = StringIO()
+        call_command('verify_account_projection', stdout=out)
+        self.assertIn('in sync', out.getvalue())
+
+    def test_detects_and_fixes_drift(self):
+        # Queryset updates bypass the signals, like raw SQL or a missed code path would
+        Account.objects.filter(pk=self.accounts[0].pk).update(status="banned")
+        AccountProjection.objects.filter(pk=self.accounts[1].pk).delete()
+
+        with self.assertRaisesMessage(CommandError, '2 projection rows drifted'):
+            call_command('verify_account_projection', batch_size=2, stdout=StringIO())
+
+        call_command('verify_account_projection', fix=True, stdout=StringIO())
+        self.assertEqual(AccountProjection.objects.get(pk=self.accounts[0].pk).status, "banned")
+        self.assertTrue(AccountProjection.objects.filter(pk=self.accounts[1].pk).exists())
+        call_command('verify_account_projection', stdout=StringIO())
+
+
+class ActivityBufferTests(TestCase):
+    def setUp(self):
+        self.accounts = [Account.objects.create_user(username=f"seen{i}", password="x") for i in range(3)]
+        self.buffer = ActivityBuffer(interval=3600)
+        # Keep the flusher thread from starting; these tests flush by hand
+        self.buffer._flusher = object()
+
+    def test_coalesces_into_one_update(self):
+        now = timezone.now()
+        for second in range(50):
+            for account in self.accounts:
+                self.buffer.record(account.pk, now + timedelta(seconds=second))
+        self.assertEqual(self.buffer.metrics()['pending'], 3)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.buffer.flush(), 3)
+        for account in self.accounts:
+            account.refresh_from_db()
+            self.assertEqual(account.last_seen, now + timedelta(seconds=49))
+        metrics = self.buffer.metrics()
+        self.assertEqual((metrics['pending'], metrics['recorded'], metrics['lastFlushRows']), (0, 150, 3))
+        self.assertIsNotNone(metrics['lastFlushMs'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.buffer.flush(), 0)
+
+    def test_never_moves_last_seen_backwards(self):
+        now = timezone.now()
+        Account.objects.filter(pk=self.accounts[0].pk).update(last_seen=now)
+        self.buffer.record(self.accounts[0].pk, now - timedelta(minutes=5))
+        self.buffer.flush()
+        self.accounts[0].refresh_from_db()
+        self.assertEqual(self.accounts[0].last_seen, now)
+
+    def test_middleware_records_jwt_requests(self):
+        buffer = get_activity_buffer()
+        buffer.flush()
+        token = AccessToken.for_user(self.accounts[1])
+        self.client.get('/api/accounts/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertIsNotNone(buffer._pending.get(self.accounts[1].pk))
+        buffer.flush()
+        self.accounts[1].refresh_from_db()
+        self.assertIsNotNone(self.accounts[1].last_seen)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(self.accounts[0])
+        self.assertEqual(client.get('/api/accounts/activity/metrics').status_code, 403)
+        Account.objects.filter(pk=self.accounts[0].pk).update(is_staff=True)
+        self.accounts[0].refresh_from_db()
+        client.force_authenticate(self.accounts[0])
+        response = client.get('/api/accounts/activity/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('pending', response.json())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportAccountsCommandTests(TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+        Account.objects.create_user(username="taken", password="x")
+
+    def run_import(self, name, content, **options):
+        path = self.dir / name
+        path.write_text(content)
+        out = StringIO()
+        call_command('import_accounts', str(path), workers=0, chunk_size=2, stdout=out, **options)
+        return out.getvalue()
+
+    def test_csv_import(self):
+        output = self.run_import('members.csv', (
+            "username,password,email,first_name,last_name,profile_type,gender,birthdate\n"
+            "amy,pw-amy,amy@example.com,Amy,Adams,trainee,female,1990-05-01\n"
+            "bob,pw-bob,bob@example.com,Bob,Brown,trainer,,\n"
+            "gymco,pw-gym,gym@example.com,,,gym,,\n"
+            "bad,pw,not-an-email,,,trainee,,\n"
+            "taken,pw,,,,trainee,,\n"
+            "carl,pw,,,,trainee,robot,\n"
+        ))
+        self.assertIn('Imported 3 accounts', output)
+        self.assertIn('rows/s', output)
+
+        amy = Account.objects.get(username="amy")
+        self.assertTrue(amy.check_password("pw-amy"))
+        self.assertEqual(amy.default_profile.profile_type, "trainee")
+        trainee = Trainee.objects.get(profile_id=amy.default_profile)
+        self.assertEqual((trainee.name, trainee.gender, trainee.birthdate), ("Amy Adams", "female", date(1990, 5, 1)))
+        self.assertTrue(Trainer.objects.filter(profile_id__account__username="bob").exists())
+        self.assertTrue(Profile.objects.filter(account__username="gymco", profile_type="gym").exists())
+        self.assertEqual(AccountProjection.objects.get(pk=amy.pk).profile_types, ["trainee"])
+        self.assertTrue(amy.has_role("trainee"))
+        call_command('verify_account_projection', stdout=StringIO())
+
+        with open(self.dir / 'members.rejects.csv', newline='') as f:
+            rejects = {row['username']: row for row in csv.DictReader(f)}
+        self.assertEqual(set(rejects), {"bad", "taken", "carl"})
+        self.assertEqual(rejects["taken"]["error"], "username already exists.")
+        self.assertEqual(rejects["bad"]["line"], "5")
+
+    def test_jsonl_import_and_dry_run(self):
+        content = (
+            json.dumps({"username": "dana", "password": "pw", "profile_type": "trainer"}) + "\n"
+            + "{not json\n"
+            + json.dumps({"username": "dana", "password": "pw"}) + "\n"
+        )
+        self.run_import('members.jsonl', content, dry_run=True)
+        self.assertFalse(Account.objects.filter(username="dana").exists())
+
+        self.run_import('members.jsonl', content, rejects=str(self.dir / 'out.jsonl'))
+        self.assertTrue(Trainer.objects.filter(profile_id__account__username="dana").exists())
+        rejects = [json.loads(line) for line in (self.dir / 'out.jsonl').read_text().splitlines()]
+        self.assertEqual([reject['line'] for reject in rejects], [2, 3])
+
+
+class AccountConditionalGetTests(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create_user(username="etag", password="x")
+        self.url = f'/api/accounts/{self.account.pk}'
+
+    def test_detail_not_modified_until_saved(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.account.first_name = "Changed"
+        self.account.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_changes_that_skip_updated_at_are_noticed(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        Account.objects.filter(pk=self.account.pk).update(last_seen=timezone.now())
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()['lastSeen'])
+        # If-Modified-Since alone has nothing to compare against
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date()).status_code, 200)
+
+    def test_missing_account_still_404s(self):
+        self.assertEqual(self.client.get('/api/accounts/999999').status_code, 404)
+
+    def test_list_page_etag_changes_with_rows(self):
+        etag = self.client.get('/api/accounts/')['ETag']
+        self.assertEqual(self.client.get('/api/accounts/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Pages with other parameters have their own tag
+        self.assertEqual(self.client.get('/api/accounts/', {'limit': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        Account.objects.create_user(username="etag2", password="x")
+        self.assertEqual(self.client.get('/api/accounts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import AccountsView
+from .views import AccountsView, ActivityMetricsView
 urlpatterns = [
     path('', AccountsView.as_view()),
     path('<int:account_id>', AccountsView.as_view()),
+    path('activity/metrics', ActivityMetricsView.as_view()),
 ]
\ No newline at end of file
@@ -1,19 +1,109 @@
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.views import APIView
-from accounts.models import Account
-from django.contrib.auth.hashers import make_password
-from rest_framework.permissions import AllowAny
+from accounts.models import ROLE_BITS, Account, role_mask_values
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.decorators import permission_classes
+from accounts.activity import get_activity_buffer
+from api.conditional import collection_validators, conditional, object_validators
+from api.pagination import after, decode_cursor, encode_cursor, next_link, parse_limit
+from authenticationAndAuthorization.hashing import get_hasher_pool
+from authenticationAndAuthorization.throttles import SignupIPThrottle
 # Create your views here.
 
 
+# Listing order; (created_at, pk) is unique, so it works as a keyset pagination cursor.
+LIST_ORDERING = ('created_at', 'pk')
+LIST_FIELDS = ('id', 'username', 'email')
+LIST_ALIASES = {
+    'firstName': F('first_name'),
+    'lastName': F('last_name'),
+    'createdAt': F('created_at'),
+    'updatedAt': F('updated_at'),
+}
+STREAM_CHUNK_SIZE = 2000
+
+
+def stream_ndjson(rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def list_queryset(request):
+    """Accounts after the request's cursor in listing order, and the page size. Raises ValueError on bad parameters."""
+    accounts = Account.objects.order_by(*LIST_ORDERING)
+    role = request.query_params.get("role")
+    if role:
+        if role not in ROLE_BITS:
+            raise ValueError(f"role must be one of {', '.join(ROLE_BITS)}.")
+        # IN over the masks holding the bit can use the role_mask index, a bitwise test could not
+        accounts = accounts.filter(role_mask__in=role_mask_values(role))
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        accounts = accounts.filter(after(LIST_ORDERING, decode_cursor(cursor, Account, LIST_ORDERING)))
+    return accounts, parse_limit(request.query_params.get("limit"))
+
+
+def accounts_validators(request, account_id=None):
+    if account_id:
+        row = Account.objects.filter(pk=account_id).values_list(
+            'updated_at', 'last_seen', 'default_profile_id', 'default_profile__profile_type'
+        ).first()
+        if row is None:
+            return None
+        # ETag only: last_seen (activity buffer), default_profile (profile views, SET_NULL) and its
+        # profile_type change without moving updated_at, so a Last-Modified from it would be stale
+        etag, _ = object_validators(*row)
+        return etag, None
+    if request.query_params.get("stream"):
+        return None
+    try:
+        accounts, limit = list_queryset(request)
+    except ValueError:
+        return None
+    # Same rows the page will hold, including the look-ahead row that decides the next link
+    page = Account.objects.filter(pk__in=accounts.values('pk')[:limit + 1])
+    return collection_validators(page, request.query_params.urlencode())
+
+
 @permission_classes([AllowAny])
 class AccountsView(APIView):
+    throttle_classes = [SignupIPThrottle]
+
+    def list(self, request):
+        """
+        Accounts in (createdAt, id) order, one page of `limit` at a time. The body stays the bare
+        array of accounts it always was; when more follow, a `Link: <...>; rel="next"` header
+        carries the URL of the next page. With `stream=ndjson` every account after the cursor
+        is streamed as newline-delimited JSON through a server-side cursor instead.
+        """
+        try:
+            accounts, limit = list_queryset(request)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        rows = accounts.values(*LIST_FIELDS, **LIST_ALIASES)
+
+        if request.query_params.get("stream") == "ndjson":
+            return StreamingHttpResponse(
+                stream_ndjson(rows.iterator(chunk_size=STREAM_CHUNK_SIZE)),
+                content_type="application/x-ndjson",
+            )
+
+        # One extra row tells whether another page exists without a COUNT
+        page = list(rows[:limit + 1])
+        response = JsonResponse(page[:limit], safe=False)
+        if len(page) > limit:
+            last = page[limit - 1]
+            response["Link"] = next_link(request, encode_cursor([last["createdAt"], last["id"]]))
+        return response
+
     def post(self, request):
         # Create a new account
         if request.data.get("password") == request.data.get("confirmPassword"):
-            password = make_password(request.data.get("password"))
+            password = get_hasher_pool().make_password(request.data.get("password"))
         else:
             return JsonResponse({"error": "Passwords do not match"}, status=400)
         
@@ -26,6 +116,7 @@ class AccountsView(APIView):
         )
         return JsonResponse({"id": account.id}, status=201)
     
+    @conditional(accounts_validators)
     def get(self, request, account_id=None):
         # Retrieve account(s)
         if account_id:
@@ -48,21 +139,7 @@ class AccountsView(APIView):
                 return JsonResponse(data)
             except Account.DoesNotExist:
                 return JsonResponse({"error": "Account not found"}, status=404)
-        else:
-            accounts = Account.objects.all()
-            data = [
-                {
-                    "id": account.id,
-                    "username": account.username,
-                    "email": account.email,
-                    "firstName": account.first_name,
-                    "lastName": account.last_name,
-                    "createdAt": account.created_at,
-                    "updatedAt": account.updated_at,
-                }
-                for account in accounts
-            ]
-            return JsonResponse(data, safe=False)
+        return self.list(request)
         
 
     def put(self, request, account_id):
@@ -104,3 +181,11 @@ class AccountsView(APIView):
             return JsonResponse({"message": "Account deleted successfully"})
         except Account.DoesNotExist:
             return JsonResponse({"error": "Account not found"}, status=404)
+
+
+class ActivityMetricsView(APIView):
+    """last_seen buffer metrics of the worker process that serves the request."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return JsonResponse(get_activity_buffer().metrics())
@@ -0,0 +1,68 @@
+"""
+Conditional GET support. A view declares a validator function that derives an ETag (and for
+single objects a Last-Modified time) from one cheap query on updated_at columns; when the
+client already holds that version the view answers 304 without loading or serializing anything.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    digest = hashlib.blake2b('|'.join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return quote_etag(digest)
+
+
+def object_validators(updated_at, *parts):
+    """(etag, last_modified) for one row, or None when it doesn't exist and the view should 404."""
+    if updated_at is None:
+        return None
+    return make_etag(updated_at.isoformat(), *parts), int(updated_at.timestamp())
+
+
+def collection_validators(queryset, *parts):
+    """
+    (etag, None) for a set of rows. The row count is part of the tag because a deletion does
+    not move max(updated_at); for the same reason no Last-Modified is sent for collections.
+    """
+    summary = queryset.order_by().aggregate(latest=Max('updated_at'), count=Count('pk'))
+    latest = summary['latest'].isoformat() if summary['latest'] else ''
+    return make_etag(latest, summary['count'], *parts), None
+
+
+def conditional(validator, vary=()):
+    """
+    Decorate a GET handler with `validator(request, **kwargs) -> (etag, last_modified) | None`.
+    None skips the conditional check, e.g. so the handler can produce its own 404 or 400.
+    `vary` names the request headers the body (and so the validator) depends on.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            response = conditional_response(self, request, *args, **kwargs)
+            if vary:
+                patch_vary_headers(response, vary)
+            return response
+
+        def conditional_response(self, request, *args, **kwargs):
+            validators = validator(request, **kwargs)
+            if validators is None:
+                return handler(self, request, *args, **kwargs)
+            etag, last_modified = validators
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return not_modified
+
+            response = handler(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified)
+                # Clients may keep the body but must revalidate before reusing it
+                response['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
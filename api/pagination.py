@@ -0,0 +1,87 @@
+"""
+Keyset (seek) pagination helpers. A cursor is the opaque, URL-safe encoding of the sort key of
+the last row on a page; the next page starts strictly after it, so deep pages cost the same as
+the first one and rows inserted meanwhile never shift or repeat results.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _default(value):
+    # Full precision on purpose: DjangoJSONEncoder drops microseconds, which would make the
+    # cursor land before rows sharing the same millisecond and repeat them on the next page.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), default=_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _sort_field(model, name):
+    """The model field a (possibly related, `a__b`) sort key name refers to."""
+    field = None
+    for part in name.split('__'):
+        field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+        if field.is_relation and field.related_model is not None:
+            model = field.related_model
+    return field
+
+
+def decode_cursor(cursor, model, fields):
+    """
+    Decode a cursor into one value per sort key in `fields` of `model`, each converted to its
+    field's type, raising InvalidCursor if the cursor is malformed or a value doesn't convert.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor.') from e
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor('Invalid cursor.')
+    try:
+        values = [_sort_field(model, name).to_python(value) for name, value in zip(fields, values)]
+    except (ValidationError, TypeError, ValueError) as e:
+        raise InvalidCursor('Invalid cursor.') from e
+    if None in values:
+        raise InvalidCursor('Invalid cursor.')
+    return values
+
+
+def after(fields, values):
+    """
+    Q for rows sorting strictly after `values` in ascending `fields` order, i.e. the row
+    comparison (f1, f2, ...) > (v1, v2, ...) spelled out so the ORM can express it.
+    """
+    condition = Q()
+    for i in reversed(range(len(fields))):
+        step = Q(**{f'{fields[i]}__gt': values[i]})
+        if i < len(fields) - 1:
+            step |= Q(**{fields[i]: values[i]}) & condition
+        condition = step
+    return condition
+
+
+def parse_limit(value, default=100, maximum=1000):
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer.') from None
+    return max(1, min(limit, maximum))
+
+
+def next_link(request, cursor):
+    """Link header value pointing at the page after `cursor`, keeping the request's other parameters."""
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
@@ -1,4 +1,28 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
 
+class APIMiddlewareStackTests(TestCase):
+    def test_api_requests_skip_browser_middleware(self):
+        response = self.client.get('/api/auth/jwks')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Frame-Options', response)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+        self.assertFalse(hasattr(response.wsgi_request, '_messages'))
+
+    def test_admin_keeps_full_stack(self):
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
+
+        csrf_client = self.client_class(enforce_csrf_checks=True)
+        response = csrf_client.post('/admin/login/', {'username': 'x', 'password': 'y'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_bench_middleware_command(self):
+        out = StringIO()
+        call_command('bench_middleware', iterations=5, stdout=out)
+        self.assertIn('us/request', out.getvalue())
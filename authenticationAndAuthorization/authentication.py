@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.models import Account
+
+
+class TokenPrincipal:
+    """
+    Lightweight request.user built from access token claims.
+    The Account row is only loaded when a view reads an attribute the token doesn't carry.
+    """
+    __slots__ = ('user_id', 'account_id', 'username', 'profile_types', 'token', 'roles', '_account')
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.user_id = int(token[api_settings.USER_ID_CLAIM])
+        self.account_id = token.get('account_id')
+        self.username = token.get('username', '')
+        self.profile_types = token.get('profile_types', [])
+        self.token = token
+        self.roles = set(self.profile_types)
+        self._account = None
+
+    @property
+    def pk(self):
+        return self.user_id
+
+    @property
+    def id(self):
+        return self.user_id
+
+    @property
+    def account(self):
+        """
+        The backing Account (or plain User when no account exists), loaded on first access.
+        A token outliving its user fails authentication like JWTAuthentication's own lookup.
+        """
+        if self._account is None:
+            account = (
+                Account.objects.filter(pk=self.user_id).first()
+                or get_user_model().objects.filter(pk=self.user_id).first()
+            )
+            if account is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self._account = account
+        return self._account
+
+    def __getattr__(self, name):
+        # Only reached for attributes missing from the slots above, e.g. email, groups, is_staff.
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.account, name)
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self.user_id
+
+    def __hash__(self):
+        return hash(self.user_id)
+
+    def __str__(self):
+        return self.username
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the signed token and skips the per-request auth_user lookup.
+    Deactivated users keep access until their current access token expires.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return TokenPrincipal(validated_token)
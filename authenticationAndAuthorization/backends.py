@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .hashing import get_hasher_pool
+
+
+class ResolvedAccountBackend(ModelBackend):
+    """
+    Authenticates an Account the login view already loaded, so the credentials check doesn't
+    look the user up a second time. Called as authenticate(request, account=..., password=...),
+    or with a username like ModelBackend for users the view couldn't resolve. Every password
+    check runs in the bounded hashing pool, including the dummy hash for unknown usernames.
+    """
+
+    def authenticate(self, request, account=None, password=None, **kwargs):
+        if password is None:
+            return None
+        if account is None:
+            UserModel = get_user_model()
+            username = kwargs.get(UserModel.USERNAME_FIELD, kwargs.get('username'))
+            if username is None:
+                return None
+            try:
+                account = UserModel._default_manager.get_by_natural_key(username)
+            except UserModel.DoesNotExist:
+                # Hash anyway so an unknown username takes as long as a wrong password
+                get_hasher_pool().make_password(password)
+                return None
+        if get_hasher_pool().check_password(account, password) and self.user_can_authenticate(account):
+            return account
+        return None
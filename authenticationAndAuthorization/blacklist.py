@@ -0,0 +1,181 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .caches import is_shared_cache
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings. No false negatives, false positives at roughly `error_rate`."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    """
+    Process-local blacklist membership test for refresh token JTIs.
+
+    A Bloom filter built from the BlacklistedToken table answers the common "not blacklisted"
+    case without a query; JTIs blacklisted by this process since the last rebuild are kept in an
+    exact set. Only Bloom filter hits fall through to the database.
+    """
+    # Entries added shortly before a rebuild may belong to transactions its snapshot didn't see
+    REBUILD_GRACE_SECONDS = 60
+
+    def __init__(self, rebuild_interval=300, error_rate=0.001):
+        self.rebuild_interval = rebuild_interval
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._bloom = None
+        self._built_at = 0.0
+        self._recent = {}
+
+    def rebuild(self):
+        started = time.monotonic()
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        bloom = BloomFilter(capacity=max(live.count() * 2, 1024), error_rate=self.error_rate)
+        for jti in live.values_list('token__jti', flat=True).iterator(chunk_size=10000):
+            bloom.add(jti)
+
+        with self._lock:
+            self._recent = {
+                jti: added_at for jti, added_at in self._recent.items()
+                if added_at >= started - self.REBUILD_GRACE_SECONDS
+            }
+            for jti in self._recent:
+                bloom.add(jti)
+            self._bloom = bloom
+            self._built_at = started
+
+    def _is_stale(self):
+        return self._bloom is None or time.monotonic() - self._built_at > self.rebuild_interval
+
+    def _ensure_built(self):
+        if not self._is_stale():
+            return
+        # One thread rebuilds; the others keep answering from the previous filter meanwhile and
+        # only wait when there is none yet
+        if not self._rebuild_lock.acquire(blocking=self._bloom is None):
+            return
+        try:
+            if self._is_stale():
+                self.rebuild()
+        finally:
+            self._rebuild_lock.release()
+
+    def add(self, jti, expires_at=None):
+        with self._lock:
+            self._recent[jti] = time.monotonic()
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def is_blacklisted(self, jti):
+        if jti in self._recent:
+            return True
+        self._ensure_built()
+        if jti not in self._bloom:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+class SharedBlacklistFilter(BlacklistFilter):
+    """
+    BlacklistFilter that also publishes additions to the shared cache, so a token blacklisted
+    on one worker is rejected by the others before their next rebuild.
+    """
+    KEY = 'auth:blacklisted:{jti}'
+
+    def add(self, jti, expires_at=None):
+        super().add(jti, expires_at)
+        if expires_at is not None:
+            timeout = max(int((expires_at - timezone.now()).total_seconds()), 1)
+        else:
+            timeout = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+        cache.set(self.KEY.format(jti=jti), True, timeout=timeout)
+
+    def is_blacklisted(self, jti):
+        if jti in self._recent or cache.get(self.KEY.format(jti=jti)):
+            return True
+        return super().is_blacklisted(jti)
+
+
+class DatabaseBlacklist:
+    """
+    Asks the BlacklistedToken table every time. Used when there is no shared cache: a filter
+    in one process can't learn of tokens other workers blacklisted until its next rebuild.
+    """
+
+    def add(self, jti, expires_at=None):
+        pass
+
+    def is_blacklisted(self, jti):
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+_filter = None
+_filter_lock = threading.Lock()
+_database_blacklist = DatabaseBlacklist()
+
+
+def get_blacklist_filter():
+    """The process-wide filter, built from the database on first use, or DatabaseBlacklist without a shared cache."""
+    global _filter
+    if not is_shared_cache():
+        return _database_blacklist
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                filter_class = SharedBlacklistFilter if settings.TOKEN_BLACKLIST_FILTER == 'shared' else BlacklistFilter
+                _filter = filter_class(rebuild_interval=settings.TOKEN_BLACKLIST_REBUILD_SECONDS)
+    return _filter
+
+
+def add_on_commit(entries):
+    """Add (jti, expires_at) pairs to the filter once the transaction blacklisting them commits."""
+    entries = list(entries)
+
+    def publish():
+        blacklist_filter = get_blacklist_filter()
+        for jti, expires_at in entries:
+            blacklist_filter.add(jti, expires_at)
+
+    transaction.on_commit(publish)
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check consults the in-memory filter before the database."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if get_blacklist_filter().is_blacklisted(jti):
+            raise TokenError(_("Token is blacklisted"))
@@ -0,0 +1,12 @@
+from django.conf import settings
+
+# Backends whose entries live in one process; state kept there is invisible to other workers
+PROCESS_LOCAL_BACKENDS = frozenset({
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+})
+
+
+def is_shared_cache(alias='default'):
+    """Whether every worker reads and writes the same entries through the `alias` cache."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
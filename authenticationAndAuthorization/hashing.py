@@ -0,0 +1,139 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+
+
+class HashingBusy(Throttled):
+    """Raised when the hashing queue is full; DRF turns it into a 429 with Retry-After."""
+    default_detail = _('Too many password checks are in progress. Try again shortly.')
+    default_code = 'hashing_busy'
+
+
+class HashingUnavailable(APIException):
+    """Raised when a hash doesn't finish in time or the pool keeps losing workers; a 503."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Password checks are temporarily unavailable. Try again shortly.')
+    default_code = 'hashing_unavailable'
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+class PasswordHasherPool:
+    """
+    Runs PBKDF2 (or whatever PASSWORD_HASHERS selects) in a small process pool.
+
+    At most `workers + queue_limit` hashes are in flight at once; further callers are rejected
+    immediately with HashingBusy instead of queueing behind a login burst and starving other
+    endpoints. With workers=0 hashing runs in the calling thread but the same bound applies.
+    """
+
+    def __init__(self, workers, queue_limit, retry_after=1, timeout=30):
+        self.workers = workers
+        self.retry_after = retry_after
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_limit) if workers + queue_limit > 0 else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking a threaded server process can deadlock the child
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                    )
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken executor so the next call starts fresh workers, unless another thread already did."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, func, *args):
+        # A worker killed by the OS (e.g. the OOM killer) breaks the whole pool; retry once on a new one
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return executor.submit(func, *args).result(timeout=self.timeout)
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+            except TimeoutError:
+                raise HashingUnavailable() from None
+        raise HashingUnavailable()
+
+    def _run(self, func, *args):
+        if self._slots is None or not self._slots.acquire(blocking=False):
+            raise HashingBusy(wait=self.retry_after)
+        try:
+            if self.workers == 0:
+                return func(*args)
+            return self._submit(func, *args)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def make_password(self, raw_password):
+        return self._run(hashers.make_password, raw_password)
+
+    def make_passwords(self, raw_passwords, chunksize=8):
+        """
+        Hash a batch, spread over all workers. For offline jobs such as imports: the batch owns
+        the pool, so the per-request admission bound does not apply.
+        """
+        if self.workers == 0:
+            return [hashers.make_password(raw_password) for raw_password in raw_passwords]
+        executor = self._get_executor()
+        try:
+            return list(executor.map(hashers.make_password, raw_passwords, chunksize=chunksize))
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise
+
+    def verify_password(self, raw_password, encoded):
+        """Return (is_correct, must_update) like django.contrib.auth.hashers.verify_password."""
+        return self._run(hashers.verify_password, raw_password, encoded)
+
+    def check_password(self, user, raw_password):
+        """Offloaded equivalent of user.check_password(), including the hash upgrade on success."""
+        is_correct, must_update = self.verify_password(raw_password, user.password)
+        if is_correct and must_update:
+            user.password = self.make_password(raw_password)
+            user.save(update_fields=['password'])
+        return is_correct
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hasher_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHasherPool(
+                    workers=settings.PASSWORD_HASHING_WORKERS,
+                    queue_limit=settings.PASSWORD_HASHING_QUEUE_LIMIT,
+                    retry_after=settings.PASSWORD_HASHING_RETRY_AFTER,
+                )
+    return _pool
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class SigningKey:
+    """One entry of the key ring: a private key identified by `kid` and the JWS algorithm it signs with."""
+
+    def __init__(self, kid, private_key):
+        self.kid = kid
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        if isinstance(private_key, rsa.RSAPrivateKey):
+            self.algorithm = 'RS256'
+        elif isinstance(private_key, ed25519.Ed25519PrivateKey):
+            self.algorithm = 'EdDSA'
+        else:
+            raise ValueError(f"Unsupported key type for {kid}: only RSA and Ed25519 keys can sign tokens.")
+
+    def to_jwk(self):
+        algorithm = RSAAlgorithm if self.algorithm == 'RS256' else OKPAlgorithm
+        jwk = algorithm.to_jwk(self.public_key, as_dict=True)
+        jwk.update({'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'})
+        return jwk
+
+
+class KeyRing:
+    """
+    Signing keys loaded from `<directory>/<kid>.pem`. The active key signs new tokens; every key
+    in the ring still verifies, so a rotated-out key keeps working until its file is removed.
+    Kids sort chronologically (see generate_signing_key), so the newest key is active by default.
+    """
+
+    def __init__(self, directory, active_kid=None):
+        self.keys = {}
+        for path in sorted(Path(directory).glob('*.pem')):
+            private_key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+            self.keys[path.stem] = SigningKey(path.stem, private_key)
+        if active_kid and active_kid not in self.keys:
+            raise ValueError(f"JWT_ACTIVE_KID {active_kid!r} is not in {directory}.")
+        self.active = self.keys[active_kid or max(self.keys)] if self.keys else None
+        self.jwks = {'keys': [key.to_jwk() for key in self.keys.values()]}
+
+    def __bool__(self):
+        return self.active is not None
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    simplejwt TokenBackend that signs with the key ring's active key and puts its id in the `kid`
+    header, then verifies by looking that id up. Tokens without a kid are HS256 tokens issued
+    before the switch and are accepted with SECRET_KEY while JWT_ACCEPT_LEGACY_HS256 is on.
+    """
+
+    def __init__(self, key_ring, accept_legacy_hs256=True):
+        super().__init__(
+            key_ring.active.algorithm,
+            audience=api_settings.AUDIENCE,
+            issuer=api_settings.ISSUER,
+            leeway=api_settings.LEEWAY,
+            json_encoder=api_settings.JSON_ENCODER,
+        )
+        self.key_ring = key_ring
+        self.accept_legacy_hs256 = accept_legacy_hs256
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        active = self.key_ring.active
+        return jwt.encode(
+            jwt_payload,
+            active.private_key,
+            algorithm=active.algorithm,
+            headers={'kid': active.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def _resolve_key(self, token):
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+
+        kid = header.get('kid')
+        if kid is None and self.accept_legacy_hs256 and header.get('alg') == 'HS256':
+            return api_settings.SIGNING_KEY, 'HS256'
+        key = self.key_ring.get(kid)
+        if key is None:
+            raise TokenBackendError(_("Token is invalid"))
+        return key.public_key, key.algorithm
+
+    def decode(self, token, verify=True):
+        verifying_key, algorithm = self._resolve_key(token)
+        try:
+            return jwt.decode(
+                token,
+                verifying_key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    'verify_aud': self.audience is not None,
+                    'verify_signature': verify,
+                },
+            )
+        except jwt.ExpiredSignatureError as e:
+            raise TokenBackendExpiredToken(_("Token is expired")) from e
+        except jwt.InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+
+
+_key_ring = None
+
+
+def get_key_ring():
+    global _key_ring
+    if _key_ring is None:
+        _key_ring = KeyRing(settings.JWT_SIGNING_KEYS_DIR, settings.JWT_ACTIVE_KID)
+    return _key_ring
+
+
+def install_token_backend():
+    """Swap simplejwt's shared TokenBackend for the key ring one when signing keys are configured."""
+    key_ring = get_key_ring()
+    if key_ring:
+        from rest_framework_simplejwt import state
+        state.token_backend = KeyRingTokenBackend(key_ring, settings.JWT_ACCEPT_LEGACY_HS256)
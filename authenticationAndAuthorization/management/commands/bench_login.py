@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import Account
+from profiles.models import Profile
+from authenticationAndAuthorization.views import AccountLoginView
+
+
+class Command(BaseCommand):
+    help = "Measure queries and latency per login through AccountLoginView. All writes are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--by', choices=['email', 'username'], default='email')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        view = AccountLoginView.as_view()
+        iterations = options['iterations']
+
+        with transaction.atomic():
+            account = Account.objects.create_user(
+                username='bench-login', email='Bench.Login@example.com', password='bench-pass-1234'
+            )
+            Profile.objects.create(account=account, profile_type='trainee')
+            credentials = {'password': 'bench-pass-1234'}
+            if options['by'] == 'email':
+                credentials['email'] = 'bench.login@example.com'
+            else:
+                credentials['username'] = 'bench-login'
+
+            total_queries = 0
+            started = time.perf_counter()
+            for _ in range(iterations):
+                request = factory.post('/api/auth/login', credentials, format='json')
+                with CaptureQueriesContext(connection) as queries:
+                    response = view(request)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Login failed with {response.status_code}: {response.data}")
+                total_queries += len(queries.captured_queries)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{iterations} logins by {options['by']}: "
+            f"{total_queries / iterations:.1f} queries/login, {elapsed / iterations * 1000:.1f} ms/login"
+        )
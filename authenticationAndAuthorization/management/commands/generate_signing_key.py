@@ -0,0 +1,41 @@
+import os
+import secrets
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a new JWT signing key in JWT_SIGNING_KEYS_DIR. The newest key signs new tokens "
+        "after the next restart; older keys keep verifying until their files are deleted, "
+        "which is safe once REFRESH_TOKEN_LIFETIME has passed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithm', choices=['RS256', 'EdDSA'], default='RS256')
+        parser.add_argument('--key-size', type=int, default=2048, help='RSA modulus size in bits.')
+
+    def handle(self, *args, **options):
+        if options['algorithm'] == 'RS256':
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=options['key_size'])
+        else:
+            private_key = ed25519.Ed25519PrivateKey.generate()
+
+        directory = Path(settings.JWT_SIGNING_KEYS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Timestamp prefix keeps kids in creation order, which is how the key ring picks the active key
+        kid = f"{timezone.now():%Y%m%d%H%M%S%f}-{secrets.token_hex(4)}"
+        path = directory / f"{kid}.pem"
+        path.write_bytes(private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ))
+        os.chmod(path, 0o600)
+
+        self.stdout.write(self.style.SUCCESS(f"Created {options['algorithm']} signing key {kid} at {path}"))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding tokens and their blacklist entries in small batches. "
+        "Unlike simplejwt's flushexpiredtokens, each batch is its own short transaction, "
+        "so it is safe to run against very large token tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tokens deleted per transaction.')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many tokens would be deleted.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        cutoff = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} expired tokens would be deleted.")
+            return
+
+        deleted_tokens = deleted_blacklisted = 0
+        started = time.monotonic()
+        while True:
+            with transaction.atomic():
+                ids = list(expired.order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                # Delete the blacklist rows explicitly so the cascade never has to collect them
+                blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                tokens, _ = OutstandingToken.objects.filter(pk__in=ids).delete()
+            deleted_blacklisted += blacklisted
+            deleted_tokens += tokens
+            rate = deleted_tokens / max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f"Deleted {deleted_tokens} outstanding / {deleted_blacklisted} blacklisted tokens "
+                f"({rate:.0f} tokens/s)"
+            )
+            if len(ids) < batch_size:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted_tokens} outstanding and {deleted_blacklisted} blacklisted tokens expired before {cutoff.isoformat()}."
+        ))
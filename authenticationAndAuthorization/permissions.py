@@ -1,11 +1,13 @@
-from accounts.models import Account
 from rest_framework.permissions import BasePermission
 
+from .roles import resolve_roles
+
 class IsAuthenticatedAndHasRole(BasePermission):
     """
     DRF permission class to check if user is authenticated and has one of the required roles.
     Set `required_roles` attribute on the view to specify allowed roles.
     If no roles specified, only authentication is required.
+    Roles come from the token's profile_types claim unless the account's roles changed since it was issued.
     """
     def has_permission(self, request, view):
         user = request.user
@@ -16,11 +18,7 @@ class IsAuthenticatedAndHasRole(BasePermission):
         if not allowed_roles:
             return True  # Only authentication required
 
-        account = Account.objects.filter(pk=getattr(user, 'pk', None)).first()
-        if account:
-            user_roles = set(account.profiles.values_list('profile_type', flat=True))
-        else:
-            user_roles = set(user.groups.values_list('name', flat=True))
+        user_roles = resolve_roles(request)
 
         try:
             user.roles = user_roles
@@ -41,13 +39,9 @@ def HasRole(allowed_roles):
             if not user or not user.is_authenticated:
                 return False
 
-            account = Account.objects.filter(pk=getattr(user, 'pk', None)).first()
-            if account:
-                user_roles = set(account.profiles.values_list('profile_type', flat=True))
-            else:
-                user_roles = set(user.groups.values_list('name', flat=True))
+            user_roles = resolve_roles(request)
             
             roles = allowed_roles if isinstance(allowed_roles, list) else [allowed_roles]
             return bool(user_roles.intersection(set(roles)))
     
-    return _HasRole
\ No newline at end of file
+    return _HasRole
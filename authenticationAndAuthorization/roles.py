@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from accounts.models import Account, AccountProjection, mask_roles
+from profiles.models import Profile
+from .caches import is_shared_cache
+
+ROLE_VERSION_CLAIM = 'role_version'
+ROLE_VERSION_KEY = 'auth:role_version:{account_id}'
+PROFILE_TYPES_KEY = 'auth:profile_types:{account_id}:{version}'
+ROLE_MASK_KEY = 'auth:role_mask:{account_id}:{version}'
+PROFILE_TYPES_TIMEOUT = 60 * 60 * 24
+ROLE_VERSION_TIMEOUT = 60 * 60
+
+
+def get_role_version(account_id):
+    """
+    Current role version of an account, or None when there is no such account. The database
+    row is authoritative; the cache only saves reading it, so an evicted or never-written key
+    costs a query instead of passing for "unchanged".
+    """
+    if account_id is None:
+        return None
+    key = ROLE_VERSION_KEY.format(account_id=account_id)
+    version = cache.get(key)
+    if version is None:
+        version = Account.objects.filter(pk=account_id).values_list('role_version', flat=True).first()
+        if version is not None:
+            # add(), not set(): a bump that committed meanwhile has already written a newer value
+            cache.add(key, version, timeout=ROLE_VERSION_TIMEOUT)
+    return version
+
+
+def bump_role_version(account_id):
+    """
+    Invalidate the profile_types claim of every token issued to the account so far. Called
+    whenever a profile is created, changed or deleted, inside the transaction making the change.
+    """
+    key = ROLE_VERSION_KEY.format(account_id=account_id)
+    Account.objects.filter(pk=account_id).update(role_version=F('role_version') + 1)
+    cache.delete(key)
+
+    def publish():
+        # Readers may have cached the pre-commit version meanwhile; overwrite it with the committed one
+        version = Account.objects.filter(pk=account_id).values_list('role_version', flat=True).first()
+        if version is None:
+            cache.delete(key)
+            return
+        cache.set(key, version, timeout=ROLE_VERSION_TIMEOUT)
+        # Roles read inside the transaction may have been cached under the new version
+        cache.delete_many([
+            PROFILE_TYPES_KEY.format(account_id=account_id, version=version),
+            ROLE_MASK_KEY.format(account_id=account_id, version=version),
+        ])
+
+    transaction.on_commit(publish)
+
+
+def get_profile_types(account_id, version=None):
+    """
+    Profile types of an account, cached under its current role version. A role change bumps the
+    version, so the old entry is simply never read again and expires on its own.
+    """
+    if version is None:
+        version = get_role_version(account_id)
+    key = PROFILE_TYPES_KEY.format(account_id=account_id, version=version)
+    profile_types = cache.get(key)
+    if profile_types is None:
+        profile_types = AccountProjection.objects.filter(pk=account_id).values_list('profile_types', flat=True).first()
+        if profile_types is None:
+            # No projection row (not an account, or not synced yet): ask the profiles table
+            profile_types = list(Profile.objects.filter(account_id=account_id).values_list('profile_type', flat=True))
+        cache.set(key, profile_types, timeout=PROFILE_TYPES_TIMEOUT)
+    return profile_types
+
+
+def get_role_mask(account_id, version=None):
+    """
+    Account.role_mask, or None when there is no such account. Cached under the role version like
+    get_profile_types; the profile signals bump the version in the same transaction that updates the mask.
+    """
+    if version is None:
+        version = get_role_version(account_id)
+    if version is None:
+        return None
+    key = ROLE_MASK_KEY.format(account_id=account_id, version=version)
+    mask = cache.get(key)
+    if mask is None:
+        mask = Account.objects.filter(pk=account_id).values_list('role_mask', flat=True).first()
+        if mask is not None:
+            cache.set(key, mask, timeout=PROFILE_TYPES_TIMEOUT)
+    return mask
+
+
+def get_token_roles(token):
+    """
+    Return the roles carried by a validated token, or None when the claim can't be trusted
+    (claims missing, trusting disabled, or the account's roles changed since the token was minted).
+    A per-process cache can't carry another worker's bump, so claims are only trusted with a
+    shared one.
+    """
+    if token is None or not getattr(settings, 'ROLES_FROM_TOKEN', False) or not is_shared_cache():
+        return None
+    profile_types = token.get('profile_types')
+    account_id = token.get('account_id')
+    version = token.get(ROLE_VERSION_CLAIM)
+    if profile_types is None or account_id is None or version is None:
+        return None
+    if version != get_role_version(account_id):
+        return None
+    return set(profile_types)
+
+
+def resolve_roles(request):
+    """Roles of the authenticated user, from the token when possible and Account.role_mask otherwise."""
+    token = getattr(request, 'auth', None)
+    roles = get_token_roles(token)
+    if roles is not None:
+        return roles
+
+    account_id = token.get('account_id') if token is not None else None
+    if account_id is None:
+        account_id = getattr(request.user, 'pk', None)
+    mask = get_role_mask(account_id) if account_id is not None else None
+    if mask is not None:
+        return mask_roles(mask)
+    # Not an account (e.g. a bare staff user): fall back to its groups
+    return set(request.user.groups.values_list('name', flat=True))
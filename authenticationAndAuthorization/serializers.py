@@ -1,23 +1,85 @@
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
-from django.contrib.auth import get_user_model
-from accounts.models import Account
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.models import update_last_login
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Q, Value
+from django.utils.translation import gettext_lazy as _
+from accounts.models import Account, AccountProjection
+from .blacklist import FilteredRefreshToken
+from .roles import ROLE_VERSION_CLAIM, get_profile_types, get_role_version
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    # Set by the view when it already resolved the account (e.g. login by email)
+    login_account = None
+
+    @staticmethod
+    def get_login_accounts(**lookup):
+        """
+        Up to two accounts matching a login identifier, each annotated with its profile types.
+        One indexed query serves authentication, token claims and the response; role_version
+        comes from the same row, so it always matches the profile types read with it.
+        """
+        return list(
+            Account.objects.filter(**lookup).annotate(
+                profile_type_list=ArrayAgg(
+                    'profiles__profile_type',
+                    filter=Q(profiles__isnull=False),
+                    default=Value([]),
+                ),
+            )[:2]
+        )
+
+    def validate(self, attrs):
+        account = self.login_account
+        if account is None:
+            accounts = self.get_login_accounts(username=attrs[self.username_field])
+            account = accounts[0] if accounts else None
+
+        credentials = {'password': attrs['password'], 'request': self.context.get('request')}
+        if account is not None:
+            credentials['account'] = account
+        else:
+            credentials[self.username_field] = attrs[self.username_field]
+        self.user = authenticate(**credentials)
+
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise exceptions.AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+
+        refresh = self.get_token(self.user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+        return data
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
 
-        # Resolve Account from the authenticated user (Account extends User via multi-table inheritance)
-        account = Account.objects.filter(pk=user.pk).first()
-
         # Add custom claims
         token['username'] = user.username
         token['email'] = user.email
+
+        if hasattr(user, 'profile_type_list'):
+            # Loaded by get_login_accounts
+            token['account_id'] = user.pk
+            token[ROLE_VERSION_CLAIM] = user.role_version
+            token['profile_types'] = list(user.profile_type_list)
+            return token
+
+        # Resolve the account from the authenticated user through the single-table projection
+        account = AccountProjection.objects.filter(pk=user.pk).only('pk').first()
         if account is not None:
             token['account_id'] = account.pk
-            token['profile_types'] = list(account.profiles.values_list('profile_type', flat=True))
+            # Read the version before the roles so a concurrent role change can only make the claim stale
+            version = get_role_version(account.pk)
+            token[ROLE_VERSION_CLAIM] = version
+            token['profile_types'] = get_profile_types(account.pk, version)
         else:
             token['account_id'] = None
             token['profile_types'] = []
@@ -26,25 +88,47 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 
 class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    def check_user(self, exists, is_active):
+        """Refuse refresh tokens of deleted or deactivated users with a 401, like login does."""
+        if not exists:
+            raise exceptions.AuthenticationFailed(_('User not found'), 'user_not_found')
+        if not is_active:
+            raise exceptions.AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
     def validate(self, headers):
         refresh_token = headers.get('refresh')
         if not refresh_token:
             raise serializers.ValidationError({'detail': 'refresh token is required'})
         try:
-            refresh = RefreshToken(refresh_token)
+            refresh = FilteredRefreshToken(refresh_token)
         except Exception:
             raise serializers.ValidationError({'detail': 'Invalid or blacklisted token'})
 
-        # Rebuild access token from current DB state
-        user_id = refresh.get('user_id') or refresh.get('sub')
-        user = get_user_model().objects.get(pk=user_id)
-        account = Account.objects.filter(pk=user.pk).first()
+        if 'username' in refresh and refresh.get('account_id') is not None:
+            # Identity claims were set at login; carry them over without touching auth_user, but
+            # make sure the account still exists and may log in, from its single-table projection
+            account_id = refresh['account_id']
+            is_active = AccountProjection.objects.filter(pk=account_id).values_list('is_active', flat=True).first()
+            self.check_user(is_active is not None, is_active)
+            access = refresh.access_token
+        else:
+            # Token minted without our custom claims, or for a plain user: rebuild them from the database
+            user_id = refresh.get('user_id') or refresh.get('sub')
+            user = get_user_model().objects.filter(pk=user_id).first()
+            self.check_user(user is not None, user is not None and user.is_active)
+            account = AccountProjection.objects.filter(pk=user.pk).only('pk').first()
+            access = AccessToken.for_user(user)
+            access['username'] = user.username
+            access['email'] = user.email
+            access['account_id'] = account_id = account.pk if account else None
 
-        access = AccessToken.for_user(user)
-        access['username'] = user.username
-        access['email'] = user.email
-        access['account_id'] = account.pk if account else None
-        access['profile_types'] = list(account.profiles.values_list('profile_type', flat=True)) if account else []
+        # Roles always reflect the current state, served from the versioned profile-types cache
+        if account_id is not None:
+            version = get_role_version(account_id)
+            access[ROLE_VERSION_CLAIM] = version
+            access['profile_types'] = get_profile_types(account_id, version)
+        else:
+            access['profile_types'] = []
 
         return {
             'access': str(access),
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from profiles.models import Profile
+from .blacklist import add_on_commit
+from .roles import bump_role_version
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_token_roles(sender, instance, **kwargs):
+    bump_role_version(instance.account_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    # Only once it commits: a rolled back blacklisting must not reject the token
+    if created:
+        add_on_commit([(instance.token.jti, instance.token.expires_at)])
@@ -0,0 +1,24 @@
+import uuid
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+
+
+class SharedLocMemCache(LocMemCache):
+    """
+    Stands in for Redis in tests. The test run is one process, so local memory is shared by
+    everything in it; a distinct class keeps it out of caches.PROCESS_LOCAL_BACKENDS.
+    """
+
+
+class IsolatedCacheMixin:
+    """Runs every test against its own empty shared cache, so no state leaks between tests."""
+
+    def setUp(self):
+        override = override_settings(CACHES={'default': {
+            'BACKEND': 'authenticationAndAuthorization.tests.caches.SharedLocMemCache',
+            'LOCATION': f'test-{uuid.uuid4()}',
+        }})
+        override.enable()
+        self.addCleanup(override.disable)
+        super().setUp()
@@ -0,0 +1,54 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from profiles.models import Profile
+from authenticationAndAuthorization.authentication import StatelessJWTAuthentication, TokenPrincipal
+from authenticationAndAuthorization.serializers import MyTokenObtainPairSerializer
+
+
+class StatelessJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.account = Account.objects.create_user(
+            username="erin",
+            email="erin@example.com",
+            password="pass1234",
+        )
+        Profile.objects.create(account=self.account, profile_type="trainee")
+        self.access = MyTokenObtainPairSerializer.get_token(self.account).access_token
+
+    def test_principal_is_built_from_claims(self):
+        with self.assertNumQueries(0):
+            principal = StatelessJWTAuthentication().get_user(self.access)
+
+        self.assertIsInstance(principal, TokenPrincipal)
+        self.assertEqual(principal.pk, self.account.pk)
+        self.assertEqual(principal.account_id, self.account.pk)
+        self.assertEqual(principal.username, "erin")
+        self.assertListEqual(principal.profile_types, ["trainee"])
+        self.assertTrue(principal.is_authenticated)
+
+    def test_account_is_loaded_lazily(self):
+        principal = StatelessJWTAuthentication().get_user(self.access)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(principal.email, "erin@example.com")
+            self.assertTrue(principal.is_active)
+
+    def test_deleted_user_fails_authentication(self):
+        principal = StatelessJWTAuthentication().get_user(self.access)
+        self.account.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            principal.account
+
+    def test_read_endpoint_runs_without_auth_queries(self):
+        url = reverse("courses-get-courses-for-trainees")
+
+        # Only the course listing and its conditional GET validator hit the database
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
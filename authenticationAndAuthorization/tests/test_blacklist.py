@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Account
+from authenticationAndAuthorization import blacklist
+from authenticationAndAuthorization.blacklist import (
+    BlacklistFilter,
+    FilteredRefreshToken,
+    BloomFilter,
+    SharedBlacklistFilter,
+    get_blacklist_filter,
+)
+from authenticationAndAuthorization.serializers import MyTokenRefreshSerializer
+from authenticationAndAuthorization.tests.caches import IsolatedCacheMixin
+
+
+class BloomFilterTests(TestCase):
+    def test_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class BlacklistFilterTests(IsolatedCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.account = Account.objects.create_user(username="gina", password="pass1234")
+
+    def test_refresh_skips_blacklist_table_for_live_tokens(self):
+        refresh = RefreshToken.for_user(self.account)
+        get_blacklist_filter().rebuild()
+
+        with CaptureQueriesContext(connection) as queries:
+            MyTokenRefreshSerializer().validate({"refresh": str(refresh)})
+
+        self.assertFalse(any("token_blacklist_blacklistedtoken" in q["sql"] for q in queries.captured_queries))
+
+    def test_rebuild_loads_existing_blacklist(self):
+        refresh = RefreshToken.for_user(self.account)
+        refresh.blacklist()
+        blacklist_filter = BlacklistFilter()
+        blacklist_filter.rebuild()
+
+        self.assertTrue(blacklist_filter.is_blacklisted(refresh["jti"]))
+        with self.assertNumQueries(0):
+            self.assertFalse(blacklist_filter.is_blacklisted("never-issued"))
+
+    def test_blacklisting_updates_filter_without_database_hit(self):
+        refresh = RefreshToken.for_user(self.account)
+        token = OutstandingToken.objects.get(jti=refresh["jti"])
+        with self.captureOnCommitCallbacks(execute=True):
+            BlacklistedToken.objects.create(token=token)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(get_blacklist_filter().is_blacklisted(refresh["jti"]))
+
+    def test_shared_filter_is_seen_by_other_workers(self):
+        worker_a, worker_b = SharedBlacklistFilter(), SharedBlacklistFilter()
+        worker_b.rebuild()
+
+        worker_a.add("shared-jti")
+
+        with self.assertNumQueries(0):
+            self.assertTrue(worker_b.is_blacklisted("shared-jti"))
+
+    def test_rolled_back_blacklisting_leaves_filter_alone(self):
+        refresh = RefreshToken.for_user(self.account)
+        token = OutstandingToken.objects.get(jti=refresh["jti"])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                BlacklistedToken.objects.create(token=token)
+                raise RuntimeError()
+
+        self.assertListEqual(callbacks, [])
+        self.assertFalse(get_blacklist_filter().is_blacklisted(refresh["jti"]))
+
+    def test_process_local_cache_checks_the_table(self):
+        refresh = RefreshToken.for_user(self.account)
+        token = OutstandingToken.objects.get(jti=refresh["jti"])
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local):
+            blacklist_filter = get_blacklist_filter()
+            self.assertFalse(blacklist_filter.is_blacklisted(refresh["jti"]))
+            # Blacklisted by another worker: no on-commit hook ran in this process
+            BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token)])
+            self.assertTrue(blacklist_filter.is_blacklisted(refresh["jti"]))
+            with self.assertRaises(TokenError):
+                FilteredRefreshToken(str(refresh))
+
+    def test_shared_mode_with_shared_cache(self):
+        with mock.patch.object(blacklist, "_filter", None):
+            self.assertIsInstance(get_blacklist_filter(), SharedBlacklistFilter)
+
+    def test_concurrent_requests_keep_the_stale_filter_while_one_rebuilds(self):
+        blacklist_filter = BlacklistFilter(rebuild_interval=0)
+        blacklist_filter.rebuild()
+        with blacklist_filter._rebuild_lock, self.assertNumQueries(0):
+            self.assertFalse(blacklist_filter.is_blacklisted("never-issued"))
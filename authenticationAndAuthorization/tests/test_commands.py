@@ -0,0 +1,48 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from accounts.models import Account
+
+
+class PruneTokensCommandTests(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create_user(username="frank", password="pass1234")
+        now = timezone.now()
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                user=self.account,
+                jti=f"expired-{i}",
+                token="x",
+                created_at=now - timedelta(days=3),
+                expires_at=now - timedelta(days=1),
+            )
+            if i % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+        self.live = OutstandingToken.objects.create(
+            user=self.account,
+            jti="live",
+            token="x",
+            created_at=now,
+            expires_at=now + timedelta(days=1),
+        )
+        BlacklistedToken.objects.create(token=self.live)
+
+    def test_deletes_only_expired_tokens_in_batches(self):
+        out = StringIO()
+        call_command("prune_tokens", "--batch-size", "2", stdout=out)
+
+        self.assertListEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), ["live"])
+        self.assertEqual(BlacklistedToken.objects.get().token_id, self.live.pk)
+        self.assertIn("Pruned 5 outstanding and 3 blacklisted tokens", out.getvalue())
+
+    def test_dry_run_deletes_nothing(self):
+        out = StringIO()
+        call_command("prune_tokens", "--dry-run", stdout=out)
+
+        self.assertEqual(OutstandingToken.objects.count(), 6)
+        self.assertIn("5 expired tokens would be deleted", out.getvalue())
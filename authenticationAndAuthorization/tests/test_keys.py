@@ -0,0 +1,150 @@
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import jwt
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt import state
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import Account
+from authenticationAndAuthorization.keys import KeyRing, KeyRingTokenBackend
+
+
+class KeyRingTestCase(TestCase):
+    def setUp(self):
+        self.keys_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.keys_dir)
+        overrider = override_settings(JWT_SIGNING_KEYS_DIR=self.keys_dir)
+        overrider.enable()
+        self.addCleanup(overrider.disable)
+
+    def generate(self, algorithm='RS256'):
+        out = StringIO()
+        call_command('generate_signing_key', algorithm=algorithm, stdout=out)
+        return Path(out.getvalue().split(' at ')[-1].strip()).stem
+
+    def install(self, key_ring, accept_legacy_hs256=True):
+        backend = KeyRingTokenBackend(key_ring, accept_legacy_hs256)
+        patcher = mock.patch.object(state, 'token_backend', backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return backend
+
+
+class KeyRingTests(KeyRingTestCase):
+    def test_empty_directory_gives_empty_ring(self):
+        ring = KeyRing(self.keys_dir)
+        self.assertFalse(ring)
+        self.assertEqual(ring.jwks, {'keys': []})
+
+    def test_missing_directory_gives_empty_ring(self):
+        self.assertFalse(KeyRing(Path(self.keys_dir) / 'absent'))
+
+    def test_newest_key_is_active_unless_pinned(self):
+        first = self.generate()
+        second = self.generate('EdDSA')
+        self.assertEqual(KeyRing(self.keys_dir).active.kid, max(first, second))
+        self.assertEqual(KeyRing(self.keys_dir, active_kid=first).active.kid, first)
+
+    def test_unknown_active_kid_is_rejected(self):
+        self.generate()
+        with self.assertRaises(ValueError):
+            KeyRing(self.keys_dir, active_kid='nope')
+
+    def test_jwks_lists_public_keys_only(self):
+        rsa_kid = self.generate()
+        ed_kid = self.generate('EdDSA')
+        jwks = {key['kid']: key for key in KeyRing(self.keys_dir).jwks['keys']}
+        self.assertEqual(jwks[rsa_kid]['alg'], 'RS256')
+        self.assertEqual(jwks[ed_kid]['alg'], 'EdDSA')
+        for key in jwks.values():
+            self.assertNotIn('d', key)
+
+
+class KeyRingTokenBackendTests(KeyRingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.account = Account.objects.create_user(username="kim", password="pass1234")
+
+    def test_tokens_carry_kid_and_verify_with_published_key(self):
+        kid = self.generate()
+        self.install(KeyRing(self.keys_dir))
+        token = str(AccessToken.for_user(self.account))
+
+        self.assertEqual(jwt.get_unverified_header(token)['kid'], kid)
+        jwk = KeyRing(self.keys_dir).jwks['keys'][0]
+        public_key = jwt.PyJWK(jwk).key
+        payload = jwt.decode(token, public_key, algorithms=['RS256'])
+        self.assertEqual(payload['user_id'], str(self.account.pk))
+
+    def test_rotated_out_key_still_verifies(self):
+        old = self.generate()
+        self.install(KeyRing(self.keys_dir))
+        token = str(AccessToken.for_user(self.account))
+
+        self.generate('EdDSA')
+        ring = KeyRing(self.keys_dir)
+        self.assertNotEqual(ring.active.kid, old)
+        self.install(ring)
+        self.assertEqual(AccessToken(token)['user_id'], str(self.account.pk))
+
+    def test_removed_key_no_longer_verifies(self):
+        old = self.generate()
+        self.install(KeyRing(self.keys_dir))
+        token = str(AccessToken.for_user(self.account))
+
+        self.generate()
+        (Path(self.keys_dir) / f'{old}.pem').unlink()
+        backend = self.install(KeyRing(self.keys_dir))
+        with self.assertRaises(TokenBackendError):
+            backend.decode(token)
+
+    def test_legacy_hs256_tokens(self):
+        legacy = str(AccessToken.for_user(self.account))
+        self.generate()
+        ring = KeyRing(self.keys_dir)
+
+        self.install(ring)
+        self.assertEqual(AccessToken(legacy)['user_id'], str(self.account.pk))
+
+        backend = self.install(ring, accept_legacy_hs256=False)
+        with self.assertRaises(TokenBackendError):
+            backend.decode(legacy)
+
+    def test_hs256_token_with_public_key_kid_is_rejected(self):
+        # The key named by kid decides the algorithm, so an HS256 token naming an RSA key fails
+        kid = self.generate()
+        backend = self.install(KeyRing(self.keys_dir))
+        forged = jwt.encode({'user_id': '1'}, 'forged-secret', algorithm='HS256', headers={'kid': kid})
+        with self.assertRaises(TokenBackendError):
+            backend.decode(forged)
+
+    def test_authenticated_request_with_signed_token(self):
+        self.generate('EdDSA')
+        self.install(KeyRing(self.keys_dir))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.account)}')
+        response = client.get(reverse('courses-get-courses-for-trainees'))
+        self.assertNotIn(response.status_code, (401, 403))
+
+
+class JWKSViewTests(KeyRingTestCase):
+    def test_serves_key_ring_without_authentication(self):
+        kid = self.generate()
+        with mock.patch('authenticationAndAuthorization.views.get_key_ring', return_value=KeyRing(self.keys_dir)):
+            response = APIClient().get(reverse('jwks'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([key['kid'] for key in response.json()['keys']], [kid])
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_default_backend_is_untouched_without_keys(self):
+        self.assertIsInstance(state.token_backend, TokenBackend)
+        self.assertNotIsInstance(state.token_backend, KeyRingTokenBackend)
@@ -0,0 +1,114 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import Account
+from profiles.models import Profile
+from authenticationAndAuthorization.permissions import HasRole
+from authenticationAndAuthorization.roles import get_profile_types, get_token_roles
+from authenticationAndAuthorization.serializers import MyTokenObtainPairSerializer
+from .caches import IsolatedCacheMixin
+
+
+class TokenRoleResolutionTests(IsolatedCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.account = Account.objects.create_user(
+            username="dave",
+            email="dave@example.com",
+            password="pass1234",
+        )
+        self.profile = Profile.objects.create(account=self.account, profile_type="trainer")
+
+    def _request(self, token):
+        request = self.factory.get("/any")
+        request.user = self.account
+        request.auth = token
+        return request
+
+    def _access_token(self):
+        return MyTokenObtainPairSerializer.get_token(self.account).access_token
+
+    def test_current_token_is_trusted_without_queries(self):
+        request = self._request(self._access_token())
+
+        with self.assertNumQueries(0):
+            allowed = HasRole(["trainer"])().has_permission(request, None)
+
+        self.assertTrue(allowed)
+
+    def test_role_added_after_issue_falls_back_to_database(self):
+        token = self._access_token()
+        Profile.objects.create(account=self.account, profile_type="trainee")
+
+        # Stale claim: the new version and the profiles are read once, then served from the cache
+        with self.assertNumQueries(2):
+            allowed = HasRole(["trainee"])().has_permission(self._request(token), None)
+        with self.assertNumQueries(0):
+            HasRole(["trainee"])().has_permission(self._request(token), None)
+
+        self.assertTrue(allowed)
+
+    def test_role_removed_after_issue_is_denied(self):
+        token = self._access_token()
+        self.profile.delete()
+
+        self.assertFalse(HasRole(["trainer"])().has_permission(self._request(token), None))
+
+    def test_revocation_survives_cache_loss(self):
+        token = self._access_token()
+        self.assertEqual(get_token_roles(token), {"trainer"})
+        self.profile.delete()
+        cache.clear()
+
+        # The version is read back from the account row, not assumed unchanged
+        self.assertIsNone(get_token_roles(token))
+        self.assertFalse(HasRole(["trainer"])().has_permission(self._request(token), None))
+
+    def test_claims_untrusted_with_process_local_cache(self):
+        token = self._access_token()
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.assertIsNone(get_token_roles(token))
+            self.assertTrue(HasRole(["trainer"])().has_permission(self._request(token), None))
+
+    def test_token_without_version_claim_uses_database(self):
+        token = AccessToken.for_user(self.account)
+        token["profile_types"] = ["gym"]
+
+        self.assertFalse(HasRole(["gym"])().has_permission(self._request(token), None))
+        self.assertTrue(HasRole(["trainer"])().has_permission(self._request(token), None))
+
+    def test_without_token_roles_come_from_role_mask(self):
+        self.assertTrue(HasRole(["trainer"])().has_permission(self._request(None), None))
+        self.assertFalse(HasRole(["gym"])().has_permission(self._request(None), None))
+
+        Profile.objects.create(account=self.account, profile_type="gym")
+        self.assertTrue(HasRole(["gym"])().has_permission(self._request(None), None))
+        # Cached under the new role version
+        with self.assertNumQueries(0):
+            self.assertTrue(HasRole(["trainer"])().has_permission(self._request(None), None))
+
+    @override_settings(ROLES_FROM_TOKEN=False)
+    def test_trusting_claims_can_be_disabled(self):
+        token = self._access_token()
+        token["profile_types"] = ["gym"]
+
+        self.assertFalse(HasRole(["gym"])().has_permission(self._request(token), None))
+
+
+class ProfileTypesCacheTests(IsolatedCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.account = Account.objects.create_user(username="kate", password="pass1234")
+        Profile.objects.create(account=self.account, profile_type="gym")
+
+    def test_cached_until_profiles_change(self):
+        self.assertListEqual(get_profile_types(self.account.pk), ["gym"])
+        with self.assertNumQueries(0):
+            self.assertListEqual(get_profile_types(self.account.pk), ["gym"])
+
+        Profile.objects.create(account=self.account, profile_type="store")
+
+        self.assertCountEqual(get_profile_types(self.account.pk), ["gym", "store"])
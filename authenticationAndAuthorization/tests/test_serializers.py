@@ -1,16 +1,20 @@
 from django.test import TestCase
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 
 from accounts.models import Account
 from profiles.models import Profile
+from authenticationAndAuthorization.blacklist import get_blacklist_filter
 from authenticationAndAuthorization.serializers import (
     MyTokenObtainPairSerializer,
     MyTokenRefreshSerializer,
 )
+from authenticationAndAuthorization.tests.caches import IsolatedCacheMixin
 
 
-class MyTokenSerializerTests(TestCase):
+class MyTokenSerializerTests(IsolatedCacheMixin, TestCase):
     def setUp(self):
+        super().setUp()
         self.account: Account = Account.objects.create_user(
             username="alice",
             email="alice@example.com",
@@ -42,3 +46,39 @@ class MyTokenSerializerTests(TestCase):
         self.assertEqual(new_access["email"], self.account.email)
         self.assertEqual(new_access["account_id"], self.account.pk)
         self.assertListEqual(new_access["profile_types"], ["store"])
+
+    def test_refresh_storm_costs_one_query(self):
+        refresh = MyTokenObtainPairSerializer.get_token(self.account)
+        get_blacklist_filter().rebuild()
+        MyTokenRefreshSerializer().validate({"refresh": str(refresh)})
+
+        # Only the account's is_active, from the projection
+        with self.assertNumQueries(1):
+            validated = MyTokenRefreshSerializer().validate({"refresh": str(refresh)})
+
+        new_access = AccessToken(validated["access"])
+        self.assertEqual(new_access["username"], "alice")
+        self.assertListEqual(new_access["profile_types"], ["store"])
+
+    def test_refresh_picks_up_role_changes(self):
+        refresh = MyTokenObtainPairSerializer.get_token(self.account)
+        Profile.objects.create(account=self.account, profile_type="trainer")
+
+        validated = MyTokenRefreshSerializer().validate({"refresh": str(refresh)})
+
+        self.assertCountEqual(AccessToken(validated["access"])["profile_types"], ["store", "trainer"])
+
+    def test_refresh_rejects_deactivated_account(self):
+        refresh = MyTokenObtainPairSerializer.get_token(self.account)
+        self.account.is_active = False
+        self.account.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            MyTokenRefreshSerializer().validate({"refresh": str(refresh)})
+
+    def test_refresh_rejects_deleted_user(self):
+        refresh = RefreshToken.for_user(self.account)
+        self.account.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            MyTokenRefreshSerializer().validate({"refresh": str(refresh)})
@@ -0,0 +1,119 @@
+import os
+import time
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from authenticationAndAuthorization.hashing import HashingUnavailable, PasswordHasherPool
+from authenticationAndAuthorization.tests.caches import IsolatedCacheMixin
+from authenticationAndAuthorization.throttles import LoginIdentifierThrottle, LoginIPThrottle
+
+
+class LoginThrottleTests(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        Account.objects.create_user(username="hana", email="hana@example.com", password="pass1234")
+        self.login_url = reverse("account_login")
+
+    def _login(self, username, password="wrong", **extra):
+        return self.client.post(self.login_url, {"username": username, "password": password}, format="json", **extra)
+
+    @mock.patch.object(LoginIdentifierThrottle, "THROTTLE_RATES", {"login_identifier": "2/min"})
+    def test_per_username_bucket(self):
+        self.assertEqual(self._login("hana").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._login("HANA").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self._login("hana", password="pass1234")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        # Other usernames have their own bucket
+        self.assertEqual(self._login("someone-else").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch.object(LoginIPThrottle, "THROTTLE_RATES", {"login_ip": "2/min"})
+    def test_per_ip_bucket(self):
+        self._login("a")
+        self._login("b")
+
+        self.assertEqual(self._login("c").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self._login("d", REMOTE_ADDR="10.0.0.2").status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    @mock.patch.object(LoginIPThrottle, "THROTTLE_RATES", {"login_ip": "2/min"})
+    def test_refused_requests_take_no_tokens(self):
+        self._login("a")
+        self._login("b")
+        for username in ("c", "d", "e"):
+            response = self._login(username)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # One token refills every 30s; refusals don't push that further out
+        self.assertLessEqual(int(response["Retry-After"]), 30)
+
+
+class HashingPoolTests(IsolatedCacheMixin, APITestCase):
+    def test_inline_pool_hashes_and_verifies(self):
+        pool = PasswordHasherPool(workers=0, queue_limit=1)
+        encoded = pool.make_password("s3cret-pass")
+
+        self.assertEqual(pool.verify_password("s3cret-pass", encoded), (True, False))
+        self.assertFalse(pool.verify_password("other", encoded)[0])
+
+    def test_process_pool_hashes_and_verifies(self):
+        pool = PasswordHasherPool(workers=1, queue_limit=0)
+        encoded = pool.make_password("s3cret-pass")
+
+        self.assertTrue(pool.verify_password("s3cret-pass", encoded)[0])
+
+    def test_broken_pool_is_replaced(self):
+        pool = PasswordHasherPool(workers=1, queue_limit=0)
+        self.addCleanup(pool.close)
+
+        # A worker dying takes the pool down with it, and the retry's pool as well
+        with self.assertRaises(HashingUnavailable):
+            pool._run(os._exit, 1)
+
+        self.assertTrue(pool.verify_password("s3cret-pass", pool.make_password("s3cret-pass"))[0])
+
+    def test_slow_hash_returns_503(self):
+        pool = PasswordHasherPool(workers=1, queue_limit=0, timeout=0.01)
+        self.addCleanup(pool.close)
+
+        with self.assertRaises(HashingUnavailable) as raised:
+            pool._run(time.sleep, 1)
+
+        self.assertEqual(raised.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_unknown_username_hashes_in_pool(self):
+        full = PasswordHasherPool(workers=0, queue_limit=0)
+
+        with mock.patch("authenticationAndAuthorization.backends.get_hasher_pool", return_value=full):
+            response = self.client.post(reverse("account_login"), {"username": "nobody", "password": "pass1234"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_full_queue_returns_429(self):
+        Account.objects.create_user(username="ivan", password="pass1234")
+        full = PasswordHasherPool(workers=0, queue_limit=0, retry_after=3)
+
+        with mock.patch("authenticationAndAuthorization.backends.get_hasher_pool", return_value=full):
+            response = self.client.post(reverse("account_login"), {"username": "ivan", "password": "pass1234"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "3")
+
+    def test_signup_uses_pool(self):
+        full = PasswordHasherPool(workers=0, queue_limit=0)
+
+        with mock.patch("accounts.views.get_hasher_pool", return_value=full):
+            response = self.client.post(
+                "/api/accounts/",
+                {"username": "jack", "email": "jack@example.com", "password": "pass1234", "confirmPassword": "pass1234"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(Account.objects.filter(username="jack").exists())
@@ -1,6 +1,7 @@
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from accounts.models import Account
@@ -50,6 +51,27 @@ class AuthenticationViewsTests(APITestCase):
         body = response.json()
         self.assertEqual(body["account"]["username"], "bob")
 
+    def test_login_with_email_is_case_insensitive_and_single_lookup(self):
+        # One account lookup (with profile types) plus the OutstandingToken insert
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                self.login_url,
+                {"email": "Bob@Example.com", "password": "pass1234"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body["account"]["id"], self.account.pk)
+        self.assertListEqual(body["account"]["profile_types"], ["trainer"])
+
+    def test_login_with_email_wrong_password(self):
+        response = self.client.post(
+            self.login_url,
+            {"email": "bob@example.com", "password": "wrong"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_login_invalid_credentials(self):
         response = self.client.post(
             self.login_url,
@@ -85,13 +107,15 @@ class AuthenticationViewsTests(APITestCase):
         tokens = self._login(username="bob", password="pass1234")
         refresh = tokens["refresh"]
 
-        response = self.client.post(
-            self.logout_url,
-            data={},
-            format="json",
-            HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
-            HTTP_REFRESH=refresh,
-        )
+        # The blacklist filter learns of the token once the logout commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.logout_url,
+                data={},
+                format="json",
+                HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+                HTTP_REFRESH=refresh,
+            )
         self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
 
         # Subsequent logout with same token should fail
@@ -120,12 +144,13 @@ class AuthenticationViewsTests(APITestCase):
         refresh = tokens["refresh"]
 
         # Authenticate request with access token
-        response = self.client.post(
-            self.logout_all_url,
-            data={},
-            format="json",
-            HTTP_AUTHORIZATION=f"Bearer {access}",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.logout_all_url,
+                data={},
+                format="json",
+                HTTP_AUTHORIZATION=f"Bearer {access}",
+            )
         self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
 
         # Try refreshing using previously issued token -> should fail due to blacklist
@@ -136,3 +161,25 @@ class AuthenticationViewsTests(APITestCase):
             HTTP_REFRESH=refresh,
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_logout_all_blacklists_in_bulk(self):
+        for _ in range(3):
+            RefreshToken.for_user(self.account)
+        already = OutstandingToken.objects.filter(user=self.account).first()
+        BlacklistedToken.objects.create(token=already)
+        access = str(RefreshToken.for_user(self.account).access_token)
+
+        # One SELECT for the not-yet-blacklisted tokens and one INSERT for all of them
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                self.logout_all_url,
+                data={},
+                format="json",
+                HTTP_AUTHORIZATION=f"Bearer {access}",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+        self.assertEqual(
+            BlacklistedToken.objects.filter(token__user=self.account).count(),
+            OutstandingToken.objects.filter(user=self.account).count(),
+        )
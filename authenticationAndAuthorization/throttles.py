@@ -0,0 +1,76 @@
+import math
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket on top of DRF's rate settings: a rate of "10/min" is a bucket of 10 tokens that
+    refills at 10 per minute, so short bursts are allowed but sustained traffic is capped.
+    Only POST requests are throttled.
+
+    The bucket is kept as one integer, the time (in ms) at which it will be full again, and is
+    only changed with the cache's atomic add/incr/decr, so concurrent requests on different
+    workers can't overwrite each other's tokens. Taking a token moves that time one refill
+    interval later; a request that would move it further than the whole bucket ahead is refused
+    and gives the interval back. The key expires once the bucket is full again.
+    """
+    wait_seconds = None
+
+    def allow_request(self, request, view):
+        if request.method != 'POST' or self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        interval = max(1, round(self.duration * 1000 / self.num_requests))
+        now = int(time.time() * 1000)
+        full_at = self._take(interval, now)
+        if full_at - now > self.duration * 1000:
+            self.cache.decr(self.key, interval)
+            self.wait_seconds = (full_at - now - self.duration * 1000) / 1000
+            return False
+        # Expire when the bucket is full, which also drops a full-at time left in the past
+        self.cache.touch(self.key, math.ceil((full_at - now) / 1000))
+        return True
+
+    def _take(self, interval, now):
+        for _ in range(2):
+            if self.cache.add(self.key, now + interval, math.ceil(interval / 1000)):
+                return now + interval
+            try:
+                return self.cache.incr(self.key, interval)
+            except ValueError:
+                # Expired between add() and incr()
+                continue
+        return self.cache.incr(self.key, interval)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginIdentifierThrottle(TokenBucketThrottle):
+    """Per-username bucket, so one targeted account can't be hammered from many addresses."""
+    scope = 'login_identifier'
+
+    def get_cache_key(self, request, view):
+        identifier = request.data.get('username') or request.data.get('email')
+        if not identifier:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': str(identifier).strip().lower()}
+
+
+class SignupIPThrottle(TokenBucketThrottle):
+    scope = 'signup_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
@@ -4,6 +4,7 @@ from .views import (
     AccountLoginView,
     LogoutView,
     LogoutAllView,
+    JWKSView,
 )
 
 urlpatterns = [
@@ -16,4 +17,7 @@ urlpatterns = [
     # Logout endpoints
     path('logout', LogoutView.as_view(), name='logout'),
     path('logout-all', LogoutAllView.as_view(), name='logout_all'),
+
+    # Public keys for verifying access tokens without calling this service
+    path('jwks', JWKSView.as_view(), name='jwks'),
 ]
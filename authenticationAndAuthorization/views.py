@@ -2,9 +2,11 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from .keys import get_key_ring
+from .blacklist import FilteredRefreshToken, add_on_commit
 from .serializers import MyTokenObtainPairSerializer, MyTokenRefreshSerializer
+from .throttles import LoginIdentifierThrottle, LoginIPThrottle
 from accounts.models import Account
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import permission_classes
@@ -24,38 +26,42 @@ class MyTokenRefreshView(TokenRefreshView):
 class AccountLoginView(TokenObtainPairView):
     """Login endpoint that returns JWT tokens plus basic account info."""
     serializer_class = MyTokenObtainPairSerializer
+    throttle_classes = [LoginIPThrottle, LoginIdentifierThrottle]
 
     def post(self, request, *args, **kwargs):
         # Support login via email or username: if email is provided and username is not,
-        # resolve the username from the Account with that email.
+        # resolve the account with that email once and reuse it for authentication and the response.
         data = request.data.copy()
+        account = None
         if not data.get('username') and data.get('email'):
-            email = data.get('email')
-            qs = Account.objects.filter(email__iexact=email)
-            if not qs.exists():
+            accounts = self.serializer_class.get_login_accounts(email__iexact=data.get('email'))
+            if not accounts:
                 return Response({'detail': 'Invalid credentials.'}, status=status.HTTP_401_UNAUTHORIZED)
-            if qs.count() > 1:
+            if len(accounts) > 1:
                 return Response({'detail': 'Multiple accounts use this email. Please login with username.'}, status=status.HTTP_400_BAD_REQUEST)
-            data['username'] = qs.first().username
+            account = accounts[0]
+            data['username'] = account.username
 
         serializer = self.get_serializer(data=data)
+        serializer.login_account = account
         serializer.is_valid(raise_exception=True)
 
         # Tokens from SimpleJWT
         tokens = serializer.validated_data
 
-        # Resolve account and enrich response
+        # The authenticated user is the account loaded above or by the serializer. Only plain
+        # auth users without an Account come back without profile_type_list.
         user = serializer.user
-        account = Account.objects.filter(pk=user.pk).first()
+        is_account = hasattr(user, 'profile_type_list')
         account_payload = {
-            'id': account.pk if account else None,
+            'id': user.pk if is_account else None,
             'username': user.username,
             'email': user.email,
-            'profile_types': list(account.profiles.values_list('profile_type', flat=True)) if account else [],
+            'profile_types': list(user.profile_type_list) if is_account else [],
         }
 
         if request.user.is_authenticated:
-            current_tokens = OutstandingToken.objects.filter(user=request.user)
+            current_tokens = OutstandingToken.objects.filter(user_id=request.user.pk)
             if current_tokens.count() > 5:
                 # Blacklist oldest tokens beyond the 5 most recent
                 tokens_to_blacklist = current_tokens.order_by('created_at')[0]
@@ -79,7 +85,7 @@ class LogoutView(APIView):
         if not refresh_token:
             return Response({'detail': 'refresh token is required'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             # Blacklist this refresh token
             token.blacklist()
         except Exception:
@@ -94,11 +100,28 @@ class LogoutAllView(APIView):
     def post(self, request):
         user = request.user
         # OutstandingToken has a FK to user when token_blacklist app is enabled
-        tokens = OutstandingToken.objects.filter(user=user)
-        for t in tokens:
-            try:
-                BlacklistedToken.objects.get_or_create(token=t)
-            except Exception:
-                # Continue blacklisting the rest even if one fails
-                continue
+        tokens = list(OutstandingToken.objects.filter(
+            user_id=user.pk,
+            blacklistedtoken__isnull=True,
+        ).values_list('pk', 'jti', 'expires_at'))
+        # One multi-row INSERT; tokens blacklisted concurrently are skipped by the unique constraint
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id, _, _ in tokens],
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no post_save, so update the refresh blacklist filter here
+        add_on_commit((jti, expires_at) for _, jti, expires_at in tokens)
         return Response(status=status.HTTP_205_RESET_CONTENT)
+
+
+class JWKSView(APIView):
+    """Public half of every signing key in the ring, for services that verify tokens locally."""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        response = Response(get_key_ring().jwks)
+        # Verifiers may hold this for max-age, so publish a new key (JWT_ACTIVE_KID pinned to the
+        # old one) at least that long before it starts signing.
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
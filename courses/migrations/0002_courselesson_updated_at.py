@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courselesson',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
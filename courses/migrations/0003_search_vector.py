@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_courselesson_updated_at'),
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+        ('utils', '0002_category_language_level'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='courselesson',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Keep the vectors current on every insert and on updates of the indexed text, then fill
+        # existing rows by touching them (before the indexes exist, so they are built once)
+        migrations.RunSQL(
+            sql='''
+                CREATE FUNCTION courses_course_search_vector() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector :=
+                        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql;
+                CREATE TRIGGER courses_course_search_vector
+                    BEFORE INSERT OR UPDATE OF title, description, search_vector ON courses_course
+                    FOR EACH ROW EXECUTE FUNCTION courses_course_search_vector();
+
+                CREATE FUNCTION courses_courselesson_search_vector() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector := setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql;
+                CREATE TRIGGER courses_courselesson_search_vector
+                    BEFORE INSERT OR UPDATE OF title, search_vector ON courses_courselesson
+                    FOR EACH ROW EXECUTE FUNCTION courses_courselesson_search_vector();
+
+                UPDATE courses_course SET title = title;
+                UPDATE courses_courselesson SET title = title;
+            ''',
+            reverse_sql='''
+                DROP TRIGGER courses_course_search_vector ON courses_course;
+                DROP FUNCTION courses_course_search_vector();
+                DROP TRIGGER courses_courselesson_search_vector ON courses_courselesson;
+                DROP FUNCTION courses_courselesson_search_vector();
+            ''',
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='course_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courselesson',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lesson_search_vector_idx'),
+        ),
+    ]
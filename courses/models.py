@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 # Create your models here.
@@ -16,6 +18,11 @@ class Course(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     description = models.TextField()
     preview_video = models.URLField(blank=True, null=True)
+    # Weighted title (A) and description (B); written by a database trigger, see migration 0003
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='course_search_vector_idx')]
 
     def __str__(self):
         return self.title
@@ -28,6 +35,12 @@ class CourseLesson(models.Model):
     duration = models.DurationField()
     status = models.CharField(max_length=20, choices=[('draft', 'Draft'), ('published', 'Published')], default='draft')
     order = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    # Title (A); written by a database trigger, see migration 0003
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='lesson_search_vector_idx')]
 
     def __str__(self):
         return f"Lesson {self.order}: {self.title} for Course {self.course.title}"
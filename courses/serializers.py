@@ -13,7 +13,8 @@ from trainees.models import Trainee
 class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
-        fields = "__all__"
+        # The full-text search column is internal to search.query
+        exclude = ("search_vector",)
         read_only_fields = ("created_at", "updated_at")
 
     # def validate_trainer_profile(self, value: Profile) -> Profile:
@@ -25,7 +26,7 @@ class CourseSerializer(serializers.ModelSerializer):
 class CourseLessonSerializer(serializers.ModelSerializer):
     class Meta:
         model = CourseLesson
-        fields = "__all__"
+        exclude = ("search_vector",)
 
 
 class LessonSectionSerializer(serializers.ModelSerializer):
@@ -1,3 +1,60 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from courses.models import Course, CourseLesson
+from profiles.models import Profile
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        account = Account.objects.create_user(username="coach", password="x")
+        trainer = Profile.objects.create(account=account, profile_type="trainer")
+        self.course = Course.objects.create(trainer_profile=trainer, title="Strength", price=10, description="d")
+        self.lesson = CourseLesson.objects.create(course=self.course, title="Squat", duration=timedelta(minutes=5), order=1)
+        self.client = APIClient()
+        self.client.force_authenticate(account)
+
+    def assertRevalidates(self, url, change):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_course_detail(self):
+        def change():
+            self.course.title = "Power"
+            self.course.save()
+        self.assertRevalidates(f'/api/courses/courses/{self.course.pk}/detail/', change)
+
+    def test_lesson_detail(self):
+        def change():
+            self.lesson.title = "Deadlift"
+            self.lesson.save()
+        self.assertRevalidates(f'/api/courses/lessons/{self.course.pk}/lessons/detail/{self.lesson.pk}/', change)
+
+    def test_course_list_notices_deletes(self):
+        other = Course.objects.create(trainer_profile=self.course.trainer_profile, title="Cardio", price=5, description="d")
+        self.assertRevalidates('/api/courses/courses/for-trainees/', other.delete)
+
+    def test_lesson_of_other_course_is_404(self):
+        response = self.client.get(f'/api/courses/lessons/{self.course.pk + 1}/lessons/detail/{self.lesson.pk}/')
+        self.assertEqual(response.status_code, 404)
 
-# Create your tests here.
+    def test_search_vector_is_not_serialized(self):
+        course = self.client.get(f'/api/courses/courses/{self.course.pk}/detail/').json()
+        lesson = self.client.get(f'/api/courses/lessons/{self.course.pk}/lessons/detail/{self.lesson.pk}/').json()
+        self.assertEqual(course['title'], "Strength")
+        self.assertNotIn('search_vector', course)
+        self.assertEqual(lesson['title'], "Squat")
+        self.assertNotIn('search_vector', lesson)
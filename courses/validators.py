@@ -1,4 +1,5 @@
-from accounts.models import Account
+from accounts.models import ROLE_BITS, Account
+from profiles.models import Profile
 from .models import Course, CourseEnrollment, CourseLesson, LessonSection
 
 class CourseValidator:
@@ -20,20 +21,17 @@ class CourseValidator:
         Validates that the given trainer profile belongs to the specified user.
         trainer_profile can be either a Profile object or an ID (int).
         """
-        account = Account.objects.filter(pk=user.pk).first()
-        if not account:
-            raise ValueError("User account does not exist.")
-        
         # Handle both Profile object and ID
         profile_id = trainer_profile.pk if hasattr(trainer_profile, 'pk') else trainer_profile
         
-        profile_exists = account.profiles.filter(
+        profile_exists = Profile.objects.filter(
             pk=profile_id,
+            account_id=user.pk,
             profile_type='trainer'
         ).exists()
         
         if not profile_exists:
-            raise ValueError("The trainer profile does not belong to the requested user.")
+            CourseValidator._raise_profile_error(user, 'trainer')
     
     @staticmethod
     def validate_trainee_profile_belongs_to_user(trainee_profile, user):
@@ -41,21 +39,28 @@ class CourseValidator:
         Validates that the given trainee profile belongs to the specified user.
         trainee_profile can be either a Profile object or an ID (int).
         """
-        account = Account.objects.filter(pk=user.pk).first()
-        if not account:
-            raise ValueError("User account does not exist.")
-        
         # Handle both Profile object and ID
         profile_id = trainee_profile.pk if hasattr(trainee_profile, 'pk') else trainee_profile
         
-        profile_exists = account.profiles.filter(
+        profile_exists = Profile.objects.filter(
             pk=profile_id,
+            account_id=user.pk,
             profile_type='trainee'
         ).exists()
         
         if not profile_exists:
-            raise ValueError("The trainee profile does not belong to the requested user.")
+            CourseValidator._raise_profile_error(user, 'trainee')
         
+    @staticmethod
+    def _raise_profile_error(user, role):
+        # Only failures need the account's role_mask, to tell a missing account or role apart from someone else's profile
+        mask = Account.objects.filter(pk=user.pk).values_list('role_mask', flat=True).first()
+        if mask is None:
+            raise ValueError("User account does not exist.")
+        if not mask & ROLE_BITS[role]:
+            raise ValueError(f"User has no {role} profile.")
+        raise ValueError(f"The {role} profile does not belong to the requested user.")
+
     @staticmethod
     def validate_lesson_exists(lesson_id):
         try:
@@ -1,7 +1,8 @@
 from rest_framework.viewsets import ViewSet
 
+from api.conditional import collection_validators, conditional, object_validators
 from profiles.models import Profile
-from .models import Course
+from .models import Course, CourseLesson
 from .serializers import CourseLessonSerializer, CourseSerializer, CourseEnrollmentSerializer, CourseEnrollment, LessonSectionSerializer
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -10,10 +11,26 @@ from rest_framework.permissions import IsAuthenticated
 from authenticationAndAuthorization.permissions import HasRole
 from .validators import CourseValidator
 
+# Conditional GET validators: one query on updated_at instead of serializing the response
+def courses_validators(request):
+    return collection_validators(Course.objects.all())
+
+
+def course_validators(request, pk=None):
+    updated_at = Course.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return object_validators(updated_at, pk)
+
+
+def lesson_validators(request, pk=None, lesson_pk=None):
+    updated_at = CourseLesson.objects.filter(pk=lesson_pk, course_id=pk).values_list('updated_at', flat=True).first()
+    return object_validators(updated_at, lesson_pk)
+
+
 # Create your views here.
 class CoursesView(ViewSet):
 
     @action(methods=['get'], detail=False, permission_classes=[IsAuthenticated], url_path='for-trainees')
+    @conditional(courses_validators)
     def get_courses_for_trainees(self, request):
         courses = Course.objects.all()
         serializer = CourseSerializer(courses, many=True)
@@ -58,6 +75,7 @@ class CoursesView(ViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(methods=['get'], detail=True, permission_classes=[IsAuthenticated], url_path='detail')
+    @conditional(course_validators)
     def get_course_detail(self, request, pk=None):
         try:
             course = CourseValidator.validate_course_exists(pk)
@@ -130,6 +148,7 @@ class LessonsView(ViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(methods=['get'], detail=True, permission_classes=[IsAuthenticated], url_path=r'lessons/detail/(?P<lesson_pk>\d+)')
+    @conditional(lesson_validators)
     def get_lesson_detail(self, request, pk=None, lesson_pk=None):
         try:
             course = CourseValidator.validate_course_exists(pk)
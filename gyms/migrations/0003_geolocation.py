@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gyms', '0002_remove_gym_location_gym_description_gym_branch_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gym_branch',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='gym_branch',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gym_branch',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='gym_branch',
+            index=models.Index(fields=['geohash'], name='gyms_gym_branch_geohash', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
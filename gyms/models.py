@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from profiles.models import Profile
+from utils.models import GeoLocation
 # Create your models here.
 
 class Gym(models.Model):
@@ -23,7 +24,7 @@ class Gym(models.Model):
         self.full_clean()
         return super().save(*args, **kwargs)
     
-class Gym_branch(models.Model):
+class Gym_branch(GeoLocation):
     gym_id = models.ForeignKey(Gym, on_delete=models.CASCADE)
     country = models.CharField(max_length=100)
     state=models.CharField(max_length=100)
@@ -1,3 +1,69 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from accounts.models import Account, AccountProjection
+from profiles.models import Profile
+
+
+def create_profile(account, profile_type):
+    client = APIClient()
+    client.force_authenticate(account)
+    return client.post('/api/profiles/create', {'account': account.pk, 'profile_type': profile_type})
+
+
+class ProfileCreateTests(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create_user(username="pat", password="x")
+
+    def test_first_profile_becomes_default(self):
+        first = create_profile(self.account, 'trainee')
+        second = create_profile(self.account, 'trainer')
+        self.assertEqual((first.status_code, second.status_code), (201, 201))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.default_profile_id, first.data['id'])
+        self.assertEqual(AccountProjection.objects.get(pk=self.account.pk).default_profile_id, first.data['id'])
+
+
+class ConcurrentProfileCreateTests(TransactionTestCase):
+    def setUp(self):
+        self.account = Account.objects.create_user(username="race", password="x")
+
+    def run_parallel(self, profile_types):
+        barrier = threading.Barrier(len(profile_types))
+        results = [None] * len(profile_types)
+
+        def worker(index, profile_type):
+            try:
+                barrier.wait()
+                results[index] = create_profile(self.account, profile_type).status_code
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=item) for item in enumerate(profile_types)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_parallel_creates_pick_exactly_one_default(self):
+        profile_types = ['gym', 'trainer', 'store', 'trainee']
+        self.assertEqual(self.run_parallel(profile_types), [201] * 4)
+
+        self.account.refresh_from_db()
+        profiles = Profile.objects.filter(account=self.account)
+        self.assertEqual(profiles.count(), 4)
+        self.assertIn(self.account.default_profile_id, set(profiles.values_list('pk', flat=True)))
+        projection = AccountProjection.objects.get(pk=self.account.pk)
+        self.assertEqual(projection.default_profile_id, self.account.default_profile_id)
+        self.assertEqual(projection.profile_types, sorted(profile_types))
+
+    def test_parallel_duplicate_type_creates_one_profile(self):
+        results = self.run_parallel(['trainee'] * 4)
+        self.assertEqual(sorted(results), [201, 400, 400, 400])
+        self.account.refresh_from_db()
+        profile = Profile.objects.get(account=self.account)
+        self.assertEqual(self.account.default_profile_id, profile.pk)
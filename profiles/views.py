@@ -1,7 +1,9 @@
+from django.db import IntegrityError, transaction
 from django.shortcuts import render
 from rest_framework.views import APIView
 from .models import Profile 
 from accounts.models import Account
+from accounts.projection import sync_account_projections
 from .serializers import ProfileSerializer
 from rest_framework.response import Response
 # Create your views here.
@@ -15,11 +17,18 @@ class ProfileView(APIView):
     
     def post(self, request):
         serializer = ProfileSerializer(data=request.data)
-        my_profiles = Profile.objects.filter(account=request.data.get('account'))
         if serializer.is_valid():
-            serializer.save()
-            if len(my_profiles) == 1:
-                Account.objects.filter(id=serializer.data.get('account')).update(default_profile=serializer.data.get("id"))
+            try:
+                with transaction.atomic():
+                    profile = serializer.save()
+                    # The first profile becomes the default. The null check runs under the account's
+                    # row lock, so of two concurrent creates only one can win.
+                    if Account.objects.filter(pk=profile.account_id, default_profile__isnull=True).update(default_profile=profile):
+                        # update() sends no post_save, so refresh the account projection explicitly
+                        sync_account_projections([profile.account_id])
+            except IntegrityError:
+                # A concurrent request created the same profile type after validation passed
+                return Response({"error": "This account already has a profile of this type."}, status=400)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
     
@@ -0,0 +1,68 @@
+"""
+Search-as-you-type suggestions. Course titles and trainer names are matched in the database:
+fuzzily through pg_trgm's word similarity when the extension is installed (see migration
+0001_trigram_indexes), by case-insensitive prefix otherwise. Specializations, categories and
+languages are small enough to be answered from the in-process index of utils.autocomplete.
+"""
+from django.db import connection
+
+from courses.models import Course
+from trainers.models import Trainer
+from utils.autocomplete import REFERENCE_TABLES, get_reference_index
+
+# type -> (model, table, primary key column, label column)
+DATABASE_TABLES = {
+    'course': (Course, 'courses_course', 'id', 'title'),
+    'trainer': (Trainer, 'trainers_trainer', 'profile_id_id', 'name'),
+}
+KINDS = (*DATABASE_TABLES, *REFERENCE_TABLES)
+
+# Prefix matches first, then by trigram word distance. `<%` and ILIKE are both served by the
+# gin_trgm_ops index; word_similarity is the score the client can show or threshold.
+TRIGRAM_SQL = '''
+    SELECT {pk}, {label}, word_similarity(%(text)s, {label})
+    FROM {table}
+    WHERE {label} ILIKE %(prefix)s OR %(text)s <% {label}
+    ORDER BY {label} ILIKE %(prefix)s DESC, %(text)s <<-> {label}, {pk}
+    LIMIT %(limit)s
+'''
+
+_trigram_available = None
+
+
+def trigram_available():
+    global _trigram_available
+    if _trigram_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available = cursor.fetchone() is not None
+    return _trigram_available
+
+
+def escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def database_suggestions(kind, text, limit):
+    model, table, pk, label = DATABASE_TABLES[kind]
+    if not trigram_available():
+        rows = model.objects.filter(**{f'{label}__istartswith': text}).order_by(label, 'pk').values_list('pk', label)
+        return [(row_pk, row_label, 1.0) for row_pk, row_label in rows[:limit]]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            TRIGRAM_SQL.format(pk=pk, label=label, table=table),
+            {'text': text, 'prefix': escape_like(text) + '%', 'limit': limit},
+        )
+        return [(row_pk, row_label, round(score, 3)) for row_pk, row_label, score in cursor.fetchall()]
+
+
+def suggest(text, kinds=KINDS, limit=8):
+    """{type: [{'id', 'label', 'score'}, ...]} for each requested type, best first."""
+    suggestions = {}
+    for kind in kinds:
+        if kind in REFERENCE_TABLES:
+            rows = get_reference_index(kind).search(text, limit)
+        else:
+            rows = database_suggestions(kind, text, limit)
+        suggestions[kind] = [{'id': pk, 'label': label, 'score': score} for pk, label, score in rows]
+    return suggestions
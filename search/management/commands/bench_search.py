@@ -0,0 +1,112 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.models import Account
+from profiles.models import Profile
+from search.query import KINDS, search
+
+BENCH_USERNAME = 'bench-search-trainer'
+
+WORDS = (
+    'strength cardio yoga pilates boxing running cycling swimming mobility stretching nutrition '
+    'beginner advanced intermediate core abs glutes legs back chest shoulders arms posture balance '
+    'endurance hiit crossfit kettlebell dumbbell barbell powerlifting bodybuilding calisthenics '
+    'recovery breathing meditation flexibility marathon sprint agility plyometrics rehabilitation '
+    'weight loss muscle gain home gym outdoor women men seniors kids program plan challenge weekly'
+).split()
+
+# Word k of the vocabulary is WORDS[k], then 'term1', 'term2', ... Indexes are drawn with a
+# skew (random() ^ 3), so a few words are common and most are rare, roughly like real text;
+# queries draw from the same distribution. The `g` reference makes the subqueries run per row.
+PICK_SQL = '''
+    (SELECT string_agg(CASE WHEN k < %(vocabulary)s THEN (%(words)s::text[])[k + 1] ELSE 'term' || (k - %(vocabulary)s + 1) END, ' ')
+     FROM (SELECT floor(%(size)s * random() ^ 3)::int AS k FROM generate_series(1, {count}) WHERE g IS NOT NULL) picks)
+'''
+SEED_SQL = f'''
+    INSERT INTO courses_course (trainer_profile_id, title, price, status, created_at, updated_at, description)
+    SELECT %(profile)s, {PICK_SQL.format(count=4)}, 10, 'published', now(), now(), {PICK_SQL.format(count=40)}
+    FROM generate_series(1, %(count)s) g
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure search latency. --seed N first inserts N synthetic published courses owned by a "
+        "dedicated bench account (the triggers fill their search vectors); --drop removes them. "
+        "Then runs --queries searches of one or two words and prints the latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Courses to insert before measuring.')
+        parser.add_argument('--synthetic-words', type=int, default=20000, help='Extra vocabulary for seeded text.')
+        parser.add_argument('--batch-size', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--type', action='append', choices=KINDS, help='Kinds to search; defaults to all.')
+        parser.add_argument('--drop', action='store_true', help='Delete the seeded courses and exit.')
+
+    def bench_profile(self):
+        account = Account.objects.filter(username=BENCH_USERNAME).first()
+        if account is None:
+            account = Account.objects.create_user(username=BENCH_USERNAME, password=None)
+        profile, _ = Profile.objects.get_or_create(account=account, profile_type='trainer')
+        return profile
+
+    def seed(self, count, synthetic, batch_size):
+        profile = self.bench_profile()
+        started = time.perf_counter()
+        done = 0
+        while done < count:
+            batch = min(batch_size, count - done)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(SEED_SQL, {
+                    'words': list(WORDS), 'vocabulary': len(WORDS), 'size': len(WORDS) + synthetic,
+                    'profile': profile.pk, 'count': batch,
+                })
+            done += batch
+            self.stdout.write(f"seeded {done}/{count} courses ({done / (time.perf_counter() - started):.0f}/s)")
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE courses_course')
+
+    def handle(self, *args, **options):
+        if options['drop']:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'DELETE FROM courses_course WHERE trainer_profile_id IN '
+                    '(SELECT p.id FROM profiles_profile p JOIN auth_user u ON u.id = p.account_id WHERE u.username = %s)',
+                    [BENCH_USERNAME],
+                )
+                self.stdout.write(f"Deleted {cursor.rowcount} seeded courses.")
+            return
+        if options['seed']:
+            self.seed(options['seed'], options['synthetic_words'], options['batch_size'])
+        if options['queries'] < 1:
+            raise CommandError('--queries must be at least 1.')
+
+        vocabulary = list(WORDS) + [f'term{n}' for n in range(1, options['synthetic_words'] + 1)]
+        rng = random.Random(0)
+
+        def word():
+            return vocabulary[int(len(vocabulary) * rng.random() ** 3)]
+
+        kinds = options['type'] or KINDS
+        search('warm up', kinds=kinds, limit=options['limit'])
+        timings, hits = [], 0
+        for i in range(options['queries']):
+            text = word() if i % 2 else f'{word()} {word()}'
+            started = time.perf_counter()
+            hits += bool(search(text, kinds=kinds, limit=options['limit']))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        def percentile(p):
+            return timings[min(len(timings) - 1, int(len(timings) * p))]
+        self.stdout.write(
+            f"{len(timings)} searches ({hits} with results): mean {statistics.mean(timings):.1f} ms, "
+            f"p50 {percentile(0.5):.1f} ms, p95 {percentile(0.95):.1f} ms, p99 {percentile(0.99):.1f} ms, "
+            f"max {timings[-1]:.1f} ms"
+        )
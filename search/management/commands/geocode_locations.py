@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from search.nearby import KINDS, LOCATIONS
+from utils.geo import geocode
+
+GEO_FIELDS = ['latitude', 'longitude', 'geohash']
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill latitude, longitude and geohash of trainers, gym branches and store branches from "
+        "their country and zip_code, using the postal-code table at GEO_POSTAL_CODES_PATH. No "
+        "network access is needed. Rows already geocoded are skipped unless --all is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', action='append', choices=KINDS, help='Defaults to all types.')
+        parser.add_argument('--all', action='store_true', help='Re-geocode rows that already have coordinates.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for kind in options['type'] or KINDS:
+            model = LOCATIONS[kind][0]
+            rows = model.objects.exclude(zip_code__isnull=True).exclude(zip_code='')
+            if not options['all']:
+                rows = rows.filter(geohash__isnull=True)
+            rows = rows.only('pk', 'country', 'zip_code', *GEO_FIELDS)
+
+            located, missing, batch = 0, 0, []
+            for row in rows.iterator(chunk_size=options['batch_size']):
+                point = geocode(row.country, row.zip_code)
+                if point is None:
+                    missing += 1
+                    if not options['all']:
+                        continue
+                row.set_location(point)
+                located += point is not None
+                batch.append(row)
+                if len(batch) >= options['batch_size']:
+                    model.objects.bulk_update(batch, GEO_FIELDS)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, GEO_FIELDS)
+            self.stdout.write(f"{kind}: {located} geocoded, {missing} with a postal code missing from the table")
@@ -0,0 +1,54 @@
+import logging
+
+from django.db import migrations, transaction
+from django.db.utils import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# (index, table, column) pairs for fuzzy autocomplete. Specializations are answered from the
+# in-process index of utils.autocomplete and need none.
+TRIGRAM_INDEXES = (
+    ('course_title_trgm_idx', 'courses_course', 'title'),
+    ('trainer_name_trgm_idx', 'trainers_trainer', 'name'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Install pg_trgm and the trigram indexes where the server ships the extension. Without it
+    autocomplete falls back to prefix matching; once it is available, migrate search back to
+    zero and forward again to create them.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError as e:
+            logger.warning("Could not install pg_trgm (%s); skipping trigram indexes.", e)
+            return
+        for name, table, column in TRIGRAM_INDEXES:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)')
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name, _, _ in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_search_vector'),
+        ('trainers', '0006_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,74 @@
+"""
+Radius and k-nearest searches over geocoded trainers, gym branches and store branches. Rows
+are pruned by geohash prefix (see utils.geo) and a latitude band in the database, which also
+computes the great-circle distance of the rows that survive, orders them by it and returns
+only the nearest `limit`, so a dense cell never ships its every row to Python.
+"""
+import math
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+from gyms.models import Gym_branch
+from stores.models import StoreBranch
+from trainers.models import Trainer
+from utils.geo import EARTH_RADIUS_KM, KM_PER_DEGREE, covering_cells
+
+# type -> (model, label expression)
+LOCATIONS = {
+    'trainer': (Trainer, F('name')),
+    'gym_branch': (Gym_branch, F('gym_id__name')),
+    'store_branch': (StoreBranch, F('store_id__name')),
+}
+KINDS = tuple(LOCATIONS)
+
+MAX_RADIUS_KM = 500
+FIRST_RADIUS_KM = 2
+
+
+def distance_km(latitude, longitude):
+    """Haversine distance from the point to each row's latitude/longitude, as in utils.geo.haversine_km."""
+    phi1 = math.radians(latitude)
+    d_phi = Radians(F('latitude')) - phi1
+    d_lambda = Radians(F('longitude') - longitude)
+    a = Power(Sin(d_phi / 2), 2) + math.cos(phi1) * Cos(Radians(F('latitude'))) * Power(Sin(d_lambda / 2), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Least(Value(1.0), Sqrt(a)))
+
+
+def within(kind, latitude, longitude, radius_km, limit=None):
+    """Locations of `kind` within `radius_km`, nearest first; the nearest `limit` when given."""
+    model, label = LOCATIONS[kind]
+    cells = Q()
+    for cell in covering_cells(latitude, longitude, radius_km):
+        cells |= Q(geohash__startswith=cell)
+    band = radius_km / KM_PER_DEGREE
+    rows = (
+        model.objects.filter(cells, latitude__range=(latitude - band, latitude + band))
+        .annotate(label=label, distance=distance_km(latitude, longitude))
+        .filter(distance__lte=radius_km)
+        .order_by('distance', 'pk')
+        .values_list('pk', 'latitude', 'longitude', 'label', 'distance')
+    )
+    if limit is not None:
+        rows = rows[:limit]
+    return [
+        {
+            'type': kind, 'id': pk, 'name': name,
+            'latitude': lat, 'longitude': lng, 'distanceKm': round(distance, 3),
+        }
+        for pk, lat, lng, name, distance in rows
+    ]
+
+
+def nearest(kind, latitude, longitude, k, max_radius_km=MAX_RADIUS_KM):
+    """
+    The `k` locations of `kind` nearest to the point, up to `max_radius_km` away. The radius
+    grows fourfold until it holds k rows, so sparse areas cost a few more small queries
+    instead of one that reaches across the map.
+    """
+    radius = min(FIRST_RADIUS_KM, max_radius_km)
+    while True:
+        results = within(kind, latitude, longitude, radius, limit=k)
+        if len(results) >= k or radius >= max_radius_km:
+            return results[:k]
+        radius = min(radius * 4, max_radius_km)
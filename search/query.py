@@ -0,0 +1,77 @@
+"""
+Ranked full-text search over courses, lessons and trainers.
+
+Each searchable table carries a stored, weighted tsvector that a trigger keeps current (see
+courses migration 0003 and trainers migration 0006) with a GIN index on it. A search ranks
+every match of each table and keeps its top `limit` by ts_rank (a bounded top-N sort, never a
+full one), merges them, and only then computes ts_headline snippets, so highlighting costs
+`limit` rows however many documents match.
+"""
+import html
+
+from django.db import connection
+
+SEARCH_CONFIG = 'english'
+
+# Private-use characters mark the highlighted words; the snippet is HTML-escaped before they
+# become <mark> tags, so markup stored in the text can't reach the client.
+START_SEL, STOP_SEL = '\ue000', '\ue001'
+HEADLINE_OPTIONS = f'StartSel={START_SEL}, StopSel={STOP_SEL}, MaxWords=30, MinWords=10, MaxFragments=2'
+
+# kind -> top matches of one table as (kind, id, rank)
+BRANCH_SQL = '''
+    SELECT '{kind}' AS kind, {pk} AS id, ts_rank(search_vector, query.q) AS rank
+    FROM {table}, query WHERE search_vector @@ query.q
+    ORDER BY rank DESC, id LIMIT %(limit)s
+'''
+BRANCHES = {
+    'course': BRANCH_SQL.format(kind='course', table='courses_course', pk='id'),
+    'lesson': BRANCH_SQL.format(kind='lesson', table='courses_courselesson', pk='id'),
+    'trainer': BRANCH_SQL.format(kind='trainer', table='trainers_trainer', pk='profile_id_id'),
+}
+KINDS = tuple(BRANCHES)
+
+SEARCH_SQL = '''
+    WITH query AS (SELECT websearch_to_tsquery(%(config)s::regconfig, %(text)s) AS q),
+    hits AS (
+        SELECT * FROM ({branches}) AS matches
+        ORDER BY rank DESC, kind, id LIMIT %(limit)s
+    )
+    SELECT hits.kind, hits.id, hits.rank,
+           COALESCE(c.title, l.title, t.name) AS title,
+           l.course_id,
+           ts_headline(
+               %(config)s::regconfig,
+               CASE hits.kind WHEN 'course' THEN c.description WHEN 'lesson' THEN l.title ELSE t.name END,
+               query.q, %(options)s
+           ) AS snippet
+    FROM hits CROSS JOIN query
+    LEFT JOIN courses_course c ON hits.kind = 'course' AND c.id = hits.id
+    LEFT JOIN courses_courselesson l ON hits.kind = 'lesson' AND l.id = hits.id
+    LEFT JOIN trainers_trainer t ON hits.kind = 'trainer' AND t.profile_id_id = hits.id
+    ORDER BY hits.rank DESC, hits.kind, hits.id
+'''
+
+
+def highlight(snippet):
+    escaped = html.escape(snippet or '')
+    return escaped.replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+
+
+def search(text, kinds=KINDS, limit=20):
+    """The `limit` best matches of `text` (web search syntax) among `kinds`, best first."""
+    branches = ' UNION ALL '.join(f'({BRANCHES[kind]})' for kind in kinds)
+    sql = SEARCH_SQL.format(branches=branches)
+    params = {
+        'config': SEARCH_CONFIG, 'text': text, 'limit': limit, 'options': HEADLINE_OPTIONS,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    results = []
+    for kind, pk, rank, title, course_id, snippet in rows:
+        result = {'type': kind, 'id': pk, 'title': title, 'rank': round(rank, 6), 'snippet': highlight(snippet)}
+        if kind == 'lesson':
+            result['courseId'] = course_id
+        results.append(result)
+    return results
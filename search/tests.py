@@ -0,0 +1,169 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from courses.models import Course, CourseLesson
+from profiles.models import Profile
+from search import autocomplete as search_autocomplete, nearby
+from trainers.models import Trainer
+from utils.geo import haversine_km
+from utils.models import Specialization
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        account = Account.objects.create_user(username="sara", password="x")
+        profile = Profile.objects.create(account=account, profile_type="trainer")
+        self.trainer = Trainer.objects.create(profile_id=profile, name="Sara Kettlebell")
+        self.strength = Course.objects.create(
+            trainer_profile=profile, title="Kettlebell strength", price=10,
+            description="Build strength with <b>kettlebell</b> swings & presses.",
+        )
+        self.yoga = Course.objects.create(
+            trainer_profile=profile, title="Morning yoga", price=10,
+            description="Gentle flows, with a kettlebell cool-down at the end.",
+        )
+        self.lesson = CourseLesson.objects.create(
+            course=self.yoga, title="Kettlebell basics", duration=timedelta(minutes=10), order=1,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(account)
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def test_ranked_across_kinds(self):
+        results = self.search(q="kettlebell")
+        self.assertEqual(
+            {(row['type'], row['id']) for row in results},
+            {('course', self.strength.pk), ('course', self.yoga.pk), ('lesson', self.lesson.pk), ('trainer', self.trainer.pk)},
+        )
+        ranks = [row['rank'] for row in results]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+        courses = [row['id'] for row in results if row['type'] == 'course']
+        # Title (weight A) beats a mention in the description (weight B)
+        self.assertEqual(courses, [self.strength.pk, self.yoga.pk])
+        lesson = next(row for row in results if row['type'] == 'lesson')
+        self.assertEqual(lesson['courseId'], self.yoga.pk)
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        snippet = self.search(q="swings", type="course")[0]['snippet']
+        self.assertIn('<mark>swings</mark>', snippet)
+        self.assertIn('&amp;', snippet)
+        self.assertNotIn('<b>', snippet)
+
+    def test_vectors_follow_updates(self):
+        self.trainer.name = "Sara Pilates"
+        self.trainer.save()
+        results = self.search(q="pilates")
+        self.assertEqual(
+            [(row['type'], row['id'], row['snippet']) for row in results],
+            [('trainer', self.trainer.pk, "Sara <mark>Pilates</mark>")],
+        )
+        Course.objects.filter(pk=self.yoga.pk).update(description="Sun salutations")
+        self.assertEqual([row['id'] for row in self.search(q="salutation", type="course")], [self.yoga.pk])
+
+    def test_type_filter_and_errors(self):
+        self.assertEqual({row['type'] for row in self.search(q="kettlebell", type="lesson")}, {'lesson'})
+        self.assertEqual(self.client.get('/api/search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'yoga', 'type': 'gym'}).status_code, 400)
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        account = Account.objects.create_user(username="alex", password="x")
+        profile = Profile.objects.create(account=account, profile_type="trainer")
+        self.trainer = Trainer.objects.create(profile_id=profile, name="Alex Strong")
+        self.course = Course.objects.create(trainer_profile=profile, title="Strength 101", price=10, description="")
+        self.specialization = Specialization.objects.create(name="Strength Training")
+        self.client = APIClient()
+        self.client.force_authenticate(account)
+
+    def test_grouped_suggestions(self):
+        response = self.client.get('/api/search/autocomplete', {'q': 'str'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(set(results), {'course', 'trainer', 'specialization', 'category', 'language'})
+        self.assertEqual([row['id'] for row in results['course']], [self.course.pk])
+        self.assertEqual(results['specialization'], [{'id': self.specialization.pk, 'label': "Strength Training", 'score': 1.0}])
+
+    def test_type_filter_and_errors(self):
+        response = self.client.get('/api/search/autocomplete', {'q': 'alex', 'type': 'trainer'})
+        self.assertEqual(response.json()['results'], {'trainer': [{'id': self.trainer.pk, 'label': "Alex Strong", 'score': 1.0}]})
+        self.assertEqual(self.client.get('/api/search/autocomplete').status_code, 400)
+        self.assertEqual(self.client.get('/api/search/autocomplete', {'q': 'a', 'type': 'gym'}).status_code, 400)
+
+    def test_like_wildcards_are_literal(self):
+        self.assertEqual(search_autocomplete.database_suggestions('course', '%', 8), [])
+        self.assertEqual(search_autocomplete.escape_like('50%_off\\'), '50\\%\\_off\\\\')
+
+
+class NearbyTests(TestCase):
+    def setUp(self):
+        self.locations = {}
+        for username, name, country, zip_code in [
+            ("downtown", "Downtown Coach", "Egypt", "11511"),   # central Cairo
+            ("giza", "Giza Coach", "EG", "12511"),              # ~4 km away
+            ("alex", "Alex Coach", "Egypt", "21500"),           # ~180 km away
+            ("nozip", "Unknown Coach", "Egypt", "00000"),
+        ]:
+            account = Account.objects.create_user(username=username, password="x")
+            profile = Profile.objects.create(account=account, profile_type="trainer")
+            self.locations[username] = Trainer.objects.create(
+                profile_id=profile, name=name, country=country, zip_code=zip_code,
+            )
+        out = StringIO()
+        call_command('geocode_locations', type=['trainer'], stdout=out)
+        self.assertIn("trainer: 3 geocoded, 1 with a postal code missing from the table", out.getvalue())
+        self.client = APIClient()
+        self.client.force_authenticate(account)
+
+    def nearby(self, **params):
+        response = self.client.get('/api/search/nearby', {'lat': 30.05, 'lng': 31.24, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['name'] for row in response.json()['results']]
+
+    def test_geocoded_rows(self):
+        trainer = Trainer.objects.get(pk=self.locations["downtown"].pk)
+        self.assertEqual((trainer.latitude, trainer.longitude), (30.0444, 31.2357))
+        self.assertEqual(len(trainer.geohash), 9)
+        self.assertIsNone(Trainer.objects.get(pk=self.locations["nozip"].pk).geohash)
+
+    def test_radius(self):
+        self.assertEqual(self.nearby(radius_km=10), ["Downtown Coach", "Giza Coach"])
+        self.assertEqual(self.nearby(radius_km=1), ["Downtown Coach"])
+        self.assertEqual(self.nearby(radius_km=200, type='trainer'), ["Downtown Coach", "Giza Coach", "Alex Coach"])
+        self.assertEqual(self.nearby(radius_km=10, type='gym_branch'), [])
+
+    def test_k_nearest(self):
+        self.assertEqual(self.nearby(limit=1), ["Downtown Coach"])
+        self.assertEqual(self.nearby(limit=3), ["Downtown Coach", "Giza Coach", "Alex Coach"])
+
+    def test_address_change_drops_location(self):
+        trainer = Trainer.objects.get(pk=self.locations["giza"].pk)
+        trainer.zip_code = "21500"
+        trainer.save()
+
+        self.assertIsNone(Trainer.objects.get(pk=trainer.pk).geohash)
+        self.assertEqual(self.nearby(radius_km=10), ["Downtown Coach"])
+        call_command('geocode_locations', type=['trainer'], stdout=StringIO())
+        # Now next to Alex Coach; equal distances are ordered by id
+        self.assertEqual(self.nearby(radius_km=200, type='trainer'), ["Downtown Coach", "Giza Coach", "Alex Coach"])
+        self.assertEqual(self.nearby(radius_km=10), ["Downtown Coach"])
+
+    def test_limit_applies_per_type_in_sql(self):
+        with self.assertNumQueries(1):
+            results = nearby.within('trainer', 30.05, 31.24, 200, limit=2)
+        self.assertEqual([row['name'] for row in results], ["Downtown Coach", "Giza Coach"])
+        self.assertEqual(results[0]['distanceKm'], round(haversine_km(30.05, 31.24, 30.0444, 31.2357), 3))
+
+    def test_errors(self):
+        self.assertEqual(self.client.get('/api/search/nearby', {'lat': 30}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search/nearby', {'lat': 91, 'lng': 0}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search/nearby', {'lat': 0, 'lng': 0, 'radius_km': 900}).status_code, 400)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import AutocompleteView, NearbyView, SearchView
+
+urlpatterns = [
+    path('', SearchView.as_view(), name='search'),
+    path('autocomplete', AutocompleteView.as_view(), name='search-autocomplete'),
+    path('nearby', NearbyView.as_view(), name='search-nearby'),
+]
@@ -0,0 +1,100 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.pagination import parse_limit
+from . import autocomplete, nearby
+from .query import KINDS, search
+
+MAX_QUERY_LENGTH = 200
+
+
+class SearchView(APIView):
+
+    def get(self, request):
+        """
+        Ranked matches of `q` (web search syntax: quoted phrases, OR, -word) in course titles and
+        descriptions, lesson titles and trainer names. `type` (repeatable) narrows the kinds
+        searched. Snippets are HTML-escaped with matches wrapped in <mark>.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response({"error": "q is required."}, status=400)
+        if len(text) > MAX_QUERY_LENGTH:
+            return Response({"error": f"q is limited to {MAX_QUERY_LENGTH} characters."}, status=400)
+        kinds = [kind for kind in request.query_params.getlist("type") if kind] or KINDS
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            return Response({"error": f"type must be one of {', '.join(KINDS)}."}, status=400)
+        try:
+            limit = parse_limit(request.query_params.get("limit"), default=20, maximum=50)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        return Response({"results": search(text, kinds=sorted(set(kinds), key=KINDS.index), limit=limit)})
+
+
+class AutocompleteView(APIView):
+
+    def get(self, request):
+        """
+        Suggestions for the text typed so far, grouped by type (course, trainer, specialization,
+        category, language; `type` is repeatable and defaults to all). Tolerates small typos
+        where pg_trgm is installed and always for the reference tables.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response({"error": "q is required."}, status=400)
+        if len(text) > MAX_QUERY_LENGTH:
+            return Response({"error": f"q is limited to {MAX_QUERY_LENGTH} characters."}, status=400)
+        kinds = [kind for kind in request.query_params.getlist("type") if kind] or autocomplete.KINDS
+        if set(kinds) - set(autocomplete.KINDS):
+            return Response({"error": f"type must be one of {', '.join(autocomplete.KINDS)}."}, status=400)
+        try:
+            limit = parse_limit(request.query_params.get("limit"), default=8, maximum=20)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        kinds = sorted(set(kinds), key=autocomplete.KINDS.index)
+        return Response({"results": autocomplete.suggest(text, kinds=kinds, limit=limit)})
+
+
+def _coordinate(params, key, limit):
+    try:
+        value = float(params.get(key, ''))
+    except ValueError:
+        raise ValueError(f"{key} is required and must be a number.") from None
+    if not -limit <= value <= limit:
+        raise ValueError(f"{key} must be between -{limit} and {limit}.")
+    return value
+
+
+class NearbyView(APIView):
+
+    def get(self, request):
+        """
+        Geocoded trainers, gym branches and store branches (`type`, repeatable) around lat/lng,
+        nearest first. With radius_km (up to 500) every location in the circle is returned up to
+        `limit`; without it, the `limit` nearest within 500 km.
+        """
+        params = request.query_params
+        try:
+            latitude = _coordinate(params, "lat", 90)
+            longitude = _coordinate(params, "lng", 180)
+            radius = None
+            if params.get("radius_km"):
+                radius = _coordinate(params, "radius_km", nearby.MAX_RADIUS_KM)
+                if radius <= 0:
+                    raise ValueError("radius_km must be greater than 0.")
+            limit = parse_limit(params.get("limit"), default=20, maximum=100)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        kinds = [kind for kind in params.getlist("type") if kind] or nearby.KINDS
+        if set(kinds) - set(nearby.KINDS):
+            return Response({"error": f"type must be one of {', '.join(nearby.KINDS)}."}, status=400)
+
+        results = []
+        for kind in sorted(set(kinds), key=nearby.KINDS.index):
+            if radius is None:
+                results.extend(nearby.nearest(kind, latitude, longitude, limit))
+            else:
+                results.extend(nearby.within(kind, latitude, longitude, radius, limit=limit))
+        results.sort(key=lambda row: (row["distanceKm"], row["type"], row["id"]))
+        return Response({"results": results[:limit]})
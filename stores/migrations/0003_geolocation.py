@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_remove_store_location_store_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storebranch',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='storebranch',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='storebranch',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='storebranch',
+            index=models.Index(fields=['geohash'], name='stores_storebranch_geohash', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0003_geolocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,12 +1,15 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from profiles.models import Profile
+from utils.models import GeoLocation
 # Create your models here.
 
 class Store(models.Model):
     profile_id = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True)
     name = models.CharField(max_length=100)
     profile_picture = models.ImageField(upload_to='store_profiles/', blank=True, null=True)
+    # Thumbnail and WebP storage names, written in the background (see utils.images)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     description = models.CharField(max_length=255, blank=True, null=True)
     store_type = models.CharField(max_length=100, choices=[('supplements', 'Supplements'), ('clothes', 'Clothes'), ('both', 'Both')], blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -32,7 +35,7 @@ class Store(models.Model):
         self.full_clean()
         return super().save(*args, **kwargs)
 
-class StoreBranch(models.Model):
+class StoreBranch(GeoLocation):
     store_id = models.ForeignKey(Store, on_delete=models.CASCADE)
     opening_time = models.TimeField()
     closing_time = models.TimeField()
@@ -8,6 +8,8 @@ class Trainee(models.Model):
     profile_id = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True)
     name = models.CharField(max_length=100)
     profile_picture = models.ImageField(upload_to='trainee_profiles/', blank=True, null=True)
+    # Thumbnail and WebP storage names, written in the background (see utils.images)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     gender = models.CharField(max_length=10, choices=[('male', 'Male'), ('female', 'Female')],default='male')
     birthdate = models.DateField(default=now)
     country = models.CharField(max_length=100, blank=True, null=True)
@@ -0,0 +1,131 @@
+"""
+Free calendar slots and booking.
+
+Availability reads free slots in time order from the (trainer, slot_date, slot_start_time)
+index, or, for every trainer of a specialization, from the partial index on free slots by
+date; pages follow a keyset cursor on (slot_date, slot_start_time, trainer_id, id).
+
+Booking locks the first free slot among its candidates with SELECT ... FOR UPDATE SKIP LOCKED
+and flags it in the same transaction. Concurrent bookings for the same trainer therefore take
+different slots instead of queueing behind one row lock, and a slot that another transaction
+is booking right now counts as taken. A slot whose booking committed meanwhile is re-checked
+by PostgreSQL against `is_booked = false` before it is locked, so it can't be booked twice.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.pagination import after, decode_cursor
+from .models import TrainerCalendarSlot, TrainerSpecialization
+
+AVAILABILITY_ORDERING = ('slot_date', 'slot_start_time', 'trainer_id', 'id')
+AVAILABILITY_FIELDS = ('id',)
+AVAILABILITY_ALIASES = {
+    'trainerId': F('trainer_id'),
+    'trainerName': F('trainer__name'),
+    'date': F('slot_date'),
+    'startTime': F('slot_start_time'),
+    'endTime': F('slot_end_time'),
+}
+MAX_RANGE_DAYS = 92
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+def _date(params, key, required=True):
+    value = params.get(key)
+    if value in (None, ''):
+        if required:
+            raise ValueError(f'{key} is required.')
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be a date (YYYY-MM-DD).') from None
+
+
+def _id(params, key):
+    value = params.get(key)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be an integer id.') from None
+
+
+def free_slots():
+    return TrainerCalendarSlot.objects.filter(is_booked=False, slot_date__gte=timezone.localdate())
+
+
+def availability_queryset(params):
+    """
+    Free slots between `start` and `end` (inclusive, at most MAX_RANGE_DAYS apart) of `trainer`
+    and/or of any trainer with `specialization`, in time order. Raises ValueError on bad parameters.
+    """
+    start, end = _date(params, 'start'), _date(params, 'end')
+    if end < start:
+        raise ValueError('end must not be before start.')
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f'start and end must be at most {MAX_RANGE_DAYS} days apart.')
+    trainer, specialization = _id(params, 'trainer'), _id(params, 'specialization')
+    if trainer is None and specialization is None:
+        raise ValueError('trainer or specialization is required.')
+
+    slots = free_slots().filter(slot_date__range=(start, end)).order_by(*AVAILABILITY_ORDERING)
+    if trainer is not None:
+        slots = slots.filter(trainer_id=trainer)
+    if specialization is not None:
+        # Semi-join, so a trainer's slots are listed once
+        slots = slots.filter(trainer_id__in=TrainerSpecialization.objects.filter(specialization_id=specialization).values('trainer_id'))
+    return slots
+
+
+def page_after(slots, cursor):
+    if not cursor:
+        return slots
+    return slots.filter(after(AVAILABILITY_ORDERING, decode_cursor(cursor, TrainerCalendarSlot, AVAILABILITY_ORDERING)))
+
+
+def booking_candidates(data):
+    """
+    Slots a booking request may take: `slot_id`, or the free slots of `trainer_id` on `date`
+    from `from_time` (HH:MM) on. Raises ValueError on bad input.
+    """
+    slot_id = _id(data, 'slot_id')
+    if slot_id is not None:
+        return free_slots().filter(pk=slot_id)
+    trainer = _id(data, 'trainer_id')
+    if trainer is None:
+        raise ValueError('slot_id or trainer_id and date are required.')
+    slots = free_slots().filter(trainer_id=trainer, slot_date=_date(data, 'date'))
+    from_time = data.get('from_time')
+    if from_time:
+        try:
+            slots = slots.filter(slot_start_time__gte=datetime.time.fromisoformat(from_time))
+        except (TypeError, ValueError):
+            raise ValueError('from_time must be a time (HH:MM).') from None
+    return slots
+
+
+def book(candidates, profile):
+    """Book the earliest of `candidates` nobody holds for `profile`; raises SlotUnavailable when none is left."""
+    with transaction.atomic():
+        slot = candidates.order_by(*AVAILABILITY_ORDERING).select_for_update(skip_locked=True).first()
+        if slot is None:
+            raise SlotUnavailable()
+        slot.is_booked, slot.booked_by = True, profile
+        slot.save(update_fields=['is_booked', 'booked_by', 'updated_at'])
+    return slot
+
+
+def cancel(slot_id, profile):
+    """Release `profile`'s booking of a slot; False when it doesn't hold one."""
+    return bool(
+        TrainerCalendarSlot.objects.filter(pk=slot_id, is_booked=True, booked_by=profile)
+        .update(is_booked=False, booked_by=None, updated_at=timezone.now())
+    )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+        ('trainers', '0004_alter_trainerexperience_position_and_more'),
+        ('utils', '0002_category_language_level'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trainer',
+            index=models.Index(fields=['country', 'state'], name='trainer_country_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainerspecialization',
+            index=models.Index(fields=['specialization', 'hourly_rate', 'trainer', 'id'], name='trainerspec_spec_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainerspecialization',
+            index=models.Index(fields=['hourly_rate', 'trainer', 'id'], name='trainerspec_rate_idx'),
+        ),
+    ]
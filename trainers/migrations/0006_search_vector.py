@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+        ('trainers', '0005_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Keep the vector current on every insert and on name updates, then fill existing rows
+        migrations.RunSQL(
+            sql='''
+                CREATE FUNCTION trainers_trainer_search_vector() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector := setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql;
+                CREATE TRIGGER trainers_trainer_search_vector
+                    BEFORE INSERT OR UPDATE OF name, search_vector ON trainers_trainer
+                    FOR EACH ROW EXECUTE FUNCTION trainers_trainer_search_vector();
+
+                UPDATE trainers_trainer SET name = name;
+            ''',
+            reverse_sql='''
+                DROP TRIGGER trainers_trainer_search_vector ON trainers_trainer;
+                DROP FUNCTION trainers_trainer_search_vector();
+            ''',
+        ),
+        migrations.AddIndex(
+            model_name='trainer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='trainer_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+        ('trainers', '0006_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainer',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='trainer',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trainer',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='trainer',
+            index=models.Index(fields=['geohash'], name='trainers_trainer_geohash', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_profile_uniq_account_profiletype'),
+        ('trainers', '0008_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainercalendarslot',
+            name='booked_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='booked_slots', to='profiles.profile'),
+        ),
+        migrations.AddIndex(
+            model_name='trainercalendarslot',
+            index=models.Index(fields=['trainer', 'slot_date', 'slot_start_time'], name='trainerslot_trainer_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainercalendarslot',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['slot_date', 'slot_start_time'], name='trainerslot_free_time_idx'),
+        ),
+    ]
@@ -1,14 +1,18 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.timezone import now
 from django.db import models
 from django.core.exceptions import ValidationError
 from profiles.models import Profile
-from utils.models import Specialization
+from utils.models import GeoLocation, Specialization
 # Create your models here.
 
-class Trainer(models.Model):
+class Trainer(GeoLocation):
     profile_id = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True)
     name = models.CharField(max_length=100)
     profile_picture = models.ImageField(upload_to='trainer_profiles/', blank=True, null=True)
+    # Thumbnail and WebP storage names, written in the background (see utils.images)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     gender = models.CharField(max_length=10, choices=[('male', 'Male'), ('female', 'Female')], default='male')
     birthdate = models.DateField(default=now)
     country = models.CharField(max_length=100, blank=True, null=True)
@@ -18,6 +22,16 @@ class Trainer(models.Model):
     balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Name (A); written by a database trigger, see migration 0006
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta(GeoLocation.Meta):
+        indexes = [
+            *GeoLocation.Meta.indexes,
+            # Location filters of trainer search
+            models.Index(fields=['country', 'state'], name='trainer_country_state_idx'),
+            GinIndex(fields=['search_vector'], name='trainer_search_vector_idx'),
+        ]
 
     def __str__(self):
         return f"Trainer<{self.name}> for Profile {self.profile_id}"
@@ -40,6 +54,13 @@ class TrainerSpecialization(models.Model):
     hourly_rate = models.DecimalField(max_digits=7, decimal_places=2)
     service_location = models.CharField(max_length=100, choices=[("online", "Online"), ("offline", "Offline"), ("both", "Both")])
 
+    class Meta:
+        indexes = [
+            # Trainer search pages in (hourly_rate, trainer, id) order, within a specialization or across all
+            models.Index(fields=['specialization', 'hourly_rate', 'trainer', 'id'], name='trainerspec_spec_rate_idx'),
+            models.Index(fields=['hourly_rate', 'trainer', 'id'], name='trainerspec_rate_idx'),
+        ]
+
     def __str__(self):
         return f"TrainerSpecialization<{self.specialization}> for Trainer {self.trainer.name}"
     
@@ -78,9 +99,19 @@ class TrainerCalendarSlot(models.Model):
     slot_start_time = models.TimeField()
     slot_end_time = models.TimeField()
     is_booked = models.BooleanField(default=False)
+    # Trainee profile holding the slot; set together with is_booked (see trainers.availability)
+    booked_by = models.ForeignKey(Profile, on_delete=models.SET_NULL, null=True, blank=True, related_name='booked_slots')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # One trainer's calendar in time order
+            models.Index(fields=['trainer', 'slot_date', 'slot_start_time'], name='trainerslot_trainer_time_idx'),
+            # Free slots of any trainer by date, for specialization-wide availability
+            models.Index(fields=['slot_date', 'slot_start_time'], condition=models.Q(is_booked=False), name='trainerslot_free_time_idx'),
+        ]
+
     def __str__(self):
         return f"TrainerCalenderSlot<{self.slot_date} {self.slot_start_time}-{self.slot_end_time}> for Trainer {self.trainer_id.name}"
     
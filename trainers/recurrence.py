@@ -0,0 +1,123 @@
+"""
+Weekly recurrence rules ("Mon/Wed/Fri 07:00-08:00 for 12 weeks") expanded into calendar slots.
+
+The occurrences of a rule are generated in date order and checked against the trainer's
+existing slots in the same date range, read with one query in (slot_date, slot_start_time)
+order. One merge-style sweep over the two sorted lists finds every overlap, so the check costs
+the same whether the rule has ten occurrences or a year of them. The free occurrences are
+inserted with bulk_create in chunks; the trainer row is locked meanwhile so two expansions for
+the same trainer can't both insert the same hour.
+"""
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Trainer, TrainerCalendarSlot
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+MAX_WEEKS = 53
+INSERT_CHUNK_SIZE = 1000
+
+
+def parse_rule(data):
+    """
+    (weekdays, start_time, end_time, start_date, end_date) from a request body: `weekdays`
+    (list or comma-separated, 'mon'..'sun'), `start_time` and `end_time` (HH:MM), `start_date`
+    (default today, in TIME_ZONE) and either `weeks` (default 12) or `end_date`. Raises ValueError on bad input.
+    """
+    weekdays = data.getlist('weekdays') if hasattr(data, 'getlist') else data.get('weekdays')
+    if isinstance(weekdays, str):
+        weekdays = [weekdays]
+    if not isinstance(weekdays, (list, tuple)) or not all(isinstance(value, str) for value in weekdays):
+        raise ValueError(f"weekdays must be a list of {', '.join(WEEKDAYS)}.")
+    weekdays = {day.strip().lower()[:3] for value in weekdays for day in value.split(',')}
+    if not weekdays or not weekdays <= set(WEEKDAYS):
+        raise ValueError(f"weekdays must be a list of {', '.join(WEEKDAYS)}.")
+
+    try:
+        start_time = datetime.time.fromisoformat(data.get('start_time') or '')
+        end_time = datetime.time.fromisoformat(data.get('end_time') or '')
+    except (TypeError, ValueError):
+        raise ValueError('start_time and end_time must be times (HH:MM).') from None
+    if end_time <= start_time:
+        raise ValueError('end_time must be after start_time.')
+
+    try:
+        start_date = datetime.date.fromisoformat(data['start_date']) if data.get('start_date') else timezone.localdate()
+        end_date = datetime.date.fromisoformat(data['end_date']) if data.get('end_date') else None
+        weeks = int(data.get('weeks') or 12) if end_date is None else None
+    except (TypeError, ValueError):
+        raise ValueError('start_date and end_date must be dates (YYYY-MM-DD) and weeks an integer.') from None
+    if end_date is None:
+        # Bounded first: timedelta overflows long before an int runs out
+        if not 0 < weeks <= MAX_WEEKS:
+            raise ValueError(f'weeks must be between 1 and {MAX_WEEKS}.')
+        try:
+            end_date = start_date + datetime.timedelta(weeks=weeks, days=-1)
+        except OverflowError:
+            raise ValueError('The rule must end before the year 10000.') from None
+    if end_date < start_date:
+        raise ValueError('The rule must end on or after start_date.')
+    if (end_date - start_date).days >= MAX_WEEKS * 7:
+        raise ValueError(f'A rule can cover at most {MAX_WEEKS} weeks.')
+    return sorted(WEEKDAYS.index(day) for day in weekdays), start_time, end_time, start_date, end_date
+
+
+def occurrences(weekdays, start_time, end_time, start_date, end_date):
+    """(date, start, end) of every occurrence of the rule, in date order."""
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays:
+            yield day, start_time, end_time
+        day += datetime.timedelta(days=1)
+
+
+def sweep_collisions(candidates, existing):
+    """
+    Pairs (candidate, existing) that overlap in time on the same date. Both inputs are sorted
+    by (date, start); `existing` rows are (date, start, end, id). A slot that ends by the time
+    the current candidate starts can't overlap any later candidate either, so the window of
+    existing slots to compare only moves forward.
+    """
+    collisions = []
+    first = 0
+    for candidate in candidates:
+        day, start, end = candidate
+        while first < len(existing) and (existing[first][0], existing[first][2]) <= (day, start):
+            first += 1
+        index = first
+        while index < len(existing) and (existing[index][0], existing[index][1]) < (day, end):
+            slot = existing[index]
+            if slot[0] == day and slot[2] > start:
+                collisions.append((candidate, slot))
+            index += 1
+    return collisions
+
+
+def expand_rule(trainer, rule, dry_run=False):
+    """
+    Create the slots of `rule` (see parse_rule) for `trainer`, skipping occurrences that overlap
+    an existing slot. Returns (slots created, [(occurrence, existing slot row), ...]).
+    """
+    *_, start_date, end_date = rule
+    candidates = list(occurrences(*rule))
+    with transaction.atomic():
+        # Serializes expansions per trainer. NO KEY so other slot inserts, whose foreign key
+        # checks take FOR KEY SHARE, aren't held up; bookings only lock slot rows.
+        Trainer.objects.select_for_update(no_key=True).filter(pk=trainer.pk).values_list('pk', flat=True).get()
+        existing = list(
+            TrainerCalendarSlot.objects.filter(trainer=trainer, slot_date__range=(start_date, end_date))
+            .order_by('slot_date', 'slot_start_time', 'id')
+            .values_list('slot_date', 'slot_start_time', 'slot_end_time', 'id')
+        )
+        collisions = sweep_collisions(candidates, existing)
+        taken = {candidate for candidate, _ in collisions}
+        slots = [
+            TrainerCalendarSlot(trainer=trainer, slot_date=day, slot_start_time=start, slot_end_time=end)
+            for day, start, end in candidates
+            if (day, start, end) not in taken
+        ]
+        if not dry_run:
+            TrainerCalendarSlot.objects.bulk_create(slots, batch_size=INSERT_CHUNK_SIZE)
+    return slots, collisions
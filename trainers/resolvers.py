@@ -0,0 +1,65 @@
+from accounts.models import ROLE_BITS, Account
+from profiles.models import Profile
+
+RESOLVER_ATTRIBUTE = '_trainer_resolver'
+
+
+class TrainerResolver:
+    """
+    Memoizes account -> trainer profile -> trainer lookups, and the account's role_mask when an
+    error needs wording. One instance lives for one request, so the validation and create hooks
+    of the trainer serializers share a single query.
+    """
+
+    def __init__(self):
+        self._profiles = {}
+        self._accounts = {}
+
+    def trainer_profile(self, account_id):
+        """The account's trainer Profile with its Trainer joined in, or None."""
+        if account_id not in self._profiles:
+            self._profiles[account_id] = (
+                Profile.objects.select_related('trainer')
+                .filter(account_id=account_id, profile_type='trainer')
+                .first()
+            )
+        return self._profiles[account_id]
+
+    def trainer(self, account_id):
+        profile = self.trainer_profile(account_id)
+        if profile is None:
+            return None
+        try:
+            return profile.trainer
+        except Profile.trainer.RelatedObjectDoesNotExist:
+            return None
+
+    def role_mask(self, account_id):
+        """Account.role_mask, or None when there is no such account."""
+        if account_id not in self._accounts:
+            self._accounts[account_id] = Account.objects.filter(pk=account_id).values_list('role_mask', flat=True).first()
+        return self._accounts[account_id]
+
+    def trainer_error(self, account_id):
+        """Why trainer_profile() found nothing, worded from the account's role mask."""
+        mask = self.role_mask(account_id)
+        if mask is None:
+            return "Account does not exist."
+        if not mask & ROLE_BITS['trainer']:
+            return 'Account must have a profile with profile_type="trainer".'
+        # The bit is set but the profile isn't visible yet, e.g. created by a concurrent request
+        return "Trainer profile is not available yet; try again."
+
+
+def get_trainer_resolver(context):
+    """The resolver of the serializer context's request, or of the context itself when there is no request."""
+    request = context.get('request')
+    if request is None:
+        if RESOLVER_ATTRIBUTE not in context:
+            context[RESOLVER_ATTRIBUTE] = TrainerResolver()
+        return context[RESOLVER_ATTRIBUTE]
+    resolver = getattr(request, RESOLVER_ATTRIBUTE, None)
+    if resolver is None:
+        resolver = TrainerResolver()
+        setattr(request, RESOLVER_ATTRIBUTE, resolver)
+    return resolver
@@ -0,0 +1,111 @@
+"""
+Trainer discovery. Results are specialization offerings (one TrainerSpecialization with its
+trainer) ordered by hourly rate, paged with a keyset cursor on (hourly_rate, trainer_id, id).
+Every filter is an equality or range on a column covered by the composite indexes declared
+on TrainerSpecialization and Trainer, so a page is an index range scan whatever its depth.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+from django.db.models import F
+
+from api.pagination import after, decode_cursor
+from .models import Trainer, TrainerSpecialization
+
+SEARCH_ORDERING = ('hourly_rate', 'trainer_id', 'id')
+SEARCH_FIELDS = ('id',)
+SEARCH_ALIASES = {
+    'trainerId': F('trainer_id'),
+    'name': F('trainer__name'),
+    'gender': F('trainer__gender'),
+    'country': F('trainer__country'),
+    'state': F('trainer__state'),
+    'specializationId': F('specialization_id'),
+    'specializationName': F('specialization__name'),
+    'hourlyRate': F('hourly_rate'),
+    'yearsOfExperience': F('years_of_experience'),
+    'serviceLocation': F('service_location'),
+}
+
+SERVICE_LOCATIONS = {value for value, _ in TrainerSpecialization._meta.get_field('service_location').choices}
+GENDERS = {value for value, _ in Trainer._meta.get_field('gender').choices}
+
+# Counts per specialization and per service location over the filtered offerings, in one pass
+FACETS_SQL = '''
+    SELECT offering.specialization_id, specialization.name, offering.service_location,
+           COUNT(DISTINCT offering.trainer_id)
+    FROM ({offerings}) AS offering
+    JOIN utils_specialization specialization ON specialization.id = offering.specialization_id
+    GROUP BY GROUPING SETS ((offering.specialization_id, specialization.name), (offering.service_location))
+'''
+
+
+def _rate(params, key):
+    value = params.get(key)
+    if value in (None, ''):
+        return None
+    try:
+        rate = Decimal(value)
+    except InvalidOperation:
+        rate = None
+    if rate is None or not rate.is_finite():
+        raise ValueError(f'{key} must be a number.')
+    return rate
+
+
+def search_queryset(params):
+    """Offerings matching the query parameters, in search order. Raises ValueError on bad parameters."""
+    offerings = TrainerSpecialization.objects.order_by(*SEARCH_ORDERING)
+
+    specializations = [value for value in params.getlist('specialization') if value]
+    if specializations:
+        try:
+            offerings = offerings.filter(specialization_id__in=[int(value) for value in specializations])
+        except ValueError:
+            raise ValueError('specialization must be an integer id.') from None
+
+    min_rate, max_rate = _rate(params, 'min_rate'), _rate(params, 'max_rate')
+    if min_rate is not None:
+        offerings = offerings.filter(hourly_rate__gte=min_rate)
+    if max_rate is not None:
+        offerings = offerings.filter(hourly_rate__lte=max_rate)
+
+    service_location = params.get('service_location')
+    if service_location:
+        if service_location not in SERVICE_LOCATIONS:
+            raise ValueError(f"service_location must be one of {', '.join(sorted(SERVICE_LOCATIONS))}.")
+        # Trainers working both ways are found by online and offline searches alike
+        offerings = offerings.filter(service_location__in=sorted({service_location, 'both'}))
+
+    gender = params.get('gender')
+    if gender:
+        if gender not in GENDERS:
+            raise ValueError(f"gender must be one of {', '.join(sorted(GENDERS))}.")
+        offerings = offerings.filter(trainer__gender=gender)
+    for key in ('country', 'state'):
+        if params.get(key):
+            offerings = offerings.filter(**{f'trainer__{key}': params[key]})
+    return offerings
+
+
+def page_after(offerings, cursor):
+    if not cursor:
+        return offerings
+    return offerings.filter(after(SEARCH_ORDERING, decode_cursor(cursor, TrainerSpecialization, SEARCH_ORDERING)))
+
+
+def search_facets(offerings):
+    """{'specializations': [...], 'serviceLocations': [...]} for the filtered offerings, from one GROUP BY."""
+    sql, params = offerings.order_by().values('trainer_id', 'specialization_id', 'service_location').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(FACETS_SQL.format(offerings=sql), params)
+        rows = cursor.fetchall()
+    specializations, locations = [], []
+    for specialization_id, name, service_location, count in rows:
+        if service_location is None:
+            specializations.append({'id': specialization_id, 'name': name, 'count': count})
+        else:
+            locations.append({'value': service_location, 'count': count})
+    specializations.sort(key=lambda facet: (-facet['count'], facet['name']))
+    locations.sort(key=lambda facet: (-facet['count'], facet['value']))
+    return {'specializations': specializations, 'serviceLocations': locations}
@@ -1,14 +1,16 @@
 from rest_framework import serializers
 
-from accounts.models import Account
 from .models import Trainer, TrainerSpecialization, TrainerExperience
+from .resolvers import get_trainer_resolver
 from profiles.models import Profile
+from utils.serializers import BoundedImageField
 import re
 
 class TrainerSerializer(serializers.ModelSerializer):
     # Accept account_id from frontend, convert to profile_id internally
     account_id = serializers.IntegerField(write_only=True)
-    profile_picture = serializers.ImageField(required=False, allow_null=True, allow_empty_file=True)
+    # Written as a header-checked upload, read as the URL of the ?image_size= variant (see utils.images)
+    profile_picture = BoundedImageField(required=False, allow_null=True, allow_empty_file=True)
     birthdate = serializers.DateField(required=False)
     balance = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
 
@@ -31,16 +33,10 @@ class TrainerSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at", "updated_at", "balance"]
 
     def validate_account_id(self, value):
-        # Get the account
-        try:
-            account = Account.objects.get(pk=value)
-        except Account.DoesNotExist:
-            raise serializers.ValidationError("Account does not exist.")
-        
-        # Find trainer profile from the account
-        trainer_profile = account.profiles.filter(profile_type="trainer").first()
-        if not trainer_profile:
-            raise serializers.ValidationError('Account must have a profile with profile_type="trainer".')
+        # Find trainer profile from the account; the resolver keeps it for the other hooks
+        resolver = get_trainer_resolver(self.context)
+        if resolver.trainer_profile(value) is None:
+            raise serializers.ValidationError(resolver.trainer_error(value))
         
         return value
 
@@ -53,17 +49,15 @@ class TrainerSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Get account_id and find the trainer profile
         account_id = validated_data.pop("account_id")
-        account = Account.objects.get(pk=account_id)
-        trainer_profile = account.profiles.filter(profile_type="trainer").first()
+        resolver = get_trainer_resolver(self.context)
         
         # Check if trainer already exists for this profile
-        if Trainer.objects.filter(profile_id=trainer_profile).exists():
+        if resolver.trainer(account_id) is not None:
             raise serializers.ValidationError({"account_id": "Trainer already exists for this account."})
         
-        # Create trainer with the found profile
-        trainer = Trainer(profile_id=trainer_profile, **validated_data)
-        trainer.full_clean()
-        trainer.save()
+        # Create trainer with the found profile; save() runs full_clean() and the row is known to be new
+        trainer = Trainer(profile_id=resolver.trainer_profile(account_id), **validated_data)
+        trainer.save(force_insert=True)
         return trainer
 
     def update(self, instance, validated_data):
@@ -72,7 +66,6 @@ class TrainerSerializer(serializers.ModelSerializer):
         
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.full_clean()
         instance.save()
         return instance
     
@@ -90,19 +83,13 @@ class TrainerSpecializationSerializer(serializers.ModelSerializer):
         ]
     
     def validate_account_id(self, value):
-        # Get the account
-        try:
-            account = Account.objects.get(pk=value)
-        except Account.DoesNotExist:
-            raise serializers.ValidationError("Account does not exist.")
-        
-        # Find trainer profile from the account
-        trainer_profile = account.profiles.filter(profile_type="trainer").first()
-        if not trainer_profile:
-            raise serializers.ValidationError('Account must have a profile with profile_type="trainer".')
+        # Find trainer profile from the account; the resolver keeps it for the other hooks
+        resolver = get_trainer_resolver(self.context)
+        if resolver.trainer_profile(value) is None:
+            raise serializers.ValidationError(resolver.trainer_error(value))
         
         # Check if trainer exists for this profile
-        if not Trainer.objects.filter(profile_id=trainer_profile).exists():
+        if resolver.trainer(value) is None:
             raise serializers.ValidationError("Trainer does not exist for this account.")
         
         return value
@@ -113,9 +100,7 @@ class TrainerSpecializationSerializer(serializers.ModelSerializer):
         specialization = data.get('specialization')
         
         if account_id and specialization:
-            account = Account.objects.get(pk=account_id)
-            trainer_profile = account.profiles.filter(profile_type="trainer").first()
-            trainer = Trainer.objects.filter(profile_id=trainer_profile).first()
+            trainer = get_trainer_resolver(self.context).trainer(account_id)
             
             # Check if this trainer already has this specialization
             if TrainerSpecialization.objects.filter(
@@ -139,13 +124,10 @@ class TrainerSpecializationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Get account_id and find the trainer
         account_id = validated_data.pop("account_id")
-        account = Account.objects.get(pk=account_id)
-        trainer_profile = account.profiles.filter(profile_type="trainer").first()
-        trainer = Trainer.objects.get(profile_id=trainer_profile)
+        trainer = get_trainer_resolver(self.context).trainer(account_id)
         
         # Create specialization with the trainer
         specialization = TrainerSpecialization(trainer=trainer, **validated_data)
-        specialization.full_clean()
         specialization.save()
         return specialization
     
@@ -155,7 +137,6 @@ class TrainerSpecializationSerializer(serializers.ModelSerializer):
         
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.full_clean()
         instance.save()
         return instance
     
@@ -174,19 +155,13 @@ class TrainerExperienceSerializer(serializers.ModelSerializer):
         ]
     
     def validate_account_id(self, value):
-        # Get the account
-        try:
-            account = Account.objects.get(pk=value)
-        except Account.DoesNotExist:
-            raise serializers.ValidationError("Account does not exist.")
-        
-        # Find trainer profile from the account
-        trainer_profile = account.profiles.filter(profile_type="trainer").first()
-        if not trainer_profile:
-            raise serializers.ValidationError('Account must have a profile with profile_type="trainer".')
+        # Find trainer profile from the account; the resolver keeps it for the other hooks
+        resolver = get_trainer_resolver(self.context)
+        if resolver.trainer_profile(value) is None:
+            raise serializers.ValidationError(resolver.trainer_error(value))
         
         # Check if trainer exists for this profile
-        if not Trainer.objects.filter(profile_id=trainer_profile).exists():
+        if resolver.trainer(value) is None:
             raise serializers.ValidationError("Trainer does not exist for this account.")
         
         return value
@@ -202,13 +177,10 @@ class TrainerExperienceSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Get account_id and find the trainer
         account_id = validated_data.pop("account_id")
-        account = Account.objects.get(pk=account_id)
-        trainer_profile = account.profiles.filter(profile_type="trainer").first()
-        trainer = Trainer.objects.get(profile_id=trainer_profile)
+        trainer = get_trainer_resolver(self.context).trainer(account_id)
         
         # Create experience with the trainer
         experience = TrainerExperience(trainer=trainer, **validated_data)
-        experience.full_clean()
         experience.save()
         return experience
     
@@ -218,6 +190,5 @@ class TrainerExperienceSerializer(serializers.ModelSerializer):
         
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.full_clean()
         instance.save()
         return instance
\ No newline at end of file
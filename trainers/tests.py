@@ -1,3 +1,493 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, time, timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from api.pagination import encode_cursor
+from profiles.models import Profile
+from utils.images import VARIANT_FORMATS, VARIANT_SIZES, generate_variants
+from utils.models import Specialization
+from .models import Trainer, TrainerCalendarSlot, TrainerExperience, TrainerSpecialization
+from .recurrence import sweep_collisions
+
+
+class TrainerPostQueryTests(TestCase):
+    """Each POST resolves account -> trainer profile -> trainer once and shares it across its hooks."""
+
+    def setUp(self):
+        self.account = Account.objects.create_user(username="tara", password="x")
+        self.profile = Profile.objects.create(account=self.account, profile_type="trainer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.account)
+
+    def create_trainer(self):
+        return Trainer.objects.create(profile_id=self.profile, name="Tara")
+
+    def test_create_trainer(self):
+        # Resolve, then save(): full_clean's profile and primary key checks and the INSERT
+        with self.assertNumQueries(4):
+            response = self.client.post('/api/trainers/create', {'account_id': self.account.pk, 'name': "Tara"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Trainer.objects.get(profile_id=self.profile).name, "Tara")
+
+    def test_create_trainer_twice_is_rejected(self):
+        self.create_trainer()
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/trainers/create', {'account_id': self.account.pk, 'name': "Tara"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_specialization(self):
+        self.create_trainer()
+        specialization = Specialization.objects.create(name="Yoga")
+        data = {
+            'account_id': self.account.pk,
+            'specialization': specialization.pk,
+            'years_of_experience': 3,
+            'hourly_rate': '40.00',
+            'service_location': 'online',
+        }
+        # Specialization lookup, resolve, duplicate check, full_clean's two foreign keys, INSERT
+        with self.assertNumQueries(6):
+            response = self.client.post('/api/trainers/specializations', data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TrainerSpecialization.objects.get().trainer_id, self.profile.pk)
+
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/trainers/specializations', data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('specialization', response.data)
+
+    def test_create_experience(self):
+        self.create_trainer()
+        data = {'account_id': self.account.pk, 'work_place': "Gym", 'position': "Coach", 'start_date': '2020-01-01'}
+        # Resolve, full_clean's trainer check, INSERT
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/trainers/experiences', data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TrainerExperience.objects.get().trainer_id, self.profile.pk)
+
+    def test_account_errors(self):
+        other = Account.objects.create_user(username="otto", password="x")
+        response = self.client.post('/api/trainers/experiences', {'account_id': other.pk})
+        self.assertEqual(response.data['account_id'], ['Account must have a profile with profile_type="trainer".'])
+        response = self.client.post('/api/trainers/experiences', {'account_id': other.pk + 1000})
+        self.assertEqual(response.data['account_id'], ['Account does not exist.'])
+        response = self.client.post('/api/trainers/experiences', {'account_id': self.account.pk})
+        self.assertEqual(response.data['account_id'], ['Trainer does not exist for this account.'])
+
+
+class TrainerSearchTests(TestCase):
+    def setUp(self):
+        self.yoga = Specialization.objects.create(name="Yoga")
+        self.boxing = Specialization.objects.create(name="Boxing")
+        self.trainers = []
+        for i, (gender, country, rate, location) in enumerate([
+            ("female", "EG", "30.00", "online"),
+            ("male", "EG", "30.00", "offline"),
+            ("female", "US", "50.00", "both"),
+            ("male", "EG", "80.00", "online"),
+        ]):
+            account = Account.objects.create_user(username=f"coach{i}", password="x")
+            profile = Profile.objects.create(account=account, profile_type="trainer")
+            trainer = Trainer.objects.create(profile_id=profile, name=f"Coach {i}", gender=gender, country=country)
+            TrainerSpecialization.objects.create(
+                trainer=trainer, specialization=self.yoga, years_of_experience=i,
+                hourly_rate=rate, service_location=location,
+            )
+            self.trainers.append(trainer)
+        TrainerSpecialization.objects.create(
+            trainer=self.trainers[0], specialization=self.boxing, years_of_experience=1,
+            hourly_rate="60.00", service_location="offline",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.trainers[0].profile_id.account)
+
+    def search(self, **params):
+        response = self.client.get('/api/trainers/search', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, data):
+        return [row['trainerId'] for row in data['results']]
+
+    def test_filters(self):
+        pks = [trainer.pk for trainer in self.trainers]
+        self.assertEqual(self.ids(self.search(specialization=self.boxing.pk)), [pks[0]])
+        self.assertEqual(self.ids(self.search(min_rate="40", max_rate="70")), [pks[2], pks[0]])
+        self.assertEqual(self.ids(self.search(specialization=self.yoga.pk, service_location="online")), [pks[0], pks[2], pks[3]])
+        self.assertEqual(self.ids(self.search(gender="male", country="EG")), [pks[1], pks[3]])
+        self.assertEqual(self.client.get('/api/trainers/search', {'min_rate': 'cheap'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/trainers/search', {'service_location': 'moon'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/trainers/search', {'cursor': encode_cursor(['cheap', 1, 1])}).status_code, 400)
+
+    def test_pages_follow_cursor_in_rate_order(self):
+        seen = []
+        data = self.search(limit=2)
+        facets = data['facets']
+        while True:
+            seen.extend((row['hourlyRate'], row['trainerId']) for row in data['results'])
+            if not data['nextCursor']:
+                break
+            data = self.search(limit=2, cursor=data['nextCursor'])
+            self.assertNotIn('facets', data)
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen, key=lambda row: (float(row[0]), row[1])))
+
+        self.assertEqual(facets['specializations'], [
+            {'id': self.yoga.pk, 'name': "Yoga", 'count': 4},
+            {'id': self.boxing.pk, 'name': "Boxing", 'count': 1},
+        ])
+        self.assertEqual(facets['serviceLocations'], [
+            {'value': "offline", 'count': 2},
+            {'value': "online", 'count': 2},
+            {'value': "both", 'count': 1},
+        ])
+
+    def test_first_page_costs_two_queries(self):
+        with self.assertNumQueries(2):
+            self.search(specialization=self.yoga.pk, min_rate="10")
+
+
+def jpeg_upload(name="photo.jpg", size=(2400, 1600)):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buffer, 'JPEG', quality=95)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class PictureTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/', IMAGE_VARIANT_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.account = Account.objects.create_user(username="pia", password="x")
+        self.profile = Profile.objects.create(account=self.account, profile_type="trainer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.account)
+
+
+class ProfilePictureVariantTests(PictureTestCase):
+    def upload(self, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/trainers/create', {'account_id': self.account.pk, 'name': "Pia", 'profile_picture': file}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        return Trainer.objects.get(pk=self.profile.pk)
+
+    def listed_picture(self, **kwargs):
+        response = self.client.get('/api/trainers/create', kwargs.pop('params', {}), **kwargs)
+        return response.json()[0]['profile_picture']
+
+    def test_variants_rendered_after_commit(self):
+        trainer = self.upload(jpeg_upload())
+        variants = trainer.profile_picture_variants
+        self.assertEqual(variants['source'], trainer.profile_picture.name)
+        for label, size in VARIANT_SIZES.items():
+            self.assertEqual(set(variants[label]), set(VARIANT_FORMATS))
+            for name in variants[label].values():
+                with trainer.profile_picture.storage.open(name) as f, Image.open(f) as image:
+                    self.assertEqual(image.size, (size, size))
+        small = trainer.profile_picture.storage.size(variants['small']['webp'])
+        self.assertLess(small * 50, trainer.profile_picture.size)
+
+    def test_serializer_picks_size_and_format(self):
+        trainer = self.upload(jpeg_upload())
+        variants = trainer.profile_picture_variants
+        self.assertTrue(self.listed_picture().endswith('/media/' + variants['medium']['jpeg']))
+        self.assertTrue(self.listed_picture(params={'image_size': 'small'}, HTTP_ACCEPT='image/webp,*/*').endswith(variants['small']['webp']))
+        self.assertTrue(self.listed_picture(params={'image_size': 'original'}).endswith(trainer.profile_picture.name))
+
+    def test_original_served_until_variants_exist(self):
+        with override_settings(IMAGE_VARIANT_WORKERS=2), self.captureOnCommitCallbacks(execute=False):
+            Trainer.objects.create(profile_id=self.profile, name="Pia", profile_picture=jpeg_upload())
+        trainer = Trainer.objects.get(pk=self.profile.pk)
+        self.assertEqual(trainer.profile_picture_variants, {})
+        self.assertTrue(self.listed_picture().endswith(trainer.profile_picture.name))
+
+    def test_listing_revalidates_on_variants_and_accept(self):
+        with override_settings(IMAGE_VARIANT_WORKERS=2), self.captureOnCommitCallbacks(execute=False):
+            Trainer.objects.create(profile_id=self.profile, name="Pia", profile_picture=jpeg_upload())
+        response = self.client.get('/api/trainers/create')
+        etag = response['ETag']
+        self.assertIn('Accept', response['Vary'])
+
+        not_modified = self.client.get('/api/trainers/create', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn('Accept', not_modified['Vary'])
+        # A WebP-capable client gets other picture URLs, so the cached JPEG listing isn't reused
+        self.assertEqual(self.client.get('/api/trainers/create', HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT='image/webp,*/*').status_code, 200)
+
+        trainer = Trainer.objects.get(pk=self.profile.pk)
+        generate_variants(Trainer._meta.label, trainer.pk, trainer.profile_picture.name)
+        self.assertEqual(self.client.get('/api/trainers/create', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_replacing_picture_drops_old_variants(self):
+        trainer = self.upload(jpeg_upload())
+        old = trainer.profile_picture_variants['small']['jpeg']
+        trainer.profile_picture = jpeg_upload("second.jpg", (300, 200))
+        with self.captureOnCommitCallbacks(execute=True):
+            trainer.save()
+        trainer.refresh_from_db()
+        self.assertEqual(trainer.profile_picture_variants['source'], trainer.profile_picture.name)
+        self.assertFalse(trainer.profile_picture.storage.exists(old))
+
+
+class PictureUploadLimitTests(PictureTestCase):
+    """Uploads are refused on size, format and dimensions from their header, and decoded only after commit."""
+
+    def post(self, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/trainers/create', {'account_id': self.account.pk, 'name': "Pia", 'profile_picture': file}, format='multipart')
+
+    def noise_upload(self, side=400):
+        buffer = BytesIO()
+        Image.frombytes('RGB', (side, side), os.urandom(side * side * 3)).save(buffer, 'JPEG', quality=95)
+        return SimpleUploadedFile("noise.jpg", buffer.getvalue(), content_type='image/jpeg')
+
+    def test_byte_limit(self):
+        upload = self.noise_upload()
+        # Refused from Content-Length before the body is read, then while streaming it
+        with override_settings(IMAGE_UPLOAD_MAX_BYTES=upload.size // 4):
+            self.assertEqual(self.post(upload).status_code, 413)
+        upload.seek(0)
+        with override_settings(IMAGE_UPLOAD_MAX_BYTES=upload.size - 1000):
+            self.assertEqual(self.post(upload).status_code, 413)
+        self.assertFalse(Trainer.objects.exists())
+
+    def test_dimension_and_format_limits(self):
+        with override_settings(IMAGE_UPLOAD_MAX_PIXELS=100 * 100):
+            response = self.post(jpeg_upload(size=(200, 100)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("pixels", response.json()['profile_picture'][0])
+
+        buffer = BytesIO()
+        Image.new('RGB', (10, 10)).save(buffer, 'GIF')
+        self.assertEqual(self.post(SimpleUploadedFile("a.gif", buffer.getvalue())).status_code, 400)
+        self.assertEqual(self.post(SimpleUploadedFile("a.jpg", b"not an image" * 100)).status_code, 400)
+        self.assertFalse(Trainer.objects.exists())
+
+    def test_corrupt_body_dropped_after_commit(self):
+        data = self.noise_upload().read()
+        with self.assertLogs('utils.images', 'WARNING'):
+            response = self.post(SimpleUploadedFile("cut.jpg", data[:len(data) // 2], content_type='image/jpeg'))
+        # The header is fine, so the request succeeds; the renderer's full decode rejects it
+        self.assertEqual(response.status_code, 201, response.content)
+        trainer = Trainer.objects.get(pk=self.profile.pk)
+        self.assertFalse(trainer.profile_picture)
+        self.assertEqual(trainer.profile_picture_variants, {})
+
+
+def create_trainer(username, name):
+    account = Account.objects.create_user(username=username, password="x")
+    return Trainer.objects.create(profile_id=Profile.objects.create(account=account, profile_type="trainer"), name=name)
+
+
+def create_trainee_client(username):
+    account = Account.objects.create_user(username=username, password="x")
+    Profile.objects.create(account=account, profile_type="trainee")
+    client = APIClient()
+    client.force_authenticate(account)
+    return client
+
+
+def create_slots(trainer, day, hours):
+    return [
+        TrainerCalendarSlot.objects.create(trainer=trainer, slot_date=day, slot_start_time=time(hour), slot_end_time=time(hour + 1))
+        for hour in hours
+    ]
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.day = date.today() + timedelta(days=1)
+        self.yoga = Specialization.objects.create(name="Yoga")
+        self.maya, self.omar = create_trainer("maya", "Maya"), create_trainer("omar", "Omar")
+        for trainer in (self.maya, self.omar):
+            TrainerSpecialization.objects.create(trainer=trainer, specialization=self.yoga, years_of_experience=2, hourly_rate=10, service_location="online")
+        self.maya_slots = create_slots(self.maya, self.day, [9, 7, 8])
+        self.omar_slots = create_slots(self.omar, self.day, [7])
+        create_slots(self.maya, date.today() - timedelta(days=1), [7])
+        self.client = create_trainee_client("tia")
+
+    def availability(self, **params):
+        response = self.client.get('/api/trainers/availability', {'start': self.day - timedelta(days=2), 'end': self.day, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_free_slots_of_trainer_and_specialization(self):
+        rows = self.availability(trainer=self.maya.pk)['results']
+        self.assertEqual([row['startTime'] for row in rows], ["07:00:00", "08:00:00", "09:00:00"])
+        self.assertEqual({row['trainerName'] for row in rows}, {"Maya"})
+        self.assertEqual(len(self.availability(specialization=self.yoga.pk)['results']), 4)
+
+        TrainerCalendarSlot.objects.filter(pk=self.maya_slots[1].pk).update(is_booked=True)
+        self.assertEqual([row['id'] for row in self.availability(trainer=self.maya.pk)['results']], [self.maya_slots[2].pk, self.maya_slots[0].pk])
+
+    def test_pages_follow_cursor(self):
+        data = self.availability(limit=2, start=self.day, end=self.day, specialization=self.yoga.pk)
+        seen = [row['id'] for row in data['results']]
+        data = self.availability(limit=2, start=self.day, end=self.day, specialization=self.yoga.pk, cursor=data['nextCursor'])
+        seen += [row['id'] for row in data['results']]
+        self.assertIsNone(data['nextCursor'])
+        self.assertEqual(seen, [self.maya_slots[1].pk, self.omar_slots[0].pk, self.maya_slots[2].pk, self.maya_slots[0].pk])
+
+    def test_errors(self):
+        url = '/api/trainers/availability'
+        self.assertEqual(self.client.get(url, {'trainer': self.maya.pk}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': self.day, 'end': self.day}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'trainer': 'x', 'start': self.day, 'end': self.day}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'trainer': 1, 'start': self.day, 'end': self.day + timedelta(days=400)}).status_code, 400)
+        cursor = encode_cursor([str(self.day), 'noon', self.maya.pk, 1])
+        self.assertEqual(self.client.get(url, {'trainer': self.maya.pk, 'start': self.day, 'end': self.day, 'cursor': cursor}).status_code, 400)
+
+    def test_book_and_cancel(self):
+        response = self.client.post('/api/trainers/slots/book', {'trainer_id': self.maya.pk, 'date': self.day, 'from_time': "07:30"})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['id'], self.maya_slots[2].pk)
+        slot = TrainerCalendarSlot.objects.get(pk=self.maya_slots[2].pk)
+        self.assertTrue(slot.is_booked)
+        self.assertEqual(slot.booked_by.profile_type, "trainee")
+
+        self.assertEqual(self.client.post('/api/trainers/slots/book', {'slot_id': slot.pk}).status_code, 409)
+        other = create_trainee_client("tom")
+        self.assertEqual(other.delete(f'/api/trainers/slots/{slot.pk}/booking').status_code, 404)
+        self.assertEqual(self.client.delete(f'/api/trainers/slots/{slot.pk}/booking').status_code, 204)
+        self.assertEqual(other.post('/api/trainers/slots/book', {'slot_id': slot.pk}).status_code, 201)
+
+    def test_booking_errors(self):
+        past = TrainerCalendarSlot.objects.get(slot_date__lt=date.today())
+        self.assertEqual(self.client.post('/api/trainers/slots/book', {'slot_id': past.pk}).status_code, 409)
+        self.assertEqual(self.client.post('/api/trainers/slots/book', {'trainer_id': self.maya.pk}).status_code, 400)
+        # JSON bodies can carry numbers where strings are expected
+        self.assertEqual(self.client.post('/api/trainers/slots/book', {'trainer_id': self.maya.pk, 'date': 20260101}, format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/trainers/slots/book', {'trainer_id': self.maya.pk, 'date': str(self.day), 'from_time': 730}, format='json').status_code, 400)
+        trainer_client = APIClient()
+        trainer_client.force_authenticate(self.maya.profile_id.account)
+        self.assertEqual(trainer_client.post('/api/trainers/slots/book', {'slot_id': self.omar_slots[0].pk}).status_code, 403)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    def setUp(self):
+        self.day = date.today() + timedelta(days=1)
+        self.trainer = create_trainer("popular", "Popular")
+        self.slots = create_slots(self.trainer, self.day, range(6, 11))
+
+    def run_parallel(self, clients, data):
+        barrier = threading.Barrier(len(clients))
+        results = [None] * len(clients)
+
+        def worker(index, client):
+            try:
+                barrier.wait()
+                response = client.post('/api/trainers/slots/book', data)
+                results[index] = (response.status_code, response.json().get('id'))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=item) for item in enumerate(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_racing_trainees_get_distinct_slots(self):
+        clients = [create_trainee_client(f"racer{n}") for n in range(8)]
+        results = self.run_parallel(clients, {'trainer_id': self.trainer.pk, 'date': self.day})
+        booked = [slot_id for status, slot_id in results if status == 201]
+        self.assertEqual(sorted(booked), sorted(slot.pk for slot in self.slots))
+        self.assertEqual(sorted(status for status, _ in results), [201] * 5 + [409] * 3)
+        self.assertEqual(
+            TrainerCalendarSlot.objects.filter(is_booked=True).values('booked_by').distinct().count(), 5,
+        )
+
+    def test_one_slot_booked_once(self):
+        clients = [create_trainee_client(f"racer{n}") for n in range(6)]
+        results = self.run_parallel(clients, {'slot_id': self.slots[0].pk})
+        self.assertEqual(sorted(status for status, _ in results), [201] + [409] * 5)
+
+
+class RecurringSlotTests(TestCase):
+    def setUp(self):
+        self.trainer = create_trainer("rita", "Rita")
+        self.client = APIClient()
+        self.client.force_authenticate(self.trainer.profile_id.account)
+        # A Monday
+        self.monday = date(2030, 1, 7)
+
+    def expand(self, **data):
+        rule = {'weekdays': ["mon", "wed", "fri"], 'start_time': "07:00", 'end_time': "08:00", 'start_date': self.monday, 'weeks': 12}
+        return self.client.post('/api/trainers/slots/recurring', {**rule, **data}, format='json')
+
+    def test_expands_weekly_rule(self):
+        response = self.expand()
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json(), {'created': 36, 'free': 36, 'collisions': []})
+        slots = TrainerCalendarSlot.objects.filter(trainer=self.trainer).order_by('slot_date')
+        self.assertEqual({slot.slot_date.weekday() for slot in slots}, {0, 2, 4})
+        self.assertEqual((slots.first().slot_date, slots.last().slot_date), (self.monday, self.monday + timedelta(weeks=12, days=-3)))
+
+    def test_starts_today_in_the_site_time_zone(self):
+        with mock.patch('django.utils.timezone.localdate', return_value=self.monday):
+            response = self.expand(start_date=None, weeks=1)
+        self.assertEqual(response.status_code, 201, response.content)
+        first = TrainerCalendarSlot.objects.filter(trainer=self.trainer).order_by('slot_date').first()
+        self.assertEqual(first.slot_date, self.monday)
+
+    def test_overlaps_are_skipped_and_reported(self):
+        existing = [
+            TrainerCalendarSlot.objects.create(trainer=self.trainer, slot_date=self.monday, slot_start_time=time(7, 30), slot_end_time=time(9)),
+            # Touching, not overlapping
+            TrainerCalendarSlot.objects.create(trainer=self.trainer, slot_date=self.monday + timedelta(days=2), slot_start_time=time(8), slot_end_time=time(9)),
+            TrainerCalendarSlot.objects.create(trainer=self.trainer, slot_date=self.monday + timedelta(days=4), slot_start_time=time(6), slot_end_time=time(10)),
+        ]
+        response = self.expand(weeks=1, dry_run=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 0)
+        self.assertEqual(TrainerCalendarSlot.objects.count(), 3)
+
+        data = self.expand(weeks=1).json()
+        self.assertEqual((data['created'], data['free']), (1, 1))
+        self.assertEqual([row['slotId'] for row in data['collisions']], [existing[0].pk, existing[2].pk])
+        # Running the rule again collides with everything it created
+        self.assertEqual(len(self.expand(weeks=1).json()['collisions']), 3)
+
+    def test_year_of_slots_in_few_queries(self):
+        # Trainer resolution, savepoint, lock, existing slots, one INSERT, release
+        with self.assertNumQueries(6):
+            response = self.expand(weekdays="mon,tue,wed,thu,fri,sat,sun", weeks=52)
+        self.assertEqual(response.json()['created'], 364)
+
+    def test_sweep_matches_pairwise_check(self):
+        day = date(2030, 1, 7)
+        candidates = [(day + timedelta(days=d), time(h), time(h + 2)) for d in range(3) for h in (6, 12)]
+        existing = sorted(
+            (day + timedelta(days=d), time(h), time(h + length), n)
+            for n, (d, h, length) in enumerate([(0, 5, 1), (0, 5, 10), (0, 7, 1), (1, 8, 4), (1, 13, 1), (2, 14, 1), (2, 9, 1)])
+        )
+        pairwise = [
+            (c, e) for c in candidates for e in existing
+            if c[0] == e[0] and c[1] < e[2] and e[1] < c[2]
+        ]
+        self.assertEqual(sweep_collisions(candidates, existing), pairwise)
+
+    def test_errors(self):
+        self.assertEqual(self.expand(weekdays=["someday"]).status_code, 400)
+        self.assertEqual(self.expand(end_time="06:00").status_code, 400)
+        self.assertEqual(self.expand(weeks=60).status_code, 400)
+        self.assertEqual(self.expand(start_time=700).status_code, 400)
+        self.assertEqual(self.expand(weeks=10**10).status_code, 400)
+        self.assertEqual(self.expand(start_date="9999-12-30").status_code, 400)
+        self.assertEqual(self.expand(weekdays=5).status_code, 400)
+        self.assertEqual(self.expand(weekdays=[0, 2]).status_code, 400)
+        self.assertEqual(create_trainee_client("tess").post('/api/trainers/slots/recurring', {}).status_code, 403)
@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import TrainerView , TrainerUpdateView , TrainerSpecializationView, TrainerSpecializationUpdateView, TrainerExperienceUpdateView, TrainerExperienceView
+from .views import TrainerView , TrainerSearchView, TrainerUpdateView , TrainerSpecializationView, TrainerSpecializationUpdateView, TrainerExperienceUpdateView, TrainerExperienceView, TrainerAvailabilityView, SlotBookingView, SlotBookingCancelView, RecurringSlotsView
 
 urlpatterns = [
     path('create', TrainerView.as_view(), name='trainer-list'),
+    path('search', TrainerSearchView.as_view(), name='trainer-search'),
+    path('availability', TrainerAvailabilityView.as_view(), name='trainer-availability'),
+    path('slots/book', SlotBookingView.as_view(), name='trainer-slot-book'),
+    path('slots/recurring', RecurringSlotsView.as_view(), name='trainer-slots-recurring'),
+    path('slots/<int:slot_id>/booking', SlotBookingCancelView.as_view(), name='trainer-slot-booking'),
     path('update/<int:trainer_id>', TrainerUpdateView.as_view(), name='trainer-detail'),
     path('specializations', TrainerSpecializationView.as_view(), name='trainer-specializations'),
     path('specializations/<int:specialization_id>', TrainerSpecializationUpdateView.as_view(), name='trainer-specialization-detail'),
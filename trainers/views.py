@@ -1,31 +1,81 @@
 from .serializers import TrainerSerializer , TrainerSpecializationSerializer, TrainerExperienceSerializer
-from .models import Trainer, TrainerSpecialization, TrainerExperience
+from .models import Trainer, TrainerCalendarSlot, TrainerSpecialization, TrainerExperience
+from rest_framework.parsers import FormParser, JSONParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from api.conditional import collection_validators, conditional
+from api.pagination import encode_cursor, parse_limit
+from profiles.models import Profile
+from utils.images import choose_variant
+from utils.uploads import BoundedMultiPartParser
+from . import availability, recurrence
+from .resolvers import get_trainer_resolver
+from .search import SEARCH_ALIASES, SEARCH_FIELDS, page_after, search_facets, search_queryset
 # Create your views here.
 
+
+def trainers_validators(request):
+    # The picture URLs depend on the size and format the client asked for
+    return collection_validators(Trainer.objects.all(), *choose_variant(request))
+
+
 class TrainerView(APIView):
-    
+    # Picture uploads stream to disk within size limits (see utils.uploads)
+    parser_classes = [JSONParser, FormParser, BoundedMultiPartParser]
+
+    @conditional(trainers_validators, vary=('Accept',))
     def get(self, request):
         trainers = Trainer.objects.all()
-        serializer = TrainerSerializer(trainers, many=True)
+        serializer = TrainerSerializer(trainers, many=True, context={'request': request})
         return Response(serializer.data)
 
     def post(self, request):
-        serializer = TrainerSerializer(data=request.data)
+        serializer = TrainerSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
+class TrainerSearchView(APIView):
+
+    def get(self, request):
+        """
+        Trainer offerings filtered by specialization (repeatable), min_rate/max_rate,
+        service_location, gender, country and state, cheapest first, `limit` per page. Pass
+        nextCursor back as `cursor` for the next page. The first page also carries facet counts
+        of distinct trainers per specialization and service location for the same filters.
+        """
+        try:
+            offerings = search_queryset(request.query_params)
+            cursor = request.query_params.get("cursor")
+            page_rows = page_after(offerings, cursor)
+            limit = parse_limit(request.query_params.get("limit"), default=20, maximum=100)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        # One extra row tells whether another page exists without a COUNT
+        page = list(page_rows.values(*SEARCH_FIELDS, **SEARCH_ALIASES)[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            next_cursor = encode_cursor([last["hourlyRate"], last["trainerId"], last["id"]])
+        data = {"results": page, "nextCursor": next_cursor}
+        if not cursor:
+            data["facets"] = search_facets(offerings)
+        return Response(data)
+
+
 class TrainerUpdateView(APIView):
+    parser_classes = [JSONParser, FormParser, BoundedMultiPartParser]
+
     def put(self, request, trainer_id):
         try:
             trainer = Trainer.objects.get(id=trainer_id)
         except Trainer.DoesNotExist:
             return Response({"error": "Trainer not found"}, status=404)
         
-        serializer = TrainerSerializer(trainer, data=request.data, partial=True)
+        serializer = TrainerSerializer(trainer, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -46,7 +96,7 @@ class TrainerUpdateView(APIView):
         except Trainer.DoesNotExist:
             return Response({"error": "Trainer not found"}, status=404)
         
-        serializer = TrainerSerializer(trainer, data=request.data, partial=True)
+        serializer = TrainerSerializer(trainer, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -60,7 +110,7 @@ class TrainerSpecializationView(APIView):
         return Response(serializer.data)
 
     def post(self, request):
-        serializer = TrainerSpecializationSerializer(data=request.data)
+        serializer = TrainerSpecializationSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=201)
@@ -73,7 +123,7 @@ class TrainerSpecializationUpdateView(APIView):
         except TrainerSpecialization.DoesNotExist:
             return Response({"error": "TrainerSpecialization not found"}, status=404)
         
-        serializer = TrainerSpecializationSerializer(specialization, data=request.data, partial=True)
+        serializer = TrainerSpecializationSerializer(specialization, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -94,7 +144,7 @@ class TrainerSpecializationUpdateView(APIView):
         except TrainerSpecialization.DoesNotExist:
             return Response({"error": "TrainerSpecialization not found"}, status=404)
         
-        serializer = TrainerSpecializationSerializer(specialization, data=request.data, partial=True)
+        serializer = TrainerSpecializationSerializer(specialization, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -108,7 +158,7 @@ class TrainerExperienceView(APIView):
         return Response(serializer.data)
 
     def post(self, request):
-        serializer = TrainerExperienceSerializer(data=request.data)
+        serializer = TrainerExperienceSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=201)
@@ -121,7 +171,7 @@ class TrainerExperienceUpdateView(APIView):
         except TrainerExperience.DoesNotExist:
             return Response({"error": "TrainerExperience not found"}, status=404)
 
-        serializer = TrainerExperienceSerializer(experience, data=request.data, partial=True)
+        serializer = TrainerExperienceSerializer(experience, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -142,8 +192,88 @@ class TrainerExperienceUpdateView(APIView):
         except TrainerExperience.DoesNotExist:
             return Response({"error": "TrainerExperience not found"}, status=404)
 
-        serializer = TrainerExperienceSerializer(experience, data=request.data, partial=True)
+        serializer = TrainerExperienceSerializer(experience, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
-        return Response(serializer.errors, status=400)
\ No newline at end of file
+        return Response(serializer.errors, status=400)
+
+def trainee_profile(request):
+    return Profile.objects.filter(account_id=request.user.pk, profile_type='trainee').first()
+
+
+class TrainerAvailabilityView(APIView):
+
+    def get(self, request):
+        """
+        Free slots of `trainer` and/or of any trainer with `specialization` from `start` to `end`
+        (YYYY-MM-DD), earliest first, `limit` per page. Pass nextCursor back as `cursor`.
+        """
+        try:
+            slots = availability.availability_queryset(request.query_params)
+            page_rows = availability.page_after(slots, request.query_params.get("cursor"))
+            limit = parse_limit(request.query_params.get("limit"), default=50, maximum=200)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        page = list(page_rows.values(*availability.AVAILABILITY_FIELDS, **availability.AVAILABILITY_ALIASES)[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            next_cursor = encode_cursor([last["date"], last["startTime"], last["trainerId"], last["id"]])
+        return Response({"results": page, "nextCursor": next_cursor})
+
+
+class SlotBookingView(APIView):
+
+    def post(self, request):
+        """Book `slot_id`, or the first free slot of `trainer_id` on `date` from `from_time` on."""
+        profile = trainee_profile(request)
+        if profile is None:
+            return Response({"error": "Only trainees can book slots."}, status=403)
+        try:
+            slot = availability.book(availability.booking_candidates(request.data), profile)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except availability.SlotUnavailable:
+            return Response({"error": "No free slot is left for this request."}, status=409)
+        booked = TrainerCalendarSlot.objects.values(*availability.AVAILABILITY_FIELDS, **availability.AVAILABILITY_ALIASES).get(pk=slot.pk)
+        return Response(booked, status=201)
+
+
+class SlotBookingCancelView(APIView):
+
+    def delete(self, request, slot_id):
+        profile = trainee_profile(request)
+        if profile is None or not availability.cancel(slot_id, profile):
+            return Response({"error": "Booking not found"}, status=404)
+        return Response(status=204)
+
+
+class RecurringSlotsView(APIView):
+
+    def post(self, request):
+        """
+        Expand a weekly rule (`weekdays`, `start_time`, `end_time`, `start_date`, `weeks` or
+        `end_date`) into slots of the requesting trainer. Occurrences overlapping existing slots
+        are skipped and listed in `collisions`; `dry_run` reports without inserting.
+        """
+        trainer = get_trainer_resolver({'request': request}).trainer(request.user.pk)
+        if trainer is None:
+            return Response({"error": "Only trainers can create slots."}, status=403)
+        try:
+            rule = recurrence.parse_rule(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true")
+        slots, collisions = recurrence.expand_rule(trainer, rule, dry_run=dry_run)
+        return Response({
+            "created": 0 if dry_run else len(slots),
+            "free": len(slots),
+            "collisions": [
+                {"date": day, "startTime": start, "endTime": end, "slotId": slot[3]}
+                for (day, start, end), slot in collisions
+            ],
+        }, status=200 if dry_run else 201)
@@ -0,0 +1,119 @@
+"""
+In-process prefix index for the small reference tables (specializations, categories,
+languages). The rows are loaded once per process into a sorted list of (word, row) entries,
+so a lookup is a bisect plus a short scan and never touches the database. Typos are tolerated
+by a bounded edit distance against word prefixes, which is cheap at this size.
+
+Saves and deletes in this process drop the index (see utils.signals); other processes pick
+changes up when their copy is older than REFERENCE_INDEX_TTL seconds.
+"""
+import bisect
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+from .models import Category, Language, Specialization
+
+# type -> (model, label field)
+REFERENCE_TABLES = {
+    'specialization': (Specialization, 'name'),
+    'category': (Category, 'name'),
+    'language': (Language, 'name'),
+}
+
+
+def normalize(text):
+    """Lowercase and strip accents, so 'Café' and 'cafe' index alike."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def edit_distance(a, b, limit, prefix=False):
+    """
+    Levenshtein distance of `a` and `b`, or limit + 1 as soon as it is known to exceed `limit`.
+    With prefix=True, the distance of `a` to the closest prefix of `b`.
+    """
+    if not prefix and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous) if prefix else previous[-1]
+
+
+def allowed_typos(query):
+    if len(query) < 4:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+
+class PrefixIndex:
+    def __init__(self, rows):
+        """`rows` are (pk, label) pairs; every word of a label is indexed."""
+        self.entries = sorted(
+            (word, label, pk)
+            for pk, label in rows
+            for word in set(normalize(label).split())
+        )
+        self.words = [word for word, _, _ in self.entries]
+
+    def search(self, query, limit=8):
+        """
+        Rows with a word starting with `query`, then rows with a word within a few typos of it,
+        as (pk, label, score) with score 1.0 for exact prefixes.
+        """
+        query = normalize(query).strip()
+        if not query:
+            return []
+        # Multi-word input: the last word is the one being typed, earlier ones must match fully
+        *complete, partial = query.split()
+        found = {}
+        start = bisect.bisect_left(self.words, partial)
+        for word, label, pk in self.entries[start:]:
+            if not word.startswith(partial):
+                break
+            found.setdefault(pk, (pk, label, 1.0))
+
+        typos = allowed_typos(partial)
+        if typos and len(found) < limit:
+            for word, label, pk in self.entries:
+                if pk in found:
+                    continue
+                distance = edit_distance(partial, word, typos, prefix=True)
+                if distance <= typos:
+                    found[pk] = (pk, label, round(1 - distance / len(partial), 3))
+
+        results = [
+            row for row in found.values()
+            if all(term in normalize(row[1]).split() for term in complete)
+        ]
+        results.sort(key=lambda row: (-row[2], len(row[1]), row[1]))
+        return results[:limit]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_reference_index(kind):
+    """The PrefixIndex of one REFERENCE_TABLES type, (re)built when missing or stale."""
+    entry = _indexes.get(kind)
+    if entry is None or time.monotonic() - entry[0] > settings.REFERENCE_INDEX_TTL:
+        with _lock:
+            entry = _indexes.get(kind)
+            if entry is None or time.monotonic() - entry[0] > settings.REFERENCE_INDEX_TTL:
+                model, field = REFERENCE_TABLES[kind]
+                entry = (time.monotonic(), PrefixIndex(model.objects.values_list('pk', field)))
+                _indexes[kind] = entry
+    return entry[1]
+
+
+def invalidate_reference_index(kind):
+    _indexes.pop(kind, None)
@@ -0,0 +1,123 @@
+"""
+Geohash cells, distances and offline geocoding from the bundled postal-code table.
+
+A geohash interleaves longitude and latitude bits and writes them in base32, so every prefix
+names a rectangular cell and nearby points share prefixes. Locations store a 9-character hash
+(cells of a few metres) with a prefix-capable index; a radius search picks the precision whose
+cells are at least as large as the radius, so the circle lies within the 3x3 block of cells
+around its centre, fetches those nine prefixes and computes exact distances only for them.
+"""
+import csv
+import math
+from functools import lru_cache
+
+from django.conf import settings
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+DECODE = {char: index for index, char in enumerate(BASE32)}
+STORED_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude, longitude, precision=STORED_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def bounds(geohash):
+    """(south, west, north, east) of a cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = DECODE[char]
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def cell_size_degrees(precision):
+    """(height, width) in degrees of cells at `precision`."""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    return 180 / 2 ** (bits - lon_bits), 360 / 2 ** lon_bits
+
+
+def precision_for_radius(radius_km, latitude):
+    """The finest precision whose cells are at least `radius_km` high and wide around `latitude`."""
+    # Cells are narrowest on the side of the circle nearest the pole
+    poleward_latitude = min(abs(latitude) + radius_km / KM_PER_DEGREE, 89.0)
+    for precision in range(STORED_PRECISION, 0, -1):
+        height, width = cell_size_degrees(precision)
+        width_km = width * KM_PER_DEGREE * math.cos(math.radians(poleward_latitude))
+        if min(height * KM_PER_DEGREE, width_km) >= radius_km:
+            return precision
+    return 1
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Geohash prefixes whose cells together contain every point within `radius_km`."""
+    precision = precision_for_radius(radius_km, latitude)
+    height, width = cell_size_degrees(precision)
+    south, west, north, east = bounds(encode(latitude, longitude, precision))
+    center_lat, center_lon = (south + north) / 2, (west + east) / 2
+    cells = set()
+    for d_lat in (-height, 0, height):
+        for d_lon in (-width, 0, width):
+            lat = center_lat + d_lat
+            if not -90 < lat < 90:
+                continue
+            lon = (center_lon + d_lon + 180) % 360 - 180
+            cells.add(encode(lat, lon, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _key(value):
+    return ''.join((value or '').split()).upper()
+
+
+@lru_cache(maxsize=None)
+def postal_codes():
+    """{(country key, zip key): (latitude, longitude)} from GEO_POSTAL_CODES_PATH, loaded once."""
+    table = {}
+    with open(settings.GEO_POSTAL_CODES_PATH, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            point = float(row['latitude']), float(row['longitude'])
+            for country in (row['country_code'], row['country_name']):
+                table[_key(country), _key(row['zip_code'])] = point
+    return table
+
+
+def geocode(country, zip_code):
+    """(latitude, longitude) of a postal code, or None when it isn't in the table."""
+    if not country or not zip_code:
+        return None
+    return postal_codes().get((_key(country), _key(zip_code)))
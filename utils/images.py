@@ -0,0 +1,161 @@
+"""
+Resized variants of uploaded profile pictures.
+
+After a save that changes a picture, and once the transaction has committed, the original is
+decoded once and square thumbnails are written at each VARIANT_SIZES size as JPEG and WebP on
+a small thread pool, so the request that uploaded it never waits on Pillow. The storage names
+land in the model's `profile_picture_variants` as {'source': original name, size: {format:
+name}}; 'source' tells a stale set apart from the current one. Serializers pick a variant with
+VariantImageField, and fall back to the original until the variants exist. Rendering is also
+the only full decode an upload gets; a picture that fails it is removed from the row.
+"""
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Largest first: each size is scaled down from the one before instead of from the original
+VARIANT_SIZES = {'large': 640, 'medium': 320, 'small': 96}
+VARIANT_FORMATS = {'webp': ('WEBP', {'quality': 80, 'method': 4}), 'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True})}
+DEFAULT_SIZE = 'medium'
+
+# Models whose `profile_picture` gets variants, as app_label.ModelName
+PICTURE_MODELS = ('trainers.Trainer', 'trainees.Trainee', 'stores.Store')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_VARIANT_WORKERS, thread_name_prefix='image-variants')
+    return _executor
+
+
+def variant_name(source, label, extension):
+    directory, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'variants', f'{stem}_{label}.{extension}')
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def decode(f):
+    """The fully decoded, upright picture in `f`, at no less than the largest variant size."""
+    largest = max(VARIANT_SIZES.values())
+    try:
+        image = Image.open(f)
+        width, height = image.size
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            raise InvalidImage(f'{width}x{height} pixels')
+        # JPEGs can decode straight at a power-of-two reduction no smaller than the largest variant
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        return image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as error:
+        # Not an image, truncated or corrupt: only a full decode finds out
+        raise InvalidImage(str(error)) from error
+
+
+def render_variants(source, storage=default_storage):
+    """Write every size and format of `source`; returns {size: {format: storage name}}."""
+    with storage.open(source, 'rb') as f:
+        image = decode(f)
+
+    variants = {}
+    for label, size in sorted(VARIANT_SIZES.items(), key=lambda item: -item[1]):
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        variants[label] = {}
+        for extension, (pil_format, options) in VARIANT_FORMATS.items():
+            frame = image.convert('RGB') if pil_format == 'JPEG' else image
+            buffer = BytesIO()
+            frame.save(buffer, pil_format, **options)
+            name = variant_name(source, label, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            variants[label][extension] = storage.save(name, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def variant_names(variants):
+    return [name for label in VARIANT_SIZES for name in (variants.get(label) or {}).values()]
+
+
+def generate_variants(model_label, pk, source):
+    """Render the variants of `source` and store them, unless the row has moved on to another picture."""
+    model = apps.get_model(model_label)
+    try:
+        try:
+            variants = {'source': source, **render_variants(source)}
+        except InvalidImage as error:
+            # Uploads are only checked by their header (see utils.uploads); drop one that doesn't decode
+            logger.warning("Dropping %s of %s %s: %s", source, model_label, pk, error)
+            if model.objects.filter(pk=pk, profile_picture=source).update(profile_picture='', profile_picture_variants={}, updated_at=timezone.now()):
+                default_storage.delete(source)
+            return None
+        previous = model.objects.filter(pk=pk).values_list('profile_picture_variants', flat=True).first()
+        # updated_at moves so conditional GETs (see api.conditional) serve the new picture URLs
+        if not model.objects.filter(pk=pk, profile_picture=source).update(profile_picture_variants=variants, updated_at=timezone.now()):
+            # Replaced or deleted while rendering; the newer upload has its own job
+            for name in variant_names(variants):
+                default_storage.delete(name)
+            return None
+        stale = set(variant_names(previous or {})) - set(variant_names(variants))
+        for name in stale:
+            default_storage.delete(name)
+        return variants
+    except Exception:
+        logger.exception("Generating picture variants for %s %s failed", model_label, pk)
+        return None
+
+
+def _run(model_label, pk, source):
+    try:
+        generate_variants(model_label, pk, source)
+    finally:
+        connection.close()
+
+
+def schedule_variants(instance):
+    """After commit, (re)generate the variants of `instance.profile_picture` when they are missing or stale."""
+    source = instance.profile_picture.name or None
+    variants = instance.profile_picture_variants or {}
+    if source == variants.get('source'):
+        return
+    model = type(instance)
+    if source is None:
+        # Picture removed: nothing to render, drop the old variants now
+        model.objects.filter(pk=instance.pk).update(profile_picture_variants={})
+        instance.profile_picture_variants = {}
+        return
+    model_label = model._meta.label
+    if settings.IMAGE_VARIANT_WORKERS:
+        transaction.on_commit(lambda: executor().submit(_run, model_label, instance.pk, source))
+    else:
+        transaction.on_commit(lambda: generate_variants(model_label, instance.pk, source))
+
+
+def choose_variant(request):
+    """(size, format) the client asked for: ?image_size= (or 'original'), WebP when its Accept allows."""
+    if request is None:
+        return DEFAULT_SIZE, 'jpeg'
+    size = request.query_params.get('image_size', DEFAULT_SIZE)
+    if size not in VARIANT_SIZES and size != 'original':
+        size = DEFAULT_SIZE
+    return size, 'webp' if 'image/webp' in request.META.get('HTTP_ACCEPT', '') else 'jpeg'
@@ -1,7 +1,58 @@
 from django.db import models
 from profiles.models import Profile
+from .geo import encode
 
 # Create your models here.
+class GeoLocation(models.Model):
+    """Coordinates filled by the geocode_locations command, with the geohash that radius searches prune by."""
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    geohash = models.CharField(max_length=12, blank=True, null=True, editable=False)
+
+    class Meta:
+        abstract = True
+        indexes = [
+            # pattern_ops so geohash__startswith (LIKE 'prefix%') is an index range scan in any collation
+            models.Index(fields=['geohash'], name='%(app_label)s_%(class)s_geohash', opclasses=['varchar_pattern_ops']),
+        ]
+
+    # Fields of the concrete models that the coordinates are geocoded from
+    ADDRESS_FIELDS = ('country', 'zip_code')
+    LOCATION_FIELDS = ('latitude', 'longitude', 'geohash')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._geocoded_address = instance._address()
+        return instance
+
+    def _address(self):
+        # Deferred fields count as unchanged instead of being loaded
+        return tuple(self.__dict__.get(name, models.DEFERRED) for name in self.ADDRESS_FIELDS)
+
+    def save(self, *args, **kwargs):
+        """
+        Drop the coordinates of a row whose country or postal code changed, so it stops showing
+        up where it used to be; geocode_locations fills them again from the new address.
+        """
+        loaded = getattr(self, '_geocoded_address', None)
+        current = self._address()
+        update_fields = kwargs.get('update_fields')
+        if loaded is not None and any(
+            old is not models.DEFERRED and new is not models.DEFERRED and old != new
+            for old, new in zip(loaded, current)
+        ):
+            self.set_location(None)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.LOCATION_FIELDS}
+        super().save(*args, **kwargs)
+        self._geocoded_address = current
+
+    def set_location(self, point):
+        self.latitude, self.longitude = point if point else (None, None)
+        self.geohash = encode(*point) if point else None
+
+
 class Specialization(models.Model):
     name = models.CharField(max_length=100)
     description = models.CharField(max_length=255, blank=True, null=True)
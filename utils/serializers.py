@@ -0,0 +1,41 @@
+from rest_framework import serializers
+
+from .images import choose_variant
+from .uploads import PROBE_BYTES, check_image, check_size, probe
+
+
+class VariantImageField(serializers.ImageField):
+    """An ImageField that renders as the URL of the variant the request asks for (see utils.images)."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        size, extension = choose_variant(request)
+        variants = getattr(value.instance, 'profile_picture_variants', None) or {}
+        name = (variants.get(size) or {}).get(extension) if variants.get('source') == value.name else None
+        if name is None:
+            # Original requested, or variants not rendered yet
+            return super().to_representation(value)
+        url = value.storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+class BoundedImageField(VariantImageField):
+    """
+    Accepts an upload after checking its size and header only (see utils.uploads); the full
+    decode that ImageField runs in the request is left to the variant renderer.
+    """
+
+    def to_internal_value(self, data):
+        # FileField's checks (a file, a name, not empty), skipping ImageField's Pillow verify()
+        file = serializers.FileField.to_internal_value(self, data)
+        check_size(file.size)
+        info = getattr(file, 'image_info', None)
+        if info is None:
+            # Not streamed through BoundedImageUploadHandler
+            file.seek(0)
+            info = probe(file.read(PROBE_BYTES))
+            file.seek(0)
+        check_image(info)
+        return file
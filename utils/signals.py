@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+
+from .autocomplete import REFERENCE_TABLES, invalidate_reference_index
+from .images import PICTURE_MODELS, schedule_variants
+
+
+def _invalidate(kind):
+    def receiver(sender, **kwargs):
+        invalidate_reference_index(kind)
+    return receiver
+
+
+# Strong references: the receivers are closures that nothing else keeps alive
+for kind, (model, _) in REFERENCE_TABLES.items():
+    post_save.connect(_invalidate(kind), sender=model, weak=False, dispatch_uid=f'utils.autocomplete.{kind}.save')
+    post_delete.connect(_invalidate(kind), sender=model, weak=False, dispatch_uid=f'utils.autocomplete.{kind}.delete')
+
+
+def _schedule_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_variants(instance)
+
+
+for label in PICTURE_MODELS:
+    post_save.connect(_schedule_variants, sender=label, dispatch_uid=f'utils.images.{label}')
@@ -1,3 +1,75 @@
+import math
+
 from django.test import TestCase
 
-# Create your tests here.
+from . import geo
+from .autocomplete import PrefixIndex, edit_distance, get_reference_index
+from .models import Specialization
+
+
+class PrefixIndexTests(TestCase):
+    def setUp(self):
+        self.index = PrefixIndex([
+            (1, "Strength Training"), (2, "Yoga"), (3, "Prenatal Yoga"), (4, "Café Cardio"), (5, "Stretching"),
+        ])
+
+    def labels(self, query, limit=8):
+        return [label for _, label, _ in self.index.search(query, limit)]
+
+    def test_prefix_of_any_word(self):
+        self.assertEqual(self.labels("yo"), ["Yoga", "Prenatal Yoga"])
+        self.assertEqual(self.labels("str"), ["Stretching", "Strength Training"])
+        self.assertEqual(self.labels("CAFE"), ["Café Cardio"])
+        self.assertEqual(self.labels("str", limit=1), ["Stretching"])
+
+    def test_typos(self):
+        self.assertEqual(self.labels("stength"), ["Strength Training"])
+        self.assertEqual(self.index.search("yogq")[0][:2], (2, "Yoga"))
+        self.assertLess(self.index.search("yogq")[0][2], 1.0)
+        # Too short to guess at
+        self.assertEqual(self.labels("yq"), [])
+
+    def test_earlier_words_must_match(self):
+        self.assertEqual(self.labels("prenatal yo"), ["Prenatal Yoga"])
+        self.assertEqual(self.labels("strength tr"), ["Strength Training"])
+
+    def test_edit_distance_is_bounded(self):
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 1), 2)
+
+    def test_reference_index_follows_saves(self):
+        self.assertEqual(get_reference_index('specialization').search("box"), [])
+        boxing = Specialization.objects.create(name="Boxing")
+        self.assertEqual(get_reference_index('specialization').search("box"), [(boxing.pk, "Boxing", 1.0)])
+        boxing.delete()
+        self.assertEqual(get_reference_index('specialization').search("box"), [])
+
+
+class GeoTests(TestCase):
+    def test_encode_and_bounds(self):
+        # Reference value from the original geohash.org implementation
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        south, west, north, east = geo.bounds('u4pruydqqvj')
+        self.assertTrue(south <= 57.64911 <= north and west <= 10.40744 <= east)
+
+    def test_covering_cells_contain_the_circle(self):
+        for latitude, longitude, radius in [(30.0444, 31.2357, 5), (59.9, 10.7, 40), (0.01, 179.99, 3), (-33.9, 18.4, 0.2)]:
+            cells = geo.covering_cells(latitude, longitude, radius)
+            self.assertLessEqual(len(cells), 9)
+            # Points on the circle in every direction fall in one of the cells
+            for bearing in range(0, 360, 15):
+                d_lat = radius / geo.KM_PER_DEGREE * math.cos(math.radians(bearing)) * 0.999
+                d_lon = radius / geo.KM_PER_DEGREE * math.sin(math.radians(bearing)) * 0.999 / math.cos(math.radians(latitude + d_lat))
+                lon = (longitude + d_lon + 180) % 360 - 180
+                point = geo.encode(latitude + d_lat, lon)
+                self.assertTrue(any(point.startswith(cell) for cell in cells), (latitude, longitude, radius, bearing))
+
+    def test_haversine(self):
+        # Cairo to Alexandria is about 180 km
+        self.assertAlmostEqual(geo.haversine_km(30.0444, 31.2357, 31.2001, 29.9187), 179.5, delta=1.5)
+
+    def test_geocode_from_bundled_table(self):
+        self.assertEqual(geo.geocode("Egypt", "11511"), (30.0444, 31.2357))
+        self.assertEqual(geo.geocode("gb", "sw1a1aa"), (51.5010, -0.1416))
+        self.assertIsNone(geo.geocode("Egypt", "99999"))
+        self.assertIsNone(geo.geocode("", "11511"))
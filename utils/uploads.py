@@ -0,0 +1,107 @@
+"""
+Size-bounded image uploads.
+
+Views that take pictures parse multipart bodies with BoundedMultiPartParser, whose only upload
+handler is BoundedImageUploadHandler instead of Django's memory and temporary-file pair. Every
+file is streamed to a temporary file chunk by chunk, the byte limit is enforced as chunks arrive
+(and up front from Content-Length), and the format and pixel dimensions are read from the first
+chunks, which is where every supported format keeps them. Nothing is decoded in the request;
+the full decode happens when the variants are rendered (see utils.images), and a picture that
+fails it is dropped there.
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+from rest_framework import exceptions, parsers, status
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+# Bytes buffered to find the dimensions; JPEGs put up to 64 KiB of EXIF before them
+PROBE_BYTES = 256 * 1024
+# Room for the other form fields and the multipart boundaries when checking Content-Length
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded file is too large.'
+    default_code = 'upload_too_large'
+
+
+def probe(header):
+    """
+    (format, (width, height)) read from the leading bytes of an image, or None when they
+    don't hold a recognisable header (yet). Pillow only parses the header on open.
+    """
+    try:
+        with Image.open(BytesIO(header)) as image:
+            return image.format, image.size
+    except Image.DecompressionBombError:
+        # Past Pillow's own pixel bound, so past ours as well
+        return None, None
+    except Exception:
+        # Truncated headers raise anything from SyntaxError to struct.error
+        return None
+
+
+def check_image(info, field_name=None):
+    """Reject an upload whose probed header is missing, of an unsupported format or too large in pixels."""
+    def reject(message):
+        raise exceptions.ValidationError({field_name: [message]} if field_name else [message])
+
+    if info is None:
+        reject('Upload a valid image. The file you uploaded was either not an image or a corrupted image.')
+    image_format, size = info
+    if size is None or size[0] * size[1] > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        reject(f'Image is too large; at most {settings.IMAGE_UPLOAD_MAX_PIXELS} pixels are allowed.')
+    if image_format not in ALLOWED_FORMATS:
+        reject(f'Unsupported image format; use one of {", ".join(sorted(ALLOWED_FORMATS))}.')
+
+
+def check_size(size):
+    if size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise UploadTooLarge(f'Uploaded file is too large; at most {settings.IMAGE_UPLOAD_MAX_BYTES} bytes are allowed.')
+
+
+class BoundedImageUploadHandler(TemporaryFileUploadHandler):
+    """Streams uploads to disk, failing fast on size, format and dimensions."""
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > settings.IMAGE_UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES:
+            raise UploadTooLarge()
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.header = bytearray()
+        self.info = None
+
+    def receive_data_chunk(self, raw_data, start):
+        check_size(start + len(raw_data))
+        if self.info is None:
+            self.header += raw_data[:PROBE_BYTES - len(self.header)]
+            self.info = probe(bytes(self.header))
+            if self.info is None and len(self.header) >= PROBE_BYTES:
+                check_image(None, self.field_name)
+            if self.info is not None:
+                check_image(self.info, self.field_name)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.info is None:
+            # Smaller than PROBE_BYTES
+            self.info = probe(bytes(self.header))
+            check_image(self.info, self.field_name)
+        uploaded = super().file_complete(file_size)
+        # Saves BoundedImageField from probing the file again
+        uploaded.image_info = self.info
+        return uploaded
+
+
+class BoundedMultiPartParser(parsers.MultiPartParser):
+    """MultiPartParser whose files go through BoundedImageUploadHandler only."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        request._request.upload_handlers = [BoundedImageUploadHandler(request._request)]
+        return super().parse(stream, media_type, parser_context)